@@ -0,0 +1,358 @@
+"""
+부동산 거래 데이터 일괄 백필 작업
+지역코드 × 년월 조합을 kr-realestate MCP 서버로 수집해 로컬 저장소(TradeStore)에 적재, 체크포인트로 재시작 시 이어서 진행
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.mcp_client import MCPClient
+from app.trade_store import REGION_CODE_PATTERN, YEAR_MONTH_PATTERN, TradeStore
+from app.utils.trade_data import year_month_range
+
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = "kr-realestate"
+TRADE_TOOL = "get_apt_trade_data"
+# 체크포인트 파일명으로 쓰이므로 경로 문자가 들어갈 수 없는 형식만 허용
+JOB_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class RateLimiter:
+    """토큰 버킷 방식으로 초당 호출 수를 제한하는 클래스"""
+
+    def __init__(self, rate_per_sec: float, burst: Optional[int] = None):
+        self.rate = rate_per_sec
+        self.capacity = burst or max(1, int(rate_per_sec))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기합니다."""
+        if self.rate <= 0:
+            return
+
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# 서버별 호출 제한기 (같은 서버를 쓰는 모든 작업이 공유)
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(server_name: str) -> RateLimiter:
+    """서버별 호출 제한기를 반환합니다. MCP_RATE_LIMIT_<SERVER> 또는 MCP_RATE_LIMIT(초당 호출 수)로 설정."""
+    if server_name not in _rate_limiters:
+        env_name = f"MCP_RATE_LIMIT_{server_name.upper().replace('-', '_')}"
+        rate = float(os.getenv(env_name, os.getenv('MCP_RATE_LIMIT', '5')))
+        _rate_limiters[server_name] = RateLimiter(rate)
+    return _rate_limiters[server_name]
+
+
+def checkpoint_dir() -> str:
+    """백필 체크포인트 디렉토리"""
+    path = os.path.join(os.getenv('CACHE_PATH', './cache'), 'backfill')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def is_job_id(job_id: Any) -> bool:
+    """체크포인트 파일명으로 안전한 작업 ID인지 확인합니다."""
+    return isinstance(job_id, str) and JOB_ID_PATTERN.fullmatch(job_id) is not None
+
+
+def checkpoint_file(job_id: str) -> str:
+    """작업 ID의 체크포인트 파일 경로 (형식이 맞지 않으면 ValueError)"""
+    if not is_job_id(job_id):
+        raise ValueError(f"잘못된 백필 작업 ID: {job_id!r}")
+    return os.path.join(checkpoint_dir(), f"{job_id}.json")
+
+
+class BackfillJob:
+    """지역코드 × 년월 작업 목록을 제한된 동시성으로 수집하고 진행 상황을 체크포인트로 남기는 작업"""
+
+    def __init__(
+        self,
+        region_codes: List[str],
+        year_months: List[str],
+        job_id: Optional[str] = None,
+        refresh: bool = False,
+        concurrency: Optional[int] = None,
+        mcp_client: Optional[MCPClient] = None,
+        trade_store: Optional[TradeStore] = None
+    ):
+        if job_id is not None and not is_job_id(job_id):
+            raise ValueError(f"잘못된 백필 작업 ID: {job_id!r}")
+        invalid = [code for code in region_codes if not isinstance(code, str) or not REGION_CODE_PATTERN.fullmatch(code)]
+        invalid += [month for month in year_months if not isinstance(month, str) or not YEAR_MONTH_PATTERN.fullmatch(month)]
+        if invalid:
+            raise ValueError(f"잘못된 지역코드/년월: {invalid[:5]!r}")
+
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.region_codes = list(region_codes)
+        self.year_months = list(year_months)
+        self.refresh = refresh
+        self.concurrency = concurrency or int(os.getenv('BACKFILL_CONCURRENCY', '4'))
+        self.mcp_client = mcp_client  # 실행 시점에 생성 (진행 상황 조회만 할 때는 서버를 띄우지 않음)
+        self.trade_store = trade_store or TradeStore()
+        self.rate_limiter = get_rate_limiter(SERVER_NAME)
+
+        self.status = "pending"
+        self.completed: Dict[str, int] = {}   # "지역코드:년월" → 적재 건수
+        self.skipped: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def checkpoint_path(self) -> str:
+        """체크포인트 파일 경로"""
+        return checkpoint_file(self.job_id)
+
+    @classmethod
+    def load(cls, job_id: str, **kwargs) -> Optional["BackfillJob"]:
+        """체크포인트에서 작업을 복원합니다. 없거나 작업 ID 형식이 맞지 않으면 None."""
+        if not is_job_id(job_id):
+            return None
+        path = checkpoint_file(job_id)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        job = cls(state["region_codes"], state["year_months"], job_id=job_id, refresh=state.get("refresh", False), **kwargs)
+        job.status = state.get("status", "pending")
+        job.completed = state.get("completed", {})
+        job.skipped = state.get("skipped", [])
+        job.created_at = state.get("created_at", job.created_at)
+        # 실패한 항목은 재시작 시 다시 시도
+        return job
+
+    def pending_tasks(self) -> List[str]:
+        """아직 처리되지 않은 "지역코드:년월" 목록"""
+        done = set(self.completed) | set(self.skipped)
+        return [
+            f"{region_code}:{year_month}"
+            for region_code in self.region_codes
+            for year_month in self.year_months
+            if f"{region_code}:{year_month}" not in done
+        ]
+
+    def progress(self) -> Dict[str, Any]:
+        """진행 상황 요약"""
+        total = len(self.region_codes) * len(self.year_months)
+        done = len(self.completed) + len(self.skipped)
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": total,
+            "completed": len(self.completed),
+            "skipped": len(self.skipped),
+            "failed": len(self.failed),
+            "remaining": total - done,
+            "progress_pct": round(done / total * 100, 1) if total else 100.0,
+            "rows": sum(self.completed.values()),
+            "elapsed_seconds": round(elapsed, 1),
+            "errors": dict(list(self.failed.items())[-10:]),
+            "region_codes": self.region_codes,
+            "period": f"{self.year_months[0]}~{self.year_months[-1]}" if self.year_months else ""
+        }
+
+    async def run(self) -> Dict[str, Any]:
+        """남은 작업을 수집합니다."""
+        if self.mcp_client is None:
+            self.mcp_client = MCPClient()
+
+        tasks = self.pending_tasks()
+        self.status = "running"
+        self.started_at = time.time()
+        self.failed = {}
+        self._save_checkpoint()
+        logger.info(f"📦 백필 시작 [{self.job_id}]: {len(tasks)}건 남음 (동시성 {self.concurrency})")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(task_key: str):
+            async with semaphore:
+                await self._collect(task_key)
+
+        try:
+            await asyncio.gather(*(worker(task_key) for task_key in tasks))
+            self.status = "completed" if not self.failed else "completed_with_errors"
+        except Exception as e:
+            logger.error(f"❌ 백필 실패 [{self.job_id}]: {e}")
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            self._save_checkpoint()
+
+        logger.info(f"📦 백필 종료 [{self.job_id}]: {self.progress()}")
+        return self.progress()
+
+    async def _collect(self, task_key: str):
+        """지역코드:년월 하나를 수집해 저장소에 적재합니다."""
+        region_code, year_month = task_key.split(":")
+
+        if not self.refresh and self.trade_store.is_settled(region_code, year_month):
+            self.skipped.append(task_key)
+            self._save_checkpoint()
+            return
+
+        await self.rate_limiter.acquire()
+        try:
+            result = await self.mcp_client.call_tool(SERVER_NAME, TRADE_TOOL, {
+                "region_code": region_code,
+                "year_month": year_month
+            })
+            if not result or "error" in result:
+                raise RuntimeError(str((result or {}).get("error", "응답 없음"))[:200])
+
+            content = result.get("content")
+            content = content[0]["text"] if isinstance(content, list) and content else content
+            # 거래가 없는 달은 빈 파티션으로 저장하고, 읽을 수 없는 결과는 실패로 남겨 다음 실행에서 다시 수집
+            rows = await asyncio.to_thread(
+                self.trade_store.ingest_tool_result, region_code, year_month, str(content or ""), True
+            )
+            if not self.trade_store.has_partition(region_code, year_month):
+                raise RuntimeError("파티션이 저장되지 않음")
+            self.completed[task_key] = rows
+        except Exception as e:
+            logger.warning(f"⚠️ 백필 항목 실패 {task_key}: {e}")
+            self.failed[task_key] = str(e)
+
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        """진행 상황을 임시 파일에 쓴 뒤 교체하여 원자적으로 저장합니다."""
+        state = {
+            "job_id": self.job_id,
+            "region_codes": self.region_codes,
+            "year_months": self.year_months,
+            "refresh": self.refresh,
+            "status": self.status,
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "created_at": self.created_at,
+            "updated_at": time.time()
+        }
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, self.checkpoint_path)
+
+
+# 실행 중이거나 완료된 작업 (프로세스 내)
+_jobs: Dict[str, BackfillJob] = {}
+_job_tasks: Dict[str, asyncio.Task] = {}
+
+
+def start_backfill(
+    region_codes: List[str],
+    start_month: str,
+    end_month: str,
+    job_id: Optional[str] = None,
+    refresh: bool = False
+) -> BackfillJob:
+    """백필 작업을 백그라운드로 시작합니다. 같은 job_id의 체크포인트가 있으면 이어서 실행합니다."""
+    if job_id and job_id in _job_tasks and not _job_tasks[job_id].done():
+        return _jobs[job_id]
+
+    job = BackfillJob.load(job_id) if job_id else None
+    if job is None:
+        job = BackfillJob(region_codes, year_month_range(start_month, end_month), job_id=job_id, refresh=refresh)
+
+    _jobs[job.job_id] = job
+    _job_tasks[job.job_id] = asyncio.create_task(_run_and_release(job))
+    return job
+
+
+def get_backfill(job_id: str) -> Optional[BackfillJob]:
+    """작업을 조회합니다. 프로세스에 없으면 체크포인트에서 읽어옵니다."""
+    return _jobs.get(job_id) or BackfillJob.load(job_id)
+
+
+def list_backfills() -> List[Dict[str, Any]]:
+    """체크포인트가 있는 모든 작업의 진행 상황"""
+    job_ids = [name[:-5] for name in os.listdir(checkpoint_dir()) if name.endswith('.json')]
+    jobs = [get_backfill(job_id) for job_id in job_ids]
+    return sorted((job.progress() for job in jobs if job), key=lambda item: item["job_id"])
+
+
+def resume_backfills() -> List[str]:
+    """중단된(running/pending 상태로 남은) 작업들을 이어서 실행합니다."""
+    resumed = []
+    for name in os.listdir(checkpoint_dir()):
+        if not name.endswith('.json'):
+            continue
+        job = BackfillJob.load(name[:-5])
+        if job and job.status in ("pending", "running"):
+            start_backfill(job.region_codes, job.year_months[0], job.year_months[-1], job_id=job.job_id)
+            resumed.append(job.job_id)
+
+    if resumed:
+        logger.info(f"📦 중단된 백필 작업 재개: {resumed}")
+    return resumed
+
+
+async def _run_and_release(job: BackfillJob):
+    """작업을 실행하고 작업 전용 MCP 서버 프로세스를 정리합니다."""
+    try:
+        await job.run()
+    finally:
+        if job.mcp_client:
+            await job.mcp_client.shutdown_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="부동산 거래 데이터 백필")
+    parser.add_argument("--regions", required=True, help="쉼표로 구분한 지역코드 (예: 11680,11650)")
+    parser.add_argument("--start", required=True, help="시작 년월 (YYYYMM)")
+    parser.add_argument("--end", required=True, help="종료 년월 (YYYYMM)")
+    parser.add_argument("--job-id", help="체크포인트 ID - 같은 ID로 다시 실행하면 이어서 진행")
+    parser.add_argument("--refresh", action="store_true", help="이미 저장된 월도 다시 수집")
+    parser.add_argument("--concurrency", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    async def run():
+        job = BackfillJob.load(args.job_id, concurrency=args.concurrency) if args.job_id else None
+        if job is None:
+            job = BackfillJob(
+                [code.strip() for code in args.regions.split(",") if code.strip()],
+                year_month_range(args.start, args.end),
+                job_id=args.job_id,
+                refresh=args.refresh,
+                concurrency=args.concurrency
+            )
+        print(f"📦 백필 작업 ID: {job.job_id}")
+        try:
+            return await job.run()
+        finally:
+            if job.mcp_client:
+                await job.mcp_client.shutdown_all()
+
+    print(json.dumps(asyncio.run(run()), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
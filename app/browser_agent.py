@@ -13,6 +13,9 @@ from typing import Dict, Any, List, Optional
 import logging
 from dataclasses import dataclass
 
+from .browser_pool import get_browser_pool, playwright_available
+from .utils.html_inspection import inspect_html
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,136 +37,36 @@ class BrowserAgent:
     """브라우저에서 HTML 테스트하는 에이전트"""
     
     def __init__(self):
+        self.browser_pool = get_browser_pool()
         self.has_playwright = self._check_playwright()
+        # 스크린샷은 디버깅용 - 검사마다 전체 페이지를 찍으면 느려지므로 기본 비활성
+        self.save_screenshots = os.getenv('BROWSER_SCREENSHOTS', 'false').lower() == 'true'
     
     def _check_playwright(self) -> bool:
         """Playwright 설치 여부 확인"""
-        try:
-            import playwright
+        if playwright_available():
             return True
-        except ImportError:
-            logger.warning("Playwright가 설치되지 않음. 기본 검증만 수행")
-            return False
+        logger.warning("Playwright가 설치되지 않음. 기본 검증만 수행")
+        return False
     
     async def test_html_in_browser(self, html_content: str) -> BrowserTestResult:
-        """브라우저에서 HTML 테스트"""
+        """브라우저에서 HTML 테스트 (상시 실행 브라우저의 컨텍스트를 재사용)"""
         
-        if not self.has_playwright:
+        if not self.has_playwright or not self.browser_pool.enabled:
             return await self._basic_html_validation(html_content)
         
+        screenshot_path = None
+        if self.save_screenshots:
+            fd, screenshot_path = tempfile.mkstemp(suffix='_screenshot.png')
+            os.close(fd)
+        
         try:
-            from playwright.async_api import async_playwright
-            
-            async with async_playwright() as p:
-                # 브라우저 실행 (headless)
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
-                # 콘솔 로그 및 오류 수집
-                console_logs = []
-                javascript_errors = []
-                
-                page.on("console", lambda msg: console_logs.append(f"{msg.type}: {msg.text}"))
-                page.on("pageerror", lambda err: javascript_errors.append(str(err)))
-                
-                # 임시 HTML 파일 생성
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-                    f.write(html_content)
-                    temp_path = f.name
-                
-                try:
-                    # HTML 로드
-                    await page.goto(f"file://{temp_path}")
-                    
-                    # 페이지 로딩 대기
-                    await page.wait_for_timeout(3000)
-                    
-                    # Chart.js 로딩 확인
-                    chart_loaded = await page.evaluate("typeof Chart !== 'undefined'")
-                    
-                    # 차트 요소 확인
-                    chart_elements = await page.query_selector_all("canvas")
-                    chart_count = len(chart_elements)
-                    
-                    # 차트 렌더링 확인
-                    chart_errors = []
-                    chart_rendered_count = 0
-                    
-                    for i, canvas in enumerate(chart_elements):
-                        try:
-                            # 캔버스가 그려졌는지 확인
-                            canvas_data = await canvas.evaluate("el => el.toDataURL()")
-                            if canvas_data and len(canvas_data) > 100:  # 기본 빈 캔버스보다 크면 렌더링됨
-                                chart_rendered_count += 1
-                        except Exception as e:
-                            chart_errors.append(f"차트 {i+1} 렌더링 오류: {str(e)}")
-                    
-                    # 데이터 확인
-                    data_elements = await page.query_selector_all(".stat-number, .stat-change")
-                    data_populated = len(data_elements) > 0
-                    
-                    # 수치 데이터 확인
-                    stat_numbers = await page.evaluate("""
-                        Array.from(document.querySelectorAll('.stat-number')).map(el => el.textContent.trim())
-                    """)
-                    
-                    has_data = any(
-                        num and num != "0" and num != "N/A" and not num.startswith("예시")
-                        for num in stat_numbers
-                    )
-                    
-                    # 스크린샷 촬영
-                    screenshot_path = temp_path.replace('.html', '_screenshot.png')
-                    await page.screenshot(path=screenshot_path, full_page=True)
-                    
-                    # 검증 결과 생성
-                    suggestions = []
-                    
-                    if not chart_loaded:
-                        suggestions.append("Chart.js 라이브러리가 로드되지 않았습니다")
-                    
-                    if chart_count == 0:
-                        suggestions.append("차트 요소(canvas)가 없습니다")
-                    
-                    if chart_rendered_count < chart_count:
-                        suggestions.append(f"차트 {chart_count}개 중 {chart_rendered_count}개만 렌더링됨")
-                    
-                    if not has_data:
-                        suggestions.append("데이터 대신 예시/기본값이 표시되고 있습니다")
-                    
-                    if javascript_errors:
-                        suggestions.append("JavaScript 오류가 발생했습니다")
-                    
-                    success = (
-                        chart_loaded and 
-                        chart_count > 0 and 
-                        chart_rendered_count == chart_count and 
-                        has_data and 
-                        len(javascript_errors) == 0
-                    )
-                    
-                    return BrowserTestResult(
-                        success=success,
-                        html_loads=True,
-                        javascript_errors=javascript_errors,
-                        chart_elements_found=chart_count,
-                        chart_errors=chart_errors,
-                        data_populated=has_data,
-                        console_logs=console_logs[-10:],  # 최근 10개만
-                        suggestions=suggestions,
-                        screenshot_path=screenshot_path
-                    )
-                
-                finally:
-                    await browser.close()
-                    # 임시 파일 정리
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
-                        
+            checked = await self.browser_pool.check(html_content, screenshot_path=screenshot_path)
         except Exception as e:
             logger.error(f"브라우저 테스트 실패: {e}")
+            if self.browser_pool.failed:
+                # 브라우저를 띄울 수 없는 환경 - 기본 검증으로 대체
+                return await self._basic_html_validation(html_content)
             return BrowserTestResult(
                 success=False,
                 html_loads=False,
@@ -174,6 +77,64 @@ class BrowserAgent:
                 console_logs=[],
                 suggestions=["브라우저 테스트 실행 실패"]
             )
+        
+        chart_loaded = checked["chart_loaded"]
+        javascript_errors = checked["javascript_errors"]
+        
+        # 차트 렌더링 확인 - 기본 빈 캔버스보다 크면 렌더링됨
+        chart_count = len(checked["canvas_sizes"])
+        chart_errors = [f"차트 {i+1} 렌더링 오류" for i, size in enumerate(checked["canvas_sizes"]) if size < 0]
+        chart_rendered_count = sum(1 for size in checked["canvas_sizes"] if size > 100)
+        
+        # 수치 데이터 확인
+        has_data = any(
+            num and num != "0" and num != "N/A" and not num.startswith("예시")
+            for num in checked["stat_numbers"]
+        )
+        
+        # 검증 결과 생성
+        suggestions = []
+        
+        if not chart_loaded:
+            suggestions.append("Chart.js 라이브러리가 로드되지 않았습니다")
+        
+        if chart_count == 0:
+            suggestions.append("차트 요소(canvas)가 없습니다")
+        
+        if chart_rendered_count < chart_count:
+            suggestions.append(f"차트 {chart_count}개 중 {chart_rendered_count}개만 렌더링됨")
+        
+        if not has_data:
+            suggestions.append("데이터 대신 예시/기본값이 표시되고 있습니다")
+        
+        if javascript_errors:
+            suggestions.append("JavaScript 오류가 발생했습니다")
+        
+        success = (
+            chart_loaded and 
+            chart_count > 0 and 
+            chart_rendered_count == chart_count and 
+            has_data and 
+            len(javascript_errors) == 0
+        )
+        
+        logger.info(f"브라우저 테스트 완료: {checked['duration_seconds']}초 (차트 {chart_rendered_count}/{chart_count})")
+        
+        return BrowserTestResult(
+            success=success,
+            html_loads=True,
+            javascript_errors=javascript_errors,
+            chart_elements_found=chart_count,
+            chart_errors=chart_errors,
+            data_populated=has_data,
+            console_logs=checked["console_logs"][-10:],  # 최근 10개만
+            suggestions=suggestions,
+            screenshot_path=screenshot_path
+        )
+    
+    async def test_html_batch(self, html_contents: List[str]) -> List[BrowserTestResult]:
+        """여러 HTML을 브라우저 컨텍스트별로 동시에 테스트합니다. (풀 크기만큼 병렬)"""
+        return list(await asyncio.gather(*(self.test_html_in_browser(html) for html in html_contents)))
     
     async def _basic_html_validation(self, html_content: str) -> BrowserTestResult:
         """기본적인 HTML 검증 (Playwright 없을 때)"""
@@ -181,36 +142,43 @@ class BrowserAgent:
         suggestions = []
         javascript_errors = []
         
+        # 구조/차트/데이터 채움을 파서 한 번 순회로 검사 (같은 내용은 캐시)
+        inspection = inspect_html(html_content)
+        
         # 기본 구조 확인
-        if not html_content.startswith('<!DOCTYPE'):
+        if not inspection.has_doctype:
             suggestions.append("DOCTYPE 선언이 없습니다")
         
         # Chart.js 확인
-        if 'chart.js' not in html_content.lower():
+        if not inspection.chart_library:
             suggestions.append("Chart.js 라이브러리가 포함되지 않았습니다")
         
         # 차트 요소 확인
-        chart_count = html_content.count('<canvas')
+        chart_count = inspection.canvas_count
         if chart_count == 0:
             suggestions.append("차트 요소(canvas)가 없습니다")
         
         # JavaScript 오류 가능성 확인
-        if 'new Chart(' in html_content and 'chart.js' not in html_content.lower():
+        if inspection.chart_constructors and not inspection.chart_library:
             javascript_errors.append("Chart.js 없이 new Chart() 사용")
+        if inspection.unclosed_scripts:
+            javascript_errors.append("script 태그가 제대로 닫히지 않았습니다")
         
         # 예시 데이터 확인
-        if '예시' in html_content or '가정' in html_content:
+        if inspection.has_example_data:
             suggestions.append("예시 데이터가 포함되어 있습니다")
+        if not inspection.data_populated:
+            suggestions.append("데이터 대신 예시/기본값이 표시되고 있습니다")
         
-        success = len(suggestions) == 0 and len(javascript_errors) == 0
+        success = len(suggestions) == 0 and len(javascript_errors) == 0 and not inspection.chart_errors
         
         return BrowserTestResult(
             success=success,
             html_loads=True,
             javascript_errors=javascript_errors,
             chart_elements_found=chart_count,
-            chart_errors=[],
-            data_populated=True,  # 기본 검증에서는 확인 불가
+            chart_errors=list(inspection.chart_errors),
+            data_populated=inspection.data_populated,
             console_logs=[],
             suggestions=suggestions
         )
@@ -0,0 +1,251 @@
+"""
+헤드리스 브라우저 풀
+Chromium 하나를 띄워 두고 컨텍스트/페이지 여러 개를 재사용해 리포트 HTML을 set_content로 불러오며, 고정 대기 대신 Chart.js 렌더링 완료를 기다림 (Playwright가 없으면 사용하지 않음)
+"""
+
+import asyncio
+import logging
+import mimetypes
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 리포트 문서의 기준 URL - /static/..., /reports/objects/... 같은 상대 경로를 로컬 파일로 응답하기 위한 가상 출처
+BASE_URL = "http://report.local/"
+STATIC_DIR = os.path.abspath(os.getenv("BROWSER_STATIC_DIR", "static"))
+# URL 경로 접두사 → 로컬 디렉터리 (리포트 데이터 sidecar는 저장소 objects/ 아래)
+LOCAL_DIRS = {
+    "static/": STATIC_DIR,
+    "reports/objects/": os.path.join(os.path.abspath(os.getenv("REPORTS_PATH", "./reports")), "objects"),
+}
+# 화면 밖 차트도 바로 그리도록 리포트 로더(whenVisible)에 알림 - 전체 차트 렌더링을 검사하기 위함
+EAGER_CHARTS_SCRIPT = "window.REPORT_EAGER_CHARTS = true;"
+
+# 문서 로드가 끝나고 Chart.js 차트가 모두 그려졌는지 (애니메이션 종료) 확인하는 조건
+READY_PREDICATE = """() => {
+    if (document.readyState !== 'complete') return false;
+    if (typeof Chart === 'undefined') return true;
+    const charts = Object.values(Chart.instances || {});
+    if (charts.length < document.querySelectorAll('canvas').length) return false;
+    const animator = Chart.animator;
+    return charts.every(chart => !(animator && animator.running && animator.running(chart)));
+}"""
+
+# 검사 항목을 한 번의 evaluate로 모음
+COLLECT_SCRIPT = """() => {
+    const canvases = Array.from(document.querySelectorAll('canvas'));
+    return {
+        chart_loaded: typeof Chart !== 'undefined',
+        canvas_sizes: canvases.map(canvas => {
+            try { return canvas.toDataURL().length; } catch (e) { return -1; }
+        }),
+        stat_numbers: Array.from(document.querySelectorAll('.stat-number')).map(el => el.textContent.trim())
+    };
+}"""
+
+
+def playwright_available() -> bool:
+    """Playwright 설치 여부"""
+    try:
+        import playwright.async_api  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class BrowserSlot:
+    """컨텍스트 하나와 그 페이지 - 한 번에 검사 하나만 처리"""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.console_logs: List[str] = []
+        self.javascript_errors: List[str] = []
+        self.uses = 0
+        page.on("console", lambda msg: self.console_logs.append(f"{msg.type}: {msg.text}"))
+        page.on("pageerror", lambda err: self.javascript_errors.append(str(err)))
+
+    def reset(self):
+        """이전 검사의 로그를 비웁니다."""
+        self.console_logs = []
+        self.javascript_errors = []
+
+
+class BrowserPool:
+    """Chromium 하나와 재사용 컨텍스트 풀 - 유휴 컨텍스트가 없으면 대기열에서 기다림"""
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size if size is not None else int(os.getenv('BROWSER_POOL_SIZE', '2'))
+        self.ready_timeout_ms = int(os.getenv('BROWSER_READY_TIMEOUT_MS', '5000'))
+        # 컨텍스트 하나를 이 횟수만큼 쓰면 새로 만듦 (캐시/메모리 누적 방지)
+        self.max_uses = int(os.getenv('BROWSER_CONTEXT_MAX_USES', '50'))
+        self._playwright = None
+        self._browser = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self.failed = False
+        self.tests = 0
+        self.total_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Playwright가 설치되어 있고 브라우저 시작에 실패하지 않았는지"""
+        return self.size > 0 and not self.failed and playwright_available()
+
+    async def check(self, html_content: str, screenshot_path: Optional[str] = None) -> Dict[str, Any]:
+        """HTML을 불러와 차트 렌더링까지 기다린 뒤 검사 결과를 돌려줍니다.
+
+        결과: chart_loaded, canvas_sizes, stat_numbers, console_logs, javascript_errors, ready, duration_seconds
+        """
+        started = time.monotonic()
+        async with self._slot() as slot:
+            page = slot.page
+            await page.set_content(html_content, wait_until="load", timeout=self.ready_timeout_ms * 2)
+
+            ready = True
+            try:
+                await page.wait_for_function(READY_PREDICATE, timeout=self.ready_timeout_ms, polling="raf")
+            except Exception as e:
+                # 차트가 없는 canvas나 끝나지 않는 애니메이션 - 현재 상태로 검사
+                ready = False
+                logger.info(f"차트 렌더링 대기 시간 초과: {type(e).__name__}")
+
+            result = await page.evaluate(COLLECT_SCRIPT)
+            if screenshot_path:
+                await page.screenshot(path=screenshot_path, full_page=True)
+
+            result.update({
+                "console_logs": list(slot.console_logs),
+                "javascript_errors": list(slot.javascript_errors),
+                "ready": ready,
+            })
+
+        elapsed = time.monotonic() - started
+        self.tests += 1
+        self.total_seconds += elapsed
+        result["duration_seconds"] = round(elapsed, 3)
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        """브라우저 풀 상태"""
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "started": self._idle is not None,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "tests": self.tests,
+            "avg_seconds": round(self.total_seconds / self.tests, 3) if self.tests else 0.0
+        }
+
+    async def close(self):
+        """컨텍스트와 브라우저를 종료합니다."""
+        async with self._start_lock:
+            if self._idle is not None:
+                while not self._idle.empty():
+                    slot = self._idle.get_nowait()
+                    await self._close_slot(slot)
+                self._idle = None
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    logger.warning(f"⚠️ 브라우저 종료 실패: {e}")
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    @asynccontextmanager
+    async def _slot(self):
+        """유휴 슬롯 하나를 빌립니다. 오류가 난 슬롯은 새 컨텍스트로 바꿔 돌려놓습니다."""
+        await self._ensure_started()
+        slot = await self._idle.get()
+        replace = False
+        try:
+            if slot is None or not self._browser.is_connected():
+                slot = await self._new_slot()
+            slot.reset()
+            slot.uses += 1
+            yield slot
+            replace = slot.uses >= self.max_uses
+        except BaseException:
+            # 페이지 상태를 알 수 없으므로 버림
+            replace = True
+            raise
+        finally:
+            if replace and slot is not None:
+                await self._close_slot(slot)
+                slot = None
+            # None이면 다음 사용 때 새로 만듦
+            self._idle.put_nowait(slot)
+
+    async def _ensure_started(self):
+        """처음 사용할 때 브라우저와 컨텍스트를 띄웁니다."""
+        async with self._start_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            from playwright.async_api import async_playwright
+
+            try:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            except Exception:
+                # 브라우저 바이너리가 없는 경우 등 - 이후에는 기본 검증 사용
+                self.failed = True
+                raise
+
+            slots = await asyncio.gather(*(self._new_slot() for _ in range(self.size)))
+            self._idle = asyncio.Queue()
+            for slot in slots:
+                self._idle.put_nowait(slot)
+            logger.info(f"🌐 헤드리스 브라우저 풀 준비 (컨텍스트 {self.size}개)")
+
+    async def _new_slot(self) -> BrowserSlot:
+        """새 컨텍스트/페이지를 만들고 기준 URL 문서를 엽니다."""
+        context = await self._browser.new_context(viewport={"width": 1280, "height": 900})
+        await context.add_init_script(EAGER_CHARTS_SCRIPT)
+        await context.route(f"{BASE_URL}**", self._serve_local)
+        page = await context.new_page()
+        await page.goto(BASE_URL)
+        return BrowserSlot(context, page)
+
+    async def _close_slot(self, slot: BrowserSlot):
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    async def _serve_local(self, route):
+        """기준 URL 아래 요청 - 빈 문서 또는 static/, 리포트 데이터 파일로 응답"""
+        path = route.request.url[len(BASE_URL):].split("?")[0].split("#")[0]
+        if not path:
+            await route.fulfill(status=200, content_type="text/html", body="<!DOCTYPE html><html></html>")
+            return
+
+        file_path = None
+        for prefix, directory in LOCAL_DIRS.items():
+            if path.startswith(prefix):
+                candidate = os.path.abspath(os.path.join(directory, path[len(prefix):]))
+                if os.path.commonpath([candidate, directory]) == directory:
+                    file_path = candidate
+                break
+        if not file_path or not os.path.isfile(file_path):
+            await route.fulfill(status=404, body="")
+            return
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        await route.fulfill(status=200, content_type=content_type, path=file_path)
+
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """프로세스 전역 브라우저 풀"""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
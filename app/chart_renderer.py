@@ -0,0 +1,260 @@
+"""
+서버 측 정적 차트 렌더러
+matplotlib로 SVG/PNG 차트를 프로세스 풀에서 그려 이벤트 루프를 막지 않고, 데이터 해시로 캐시해 리포트에 바로 삽입 (JavaScript 없이 오프라인에서 표시)
+"""
+
+import asyncio
+import base64
+import hashlib
+import html
+import json
+import logging
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FONT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "static", "fonts"))
+FONT_FAMILIES = ["Noto Sans KR", "Noto Sans CJK KR", "NanumGothic", "Malgun Gothic", "Apple SD Gothic Neo", "DejaVu Sans"]
+PALETTE = ["#3498db", "#e74c3c", "#2ecc71", "#9b59b6", "#f39c12", "#1abc9c"]
+CHART_TYPES = {"line", "bar", "barh"}
+
+
+def _init_worker(font_dir: str):
+    """작업 프로세스 초기화 - Agg 백엔드와 한글 글꼴 등록"""
+    os.environ["MPLBACKEND"] = "Agg"
+    import matplotlib
+    from matplotlib import font_manager
+
+    matplotlib.use("Agg")
+    # SVG는 글자를 텍스트로 내보내 브라우저 글꼴로 표시되므로 한글 글꼴이 없는 서버에서도 경고만 생략
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+    bundled = []
+    if os.path.isdir(font_dir):
+        # 번들 글꼴은 파일 내부 이름(AppleSDGothicNeoR00 등)으로 등록되므로 regular 하나의 이름을 앞에 둠
+        for name in sorted(os.listdir(font_dir), key=lambda name: ("regular" not in name, name)):
+            if name.endswith((".ttf", ".otf")):
+                path = os.path.join(font_dir, name)
+                try:
+                    font_manager.fontManager.addfont(path)
+                    bundled.append(font_manager.FontProperties(fname=path).get_name())
+                except Exception:
+                    pass
+    matplotlib.rcParams.update({
+        "font.family": "sans-serif",
+        "font.sans-serif": list(dict.fromkeys(bundled[:1] + FONT_FAMILIES)),
+        "axes.unicode_minus": False,
+        # SVG 글자는 글꼴을 경로로 바꾸지 않고 텍스트로 둠 (크기 축소, 리포트 글꼴 사용)
+        "svg.fonttype": "none",
+        # 같은 데이터는 같은 바이트가 나오도록 id 고정
+        "svg.hashsalt": "report-chart",
+    })
+
+
+def _render_chart(spec: Dict[str, Any]) -> bytes:
+    """작업 프로세스에서 차트 하나를 그려 SVG/PNG 바이트를 돌려줍니다."""
+    import io
+
+    import matplotlib.pyplot as plt
+
+    width, height = spec.get("size", [8, 3.6])
+    fig, ax = plt.subplots(figsize=(width, height), dpi=spec.get("dpi", 110))
+    try:
+        labels = spec["labels"]
+        series = spec["series"]
+        positions = range(len(labels))
+        chart_type = spec["type"]
+
+        for index, item in enumerate(series):
+            color = item.get("color") or PALETTE[index % len(PALETTE)]
+            values = [value if value is not None else float("nan") for value in item["values"]]
+            if chart_type == "line":
+                ax.plot(positions, values, marker="o" if len(labels) <= 36 else None, color=color, label=item.get("label"))
+            else:
+                # 여러 계열이면 나란히 배치
+                width_each = 0.8 / len(series)
+                offsets = [position - 0.4 + width_each * (index + 0.5) for position in positions]
+                if chart_type == "barh":
+                    ax.barh(offsets, values, height=width_each, color=color, label=item.get("label"))
+                else:
+                    ax.bar(offsets, values, width=width_each, color=color, label=item.get("label"))
+
+        if chart_type == "barh":
+            ax.set_yticks(list(positions), labels)
+            ax.invert_yaxis()
+        else:
+            # 라벨이 많으면 일부만 표시
+            step = max(1, len(labels) // 12)
+            rotate = step > 1 or len(labels) > 8
+            ax.set_xticks(list(positions)[::step], labels[::step], rotation=45 if rotate else 0, ha="right" if rotate else "center")
+        ax.set_title(spec.get("title", ""))
+        if spec.get("unit"):
+            (ax.set_xlabel if chart_type == "barh" else ax.set_ylabel)(spec["unit"])
+        ax.grid(axis="x" if chart_type == "barh" else "y", alpha=0.3)
+        ax.spines[["top", "right"]].set_visible(False)
+        if len(series) > 1:
+            ax.legend(frameon=False)
+        fig.tight_layout()
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=spec["format"], metadata={"Date": None} if spec["format"] == "svg" else None)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+@lru_cache(maxsize=None)
+def matplotlib_available() -> bool:
+    """matplotlib 설치 여부"""
+    try:
+        import matplotlib  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ChartRenderer:
+    """정적 차트 렌더러 - 작업 프로세스 풀에서 그리고 결과는 데이터 해시별 파일로 캐시"""
+
+    def __init__(self, workers: Optional[int] = None, cache_dir: Optional[str] = None):
+        self.workers = workers if workers is not None else int(os.getenv('CHART_RENDER_WORKERS', '2'))
+        self.format = os.getenv('CHART_RENDER_FORMAT', 'svg').lower()
+        self.cache_dir = cache_dir or os.path.join(os.getenv('CACHE_PATH', './cache'), 'charts')
+        self.timeout = float(os.getenv('CHART_RENDER_TIMEOUT', '30'))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.rendered = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        """작업 수가 0이거나 matplotlib가 없으면 차트 없이 리포트 생성"""
+        return (
+            self.workers > 0
+            and self.format in ("svg", "png")
+            and os.getenv('CHART_RENDER_ENABLED', 'true').lower() == 'true'
+            and matplotlib_available()
+        )
+
+    def chart_spec(
+        self,
+        chart_type: str,
+        title: str,
+        labels: List[Any],
+        series: List[Dict[str, Any]],
+        unit: str = ""
+    ) -> Dict[str, Any]:
+        """차트 명세를 만듭니다. series: [{"label": ..., "values": [...]}]"""
+        if chart_type not in CHART_TYPES:
+            raise ValueError(f"지원하지 않는 차트 유형: {chart_type}")
+        return {
+            "type": chart_type,
+            "title": title,
+            "labels": [str(label) for label in labels],
+            # numpy 값도 해시/직렬화할 수 있도록 float로 변환
+            "series": [
+                {"label": item.get("label", ""), "values": [None if value is None else float(value) for value in item["values"]]}
+                for item in series
+            ],
+            "unit": unit,
+            "format": self.format,
+            # barh는 항목 수에 맞춰 높이를 늘림
+            "size": [8, max(3.6, 0.28 * len(labels))] if chart_type == "barh" else [8, 3.6],
+        }
+
+    async def render(self, spec: Dict[str, Any]) -> Optional[bytes]:
+        """차트를 그립니다. 같은 명세는 캐시 파일을 그대로 돌려주고, 실패하면 None"""
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"{digest}.{spec['format']}")
+
+        try:
+            with open(cache_path, 'rb') as f:
+                self.cache_hits += 1
+                return f.read()
+        except OSError:
+            pass
+
+        try:
+            loop = asyncio.get_running_loop()
+            data = await asyncio.wait_for(loop.run_in_executor(self._get_executor(), _render_chart, spec), self.timeout)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"⚠️ 차트 렌더링 실패 ({spec.get('title')}): {type(e).__name__} {e}")
+            if self._executor is not None and getattr(self._executor, "_broken", False):
+                # 작업 프로세스가 죽으면 풀을 다시 만듦
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            return None
+
+        self.rendered += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ 차트 캐시 저장 실패: {e}")
+        return data
+
+    async def render_html(self, spec: Dict[str, Any]) -> str:
+        """차트를 리포트에 넣을 HTML 조각으로 돌려줍니다. (SVG는 인라인, PNG는 data URI / 실패하면 빈 문자열)"""
+        data = await self.render(spec)
+        if data is None:
+            return ""
+        title = html.escape(spec.get("title", ""))
+        if spec["format"] == "svg":
+            svg = data.decode('utf-8')
+            svg = svg[svg.find("<svg"):]
+            return f'<figure class="static-chart" role="img" aria-label="{title}">{svg}</figure>'
+        encoded = base64.b64encode(data).decode('ascii')
+        return f'<figure class="static-chart"><img src="data:image/png;base64,{encoded}" alt="{title}" style="max-width:100%"></figure>'
+
+    async def render_many(self, specs: List[Dict[str, Any]]) -> List[str]:
+        """여러 차트를 작업 프로세스에서 동시에 그립니다."""
+        return list(await asyncio.gather(*(self.render_html(spec) for spec in specs)))
+
+    def status(self) -> Dict[str, Any]:
+        """렌더러 상태"""
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "format": self.format,
+            "rendered": self.rendered,
+            "cache_hits": self.cache_hits,
+            "failures": self.failures
+        }
+
+    def close(self):
+        """작업 프로세스를 종료합니다."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """처음 사용할 때 작업 프로세스 풀을 만듭니다. (스레드가 있는 서버 프로세스를 fork하지 않도록 spawn)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(FONT_DIR,)
+            )
+        return self._executor
+
+
+_renderer: Optional[ChartRenderer] = None
+
+
+def get_chart_renderer() -> ChartRenderer:
+    """프로세스 전역 차트 렌더러"""
+    global _renderer
+    if _renderer is None:
+        _renderer = ChartRenderer()
+    return _renderer
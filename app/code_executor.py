@@ -1,15 +1,32 @@
 import tempfile
 import os
-import json
 import asyncio
 import logging
 import uuid
+import re
+import shutil
+import signal
 import subprocess
-from typing import Dict, Any, Optional
+import sys
+from functools import partial
+from typing import Dict, Any, Optional, Tuple
+from .context_handoff import LOADER_SOURCE, write_context
+from .report_catalog import record_report
+from .report_gc import get_report_gc
+from .sandbox_pool import get_execution_slots, get_interpreter_pool
+from .sandbox_worker import apply_limits
+from .utils.html_inspection import inspect_html
 from .utils.security import SecurityValidator
 
 logger = logging.getLogger(__name__)
 
+# 자원 한도 초과로 종료된 경우의 종료 코드 (시그널 번호의 음수)
+LIMIT_EXIT_CODES = {
+    -signal.SIGXCPU: "CPU 시간 한도 초과",
+    -signal.SIGXFSZ: "출력 파일 크기 한도 초과",
+    -signal.SIGKILL: "강제 종료 (CPU 시간 한도 초과 또는 메모리 부족)",
+}
+
 class CodeExecutor:
     """안전한 코드 실행 환경을 제공하는 클래스"""
     
@@ -18,6 +35,19 @@ class CodeExecutor:
         # 현재 작업 디렉토리 기준으로 reports 경로 설정
         self.reports_path = os.getenv('REPORTS_PATH', os.path.join(os.getcwd(), 'reports'))
         self.max_execution_time = int(os.getenv('MAX_EXECUTION_TIME', '300'))
+        # 허용 라이브러리를 미리 import한 작업자 풀 (CODE_WORKER_POOL_SIZE=0이면 실행마다 새 프로세스)
+        self.interpreter_pool = get_interpreter_pool(preload=self.security_validator.allowed_libraries)
+        # 동시 실행 슬롯 (슬롯이 모두 사용 중이면 대기)
+        self.execution_slots = get_execution_slots()
+        # 실행마다 적용하는 자원 한도 (0이면 적용하지 않음)
+        self.limits = {
+            "cpu_seconds": int(os.getenv('CODE_MAX_CPU_SECONDS', str(self.max_execution_time))),
+            "memory_bytes": int(os.getenv('CODE_MAX_MEMORY_MB', '2048')) * 1024 * 1024,
+            "open_files": int(os.getenv('CODE_MAX_OPEN_FILES', '256')),
+            "file_size_bytes": int(os.getenv('CODE_MAX_OUTPUT_MB', '50')) * 1024 * 1024,
+        }
+        # 실행별 작업 디렉터리 위치 - 메모리 기반 /dev/shm을 우선 사용
+        self.workdir_root = os.getenv('CODE_WORKDIR_ROOT') or ('/dev/shm' if os.access('/dev/shm', os.W_OK) else None)
         
         # 리포트 디렉토리 생성
         os.makedirs(self.reports_path, exist_ok=True)
@@ -30,6 +60,7 @@ class CodeExecutor:
     ) -> Dict[str, Any]:
         """격리된 환경에서 코드를 실행합니다."""
         
+        workdir = None
         try:
             # Python 코드가 있는지 확인
             python_code = code.get('python_code')
@@ -49,21 +80,20 @@ class CodeExecutor:
                     "output": ""
                 }
             
-            # 컨텍스트 데이터 파일 생성
-            context_file = f"/tmp/context_{session_id}.json"
-            logger.info(f"컨텍스트 데이터 저장 시작: {context_file}")
+            # 실행별 작업 디렉터리 - 동시 실행끼리 파일이 겹치지 않도록 분리하고 실행 후 삭제
+            workdir = tempfile.mkdtemp(prefix=f"exec_{re.sub(r'[^A-Za-z0-9_-]', '_', session_id)[:64]}_", dir=self.workdir_root)
+            
+            # 컨텍스트 데이터 파일 생성 - 큰 표 데이터는 컬럼별 .npy, 작은 값만 JSON
+            logger.info(f"컨텍스트 데이터 저장 시작: {workdir}")
             logger.info(f"컨텍스트 데이터 타입: {type(context_data)}, 키 개수: {len(context_data) if isinstance(context_data, dict) else 'N/A'}")
             
             try:
-                logger.info(f"JSON 덤프 시작, 데이터 타입: {type(context_data)}")
-                logger.info(f"JSON 덤프할 데이터 키: {list(context_data.keys()) if isinstance(context_data, dict) else 'N/A'}")
-                
-                with open(context_file, 'w', encoding='utf-8') as f:
-                    json.dump(context_data, f, ensure_ascii=False, indent=2)
-                logger.info(f"컨텍스트 데이터 저장 완료: {os.path.getsize(context_file)} bytes")
+                context_file = write_context(context_data, workdir)
+                logger.info(f"컨텍스트 데이터 저장 완료: JSON {os.path.getsize(context_file)} bytes")
             except (TypeError, ValueError) as e:
                 logger.error(f"JSON 직렬화 오류: {e}")
-                logger.error(f"문제가 된 데이터: {context_data}")
+                # 데이터 전체 대신 키별 타입만 기록 (큰 데이터가 로그에 복사되지 않도록)
+                logger.error(f"컨텍스트 값 타입: { {key: type(value).__name__ for key, value in context_data.items()} }")
                 raise
             except Exception as e:
                 logger.error(f"컨텍스트 데이터 저장 실패: {e}")
@@ -80,7 +110,7 @@ class CodeExecutor:
             )
             
             # 임시 스크립트 파일 생성
-            script_file = f"/tmp/script_{session_id}.py"
+            script_file = os.path.join(workdir, "script.py")
             logger.info(f"실행 스크립트 저장: {script_file}")
             
             with open(script_file, 'w', encoding='utf-8') as f:
@@ -91,29 +121,19 @@ class CodeExecutor:
             logger.info(f"생성된 스크립트 미리보기:\n{script_content[:500]}...")
             
             # 스크립트 실행
-            process = await asyncio.create_subprocess_exec(
-                'python', script_file,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=self.reports_path
-            )
-            
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=self.max_execution_time
-                )
-                
-                # 결과 처리
-                output = stdout.decode('utf-8')
-                error_output = stderr.decode('utf-8')
+                async with self.execution_slots.acquire() as waited:
+                    if waited > 1:
+                        logger.info(f"⏳ 실행 슬롯 대기: {waited:.1f}초")
+                    returncode, output, error_output = await self._run_script(script_file, workdir)
                 
-                if process.returncode == 0:
+                if returncode == 0:
                     # 성공 - 생성된 파일 확인
                     report_filename = f"report_{session_id}.html"
                     
                     # 여러 경로에서 파일 찾기
                     possible_paths = [
+                        os.path.join(workdir, report_filename),  # 실행 작업 디렉터리
                         os.path.join(self.reports_path, report_filename),  # /app/reports/
                         os.path.join("/reports", report_filename),  # /reports/
                         report_filename  # 현재 디렉토리
@@ -129,10 +149,11 @@ class CodeExecutor:
                         # 파일을 올바른 위치로 이동 (필요한 경우)
                         final_path = os.path.join(self.reports_path, report_filename)
                         if report_path != final_path:
-                            import shutil
                             shutil.move(report_path, final_path)
                             report_path = final_path
                         
+                        record_report(report_path, session_id=session_id, kind="code")
+                        
                         return {
                             "success": True,
                             "output": output,
@@ -154,31 +175,17 @@ class CodeExecutor:
                 else:
                     return {
                         "success": False,
-                        "error": f"코드 실행 실패 (종료 코드: {process.returncode})",
+                        "error": f"코드 실행 실패 (종료 코드: {returncode}{', ' + LIMIT_EXIT_CODES[returncode] if returncode in LIMIT_EXIT_CODES else ''})",
                         "output": output,
                         "stderr": error_output
                     }
                     
             except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
                 return {
                     "success": False,
                     "error": f"코드 실행 시간 초과 ({self.max_execution_time}초)",
                     "output": ""
                 }
-            finally:
-                # 디버깅을 위해 임시 파일 보존
-                logger.info(f"디버깅용 파일 보존:")
-                logger.info(f"  - 스크립트: {script_file}")
-                logger.info(f"  - 컨텍스트: {context_file}")
-                # 임시 파일 정리 (디버깅 시 주석 처리)
-                # try:
-                #     os.remove(script_file)
-                #     os.remove(context_file)
-                # except:
-                #     pass
-                    
         except Exception as e:
             logger.error(f"코드 실행 중 오류 발생: {e}")
             logger.error(f"오류 타입: {type(e).__name__}")
@@ -190,6 +197,39 @@ class CodeExecutor:
                 "error": f"코드 실행 중 오류: {str(e)}",
                 "output": ""
             }
+        finally:
+            # 작업 디렉터리 정리 (스크립트, 컨텍스트, 생성 중간 파일)
+            if workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+    
+    async def _run_script(self, script_file: str, workdir: str) -> Tuple[int, str, str]:
+        """스크립트를 자원 한도를 걸어 실행합니다. (종료 코드, 표준 출력, 표준 오류) - 시간 초과 시 asyncio.TimeoutError"""
+        if self.interpreter_pool.enabled:
+            # 라이브러리를 미리 import한 작업자에서 fork해 실행
+            result = await self.interpreter_pool.run(
+                script_file, cwd=workdir, timeout=self.max_execution_time, limits=self.limits
+            )
+            if result["timed_out"]:
+                raise asyncio.TimeoutError()
+            return result["returncode"], result["stdout"], result["stderr"]
+        
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, script_file,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=workdir,
+            preexec_fn=partial(apply_limits, self.limits)
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(),
+                timeout=self.max_execution_time
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, stdout.decode('utf-8'), stderr.decode('utf-8')
     
     def _create_simple_script(
         self, 
@@ -216,11 +256,11 @@ print(f"  - 세션 ID: {{SESSION_ID}}")
 print(f"  - 컨텍스트 파일: {context_file}")
 print(f"  - 현재 디렉토리: {{os.getcwd()}}")
 
-# 컨텍스트 데이터 로드
+# 컨텍스트 데이터 로드 (큰 표 데이터는 파싱 없이 memmap DataFrame/배열로)
+{LOADER_SOURCE}
 try:
     print(f"📂 컨텍스트 파일 존재 여부: {{os.path.exists('{context_file}')}}")
-    with open("{context_file}", "r", encoding="utf-8") as f:
-        context_data = json.load(f)
+    context_data = _load_context("{context_file}")
     print(f"✅ 컨텍스트 데이터 로드 성공: {{len(context_data)}}개 키")
     print(f"  - 데이터 키: {{list(context_data.keys())}}")
 except Exception as e:
@@ -272,21 +312,9 @@ except Exception as e:
         return os.path.join(self.reports_path, f"report_{session_id}.html")
     
     def cleanup_old_reports(self, max_age_hours: int = 24):
-        """오래된 리포트 파일을 정리합니다."""
+        """오래된 리포트와 임시 파일을 정리합니다. (카탈로그 기반 리포트 GC 사용)"""
         try:
-            import time
-            current_time = time.time()
-            max_age_seconds = max_age_hours * 3600
-            
-            for filename in os.listdir(self.reports_path):
-                if filename.startswith('report_') and filename.endswith('.html'):
-                    file_path = os.path.join(self.reports_path, filename)
-                    file_age = current_time - os.path.getmtime(file_path)
-                    
-                    if file_age > max_age_seconds:
-                        os.remove(file_path)
-                        logger.info(f"오래된 리포트 파일 삭제: {filename}")
-                        
+            return get_report_gc().collect(max_age_seconds=max_age_hours * 3600)
         except Exception as e:
             logger.error(f"리포트 파일 정리 실패: {e}")
     
@@ -311,19 +339,22 @@ except Exception as e:
                     "error": "리포트 파일이 비어있습니다."
                 }
             
-            if '<html' not in content.lower():
+            # 보안 검증 (<html> 태그 유무도 같은 패스에서 확인)
+            security_result = self.security_validator.validate_html_content(content)
+            
+            if not security_result["has_html"]:
                 return {
                     "valid": False,
                     "error": "유효한 HTML 구조가 아닙니다."
                 }
             
-            # 보안 검증
-            security_result = self.security_validator.validate_html_content(content)
-            
             return {
                 "valid": security_result["is_safe"],
                 "warnings": security_result.get("warnings", []),
                 "errors": security_result.get("errors", []),
+                "findings": security_result.get("findings", []),
+                # 보안 검증과 같은 검사 결과(캐시)에서 구조 문제도 함께 전달
+                "structure_errors": inspect_html(content).structure_errors(),
                 "file_size": len(content),
                 "content_preview": content[:200] + "..." if len(content) > 200 else content
             }
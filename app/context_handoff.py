@@ -0,0 +1,130 @@
+"""
+코드 실행 컨텍스트 데이터 전달
+큰 표 데이터는 컬럼별 NumPy .npy 파일(문자열은 사전 인코딩)로, 나머지 작은 값만 압축 JSON으로 저장해 실행 코드가 파싱 없이 memmap으로 읽도록 함
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_FILE = "context.json"
+# JSON에서 바이너리로 저장한 값의 위치를 담는 키
+BINARY_KEY = "__binary__"
+BINARY_DIR = "context"
+
+# 실행 스크립트에 들어가는 로더 - 바이너리 값은 memmap(copy-on-write)으로 열어 수정해도 파일은 바뀌지 않음
+LOADER_SOURCE = '''
+def _load_context(context_file):
+    with open(context_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    binary = data.pop("__binary__", {})
+    if binary:
+        import numpy as np
+        import pandas as pd
+    base = os.path.dirname(context_file)
+    for key, spec in binary.items():
+        path = os.path.join(base, spec["path"])
+        if spec["format"] == "array":
+            data[key] = np.load(path, mmap_mode="c")
+            continue
+        columns = {}
+        for column in spec["columns"]:
+            values = np.load(os.path.join(path, column["file"]), mmap_mode="c")
+            if column["kind"] == "dictionary":
+                with open(os.path.join(path, column["values"]), "r", encoding="utf-8") as f:
+                    # 코드 -1(결측)은 마지막에 붙인 None을 가리킴
+                    values = np.array(json.load(f) + [None], dtype=object)[values]
+            columns[column["name"]] = values
+        data[key] = pd.DataFrame(columns, copy=False)
+    return data
+'''
+
+
+def binary_min_rows() -> int:
+    """이 행 수 이상인 레코드 목록(dict 리스트)은 DataFrame으로 바이너리 저장"""
+    return int(os.getenv('CONTEXT_BINARY_MIN_ROWS', '1000'))
+
+
+def write_context(context_data: Dict[str, Any], directory: str) -> str:
+    """컨텍스트 데이터를 디렉터리에 저장하고 JSON 파일 경로를 돌려줍니다.
+
+    DataFrame, NumPy 배열, 큰 레코드 목록은 바이너리로 저장되어 실행 코드에서 DataFrame/배열로 열립니다.
+    """
+    small: Dict[str, Any] = {}
+    binary: Dict[str, Dict[str, Any]] = {}
+
+    for index, (key, value) in enumerate(context_data.items()):
+        relative_path = os.path.join(BINARY_DIR, str(index))
+        try:
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                os.makedirs(os.path.join(directory, BINARY_DIR), exist_ok=True)
+                np.save(os.path.join(directory, f"{relative_path}.npy"), value)
+                binary[key] = {"format": "array", "path": f"{relative_path}.npy", "shape": list(value.shape)}
+                continue
+
+            frame = _as_frame(value)
+            if frame is not None:
+                binary[key] = _write_frame(frame, directory, relative_path)
+                continue
+        except TypeError as e:
+            # 컬럼에 dict/list 같은 값이 있으면 JSON으로 전달
+            logger.info(f"컨텍스트 '{key}' 바이너리 저장 불가, JSON 사용: {e}")
+        small[key] = value
+
+    if binary:
+        small[BINARY_KEY] = binary
+    context_file = os.path.join(directory, CONTEXT_FILE)
+    with open(context_file, 'w', encoding='utf-8') as f:
+        json.dump(small, f, ensure_ascii=False, separators=(",", ":"))
+    return context_file
+
+
+def _as_frame(value: Any) -> Optional[pd.DataFrame]:
+    """표 형태 값이면 DataFrame으로 변환합니다."""
+    if isinstance(value, pd.DataFrame):
+        return value
+    if isinstance(value, list) and len(value) >= binary_min_rows() and all(isinstance(item, dict) for item in value):
+        return pd.DataFrame.from_records(value)
+    return None
+
+
+def _write_frame(frame: pd.DataFrame, directory: str, relative_path: str) -> Dict[str, Any]:
+    """DataFrame을 컬럼별 .npy로 저장합니다. (숫자/날짜/불리언은 그대로, 나머지는 int32 코드 + 값 목록)"""
+    frame_dir = os.path.join(directory, relative_path)
+    os.makedirs(frame_dir, exist_ok=True)
+    columns = []
+    for position, name in enumerate(frame.columns):
+        values = frame.iloc[:, position]
+        file_name = f"c{position}.npy"
+        column = {"name": name if isinstance(name, str) else str(name), "file": file_name}
+
+        array = None
+        if values.dtype.kind in "biufcmM":
+            array = values.to_numpy()
+        elif pd.api.types.is_numeric_dtype(values.dtype):
+            # nullable 정수/실수 확장 타입은 결측을 NaN으로
+            array = values.to_numpy(dtype="float64", na_value=np.nan)
+
+        # 시간대가 있는 날짜처럼 object 배열이 되는 컬럼은 memmap으로 열 수 없으므로 사전 인코딩
+        if array is not None and array.dtype != object:
+            np.save(os.path.join(frame_dir, file_name), array)
+            column["kind"] = "array"
+        else:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            uniques = [value.item() if isinstance(value, np.generic) else value for value in uniques]
+            if any(not isinstance(value, (str, int, float, bool)) for value in uniques):
+                raise TypeError(f"컬럼 '{name}'에 JSON 스칼라가 아닌 값이 있습니다.")
+            np.save(os.path.join(frame_dir, file_name), codes.astype("int32"))
+            column["kind"] = "dictionary"
+            column["values"] = f"c{position}.dict.json"
+            with open(os.path.join(frame_dir, column["values"]), 'w', encoding='utf-8') as f:
+                json.dump(uniques, f, ensure_ascii=False)
+        columns.append(column)
+
+    return {"format": "frame", "path": relative_path, "rows": len(frame), "columns": columns}
@@ -0,0 +1,160 @@
+"""
+대용량 도구 결과 요약기
+수천 건의 거래 레코드를 LLM에 그대로 넘기지 않고 통계 프로파일 + 대표 샘플로 축약
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.utils.trade_data import (
+    extract_records, is_data_path, is_trade_frame, read_trade_payload, to_json_safe, to_trade_frame
+)
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+class DataProfiler:
+    """레코드 집합을 크기가 제한된 프로파일과 대표 샘플로 축약하는 클래스"""
+
+    def __init__(
+        self,
+        min_records: Optional[int] = None,
+        sample_rows: Optional[int] = None,
+        top_k: Optional[int] = None,
+        max_chars: Optional[int] = None
+    ):
+        self.min_records = min_records or int(os.getenv('PROFILE_MIN_RECORDS', '200'))
+        self.sample_rows = sample_rows or int(os.getenv('PROFILE_SAMPLE_ROWS', '30'))
+        self.top_k = top_k or int(os.getenv('PROFILE_TOP_K', '10'))
+        self.max_chars = max_chars or int(os.getenv('PROFILE_MAX_CHARS', '12000'))
+
+    def profile(self, frame: pd.DataFrame) -> Dict[str, Any]:
+        """수치/범주/시간 축의 통계 프로파일을 계산합니다."""
+        profile: Dict[str, Any] = {"record_count": int(len(frame))}
+        if frame.empty:
+            return profile
+
+        numeric = frame.select_dtypes(include="number")
+        if not numeric.empty:
+            # 모든 수치 컬럼의 분위수를 한 번에 계산
+            quantiles = numeric.quantile(QUANTILES)
+            stats = numeric.agg(["count", "min", "max", "mean", "sum"])
+            profile["numeric"] = {
+                column: {
+                    **{stat: stats.at[stat, column] for stat in stats.index},
+                    **{f"p{int(q * 100)}": quantiles.at[q, column] for q in QUANTILES}
+                }
+                for column in numeric.columns
+            }
+
+        value_column = "deal_amount" if is_trade_frame(frame) else (numeric.columns[0] if not numeric.empty else None)
+        categorical = [
+            column for column in frame.columns
+            if frame[column].dtype == object and column != "year_month"
+        ]
+
+        profile["categories"] = {}
+        for column in categorical:
+            if frame[column].nunique(dropna=True) > len(frame) * 0.9:
+                continue  # 식별자성 컬럼은 제외
+            profile["categories"][column] = self._category_aggregates(frame, column, value_column)
+
+        if "year_month" in frame.columns:
+            profile["time_buckets"] = self._group_aggregates(frame, "year_month", value_column, sort_by_key=True)
+
+        if "apt_name" in frame.columns:
+            profile["top_complexes"] = self._category_aggregates(frame, "apt_name", value_column)
+
+        return to_json_safe(profile)
+
+    def sample(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """값 분포 전체를 대표하는 샘플 행을 선택합니다."""
+        if len(frame) <= self.sample_rows:
+            return frame
+
+        value_column = "deal_amount" if is_trade_frame(frame) else None
+        if value_column is None or frame[value_column].isna().all():
+            positions = np.linspace(0, len(frame) - 1, self.sample_rows).astype(int)
+            return frame.iloc[positions]
+
+        # 가격 순으로 정렬 후 등간격 선택 - 최저/최고가 행 포함
+        ordered = frame.sort_values(value_column, na_position="last", kind="stable")
+        positions = np.unique(np.linspace(0, frame[value_column].notna().sum() - 1, self.sample_rows).astype(int))
+        return ordered.iloc[positions]
+
+    def reduce(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """레코드 리스트를 프로파일 + 샘플 구조로 축약합니다."""
+        frame = to_trade_frame(records)
+        sample = self.sample(frame)
+
+        reduced = {
+            "data_profile": self.profile(frame),
+            "sample_records": to_json_safe(sample.astype(object).where(sample.notna(), None).to_dict("records")),
+            "record_count": len(records),
+            "note": f"전체 {len(records):,}건 중 통계 요약과 대표 샘플 {len(sample)}건만 포함되었습니다."
+        }
+
+        # 크기 제한을 넘으면 샘플부터 줄임
+        while len(json.dumps(reduced, ensure_ascii=False)) > self.max_chars and reduced["sample_records"]:
+            reduced["sample_records"] = reduced["sample_records"][::2][:-1] if len(reduced["sample_records"]) > 1 else []
+
+        return reduced
+
+    def reduce_tool_output(self, text: str) -> Optional[str]:
+        """대용량 도구 결과를 축약합니다. 축약 대상이 아니면 None을 반환합니다.
+
+        결과가 데이터 파일 경로(get_apt_trade_data)면 파일을 읽어 프로파일을 만들고, 다음 도구에 넘길 수 있도록 경로를 함께 둡니다.
+        """
+        stripped = text.strip()
+        file_path = stripped if is_data_path(stripped) else None
+        if file_path is None and (len(stripped) < self.max_chars or not stripped.startswith(('{', '['))):
+            return None
+
+        try:
+            records = extract_records(read_trade_payload(stripped))
+        except (ValueError, OSError):
+            # 찾을 수 없는 파일, JSON이 아닌 결과는 그대로 전달
+            return None
+
+        if len(records) < self.min_records:
+            return None
+
+        reduced = self.reduce(records)
+        if file_path:
+            reduced = {"file_path": file_path, **reduced}
+            reduced["note"] += " 원본 데이터는 file_path 파일에 있으며, 분석 도구에는 이 경로를 그대로 전달하세요."
+        reduced_text = json.dumps(reduced, ensure_ascii=False)
+        logger.info(f"📉 도구 결과 축약: {file_path or f'{len(stripped):,}자'} ({len(records):,}건) → {len(reduced_text):,}자")
+        return reduced_text
+
+    def _category_aggregates(self, frame: pd.DataFrame, column: str, value_column: Optional[str]) -> List[Dict[str, Any]]:
+        """범주별 건수 상위 k개와 집계값을 계산합니다."""
+        aggregates = self._group_aggregates(frame, column, value_column)
+        return aggregates[:self.top_k]
+
+    def _group_aggregates(
+        self,
+        frame: pd.DataFrame,
+        column: str,
+        value_column: Optional[str],
+        sort_by_key: bool = False
+    ) -> List[Dict[str, Any]]:
+        """그룹별 건수/평균/최소/최대를 계산합니다."""
+        grouped = frame.groupby(column, dropna=True)
+        if value_column:
+            table = grouped[value_column].agg(["count", "mean", "min", "max"])
+        else:
+            table = grouped.size().to_frame("count")
+
+        table = table.sort_index() if sort_by_key else table.sort_values("count", ascending=False)
+        return [
+            {column: key, **{stat: row[stat] for stat in table.columns}}
+            for key, row in table.iterrows()
+        ]
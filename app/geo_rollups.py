@@ -0,0 +1,251 @@
+"""
+지역 계층별 거래 집계 캐시
+동 → 시/군/구 → 시/도 → 전국 순으로 월별 합계를 SQLite에 저장하고, 한 파티션이 갱신되면 그 상위 경로만 다시 계산
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.utils.trade_data import to_json_safe
+
+logger = logging.getLogger(__name__)
+
+NATION_KEY = "KR"
+# 집계 단위 → 바로 아래 단위
+CHILD_LEVELS = {"nation": "sido", "sido": "sigungu", "sigungu": "dong"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    level TEXT NOT NULL,
+    key TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    year_month TEXT NOT NULL,
+    transactions INTEGER NOT NULL,
+    amount_sum REAL NOT NULL,
+    area_amount_sum REAL NOT NULL,
+    area_sum REAL NOT NULL,
+    max_price REAL,
+    min_price REAL,
+    partitions INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (level, key, year_month)
+);
+CREATE INDEX IF NOT EXISTS rollups_parent ON rollups (level, parent, year_month);
+"""
+
+# 구가 있는 시(예: 41130 성남시 → 41131/41133/41135)는 같은 달에 구 파티션이 있으면 시/도 합계에서 제외
+# (일반구 코드는 시 코드의 앞 4자리를 공유하고 시 코드만 0으로 끝남 - 둘 다 더하면 같은 거래가 두 번 집계됨)
+PARENT_CITY_FILTER = (
+    "AND NOT (substr(child.key, 5, 1) = '0' AND EXISTS ("
+    "SELECT 1 FROM rollups AS gu WHERE gu.level = child.level AND gu.parent = child.parent "
+    "AND gu.year_month = child.year_month AND substr(gu.key, 1, 4) = substr(child.key, 1, 4) "
+    "AND gu.key <> child.key)) "
+)
+
+# 평균은 합계/건수로 계산하므로 상위 단위는 하위 행의 합으로 정확히 다시 만들 수 있음
+ADDITIVE_COLUMNS = "transactions, amount_sum, area_amount_sum, area_sum, max_price, min_price, partitions"
+
+
+class GeoRollups:
+    """지역 계층/월 단위 거래 합계(건수, 거래금액, 면적)를 관리하는 클래스"""
+
+    def __init__(self, path: Optional[str] = None):
+        cache_path = os.getenv('CACHE_PATH', './cache')
+        self.path = path or os.path.join(cache_path, 'geo_rollups.sqlite')
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def update_partition(self, region_code: str, year_month: str, frame: pd.DataFrame) -> None:
+        """시/군/구 한 달치 파티션의 집계를 교체하고 시/도, 전국 집계를 다시 계산합니다."""
+        region_code = str(region_code)
+        sido_code = region_code[:2]
+        now = time.time()
+        dong_rows, total = self._leaf_rows(frame)
+
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "DELETE FROM rollups WHERE level = 'dong' AND parent = ? AND year_month = ?",
+                (region_code, year_month)
+            )
+            conn.executemany(
+                f"INSERT INTO rollups (level, key, parent, year_month, {ADDITIVE_COLUMNS}, updated_at) "
+                "VALUES ('dong', ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)",
+                [(f"{region_code}:{dong}", region_code, year_month, *stats, now) for dong, stats in dong_rows]
+            )
+            conn.execute(
+                f"INSERT OR REPLACE INTO rollups (level, key, parent, year_month, {ADDITIVE_COLUMNS}, updated_at) "
+                "VALUES ('sigungu', ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)",
+                (region_code, sido_code, year_month, *total, now)
+            )
+            # 갱신된 시/군/구에서 전국까지의 경로만 하위 행 합계로 다시 계산
+            for level, key, parent in (("sido", sido_code, NATION_KEY), ("nation", NATION_KEY, "")):
+                conn.execute(
+                    f"INSERT OR REPLACE INTO rollups (level, key, parent, year_month, {ADDITIVE_COLUMNS}, updated_at) "
+                    "SELECT ?, ?, ?, year_month, SUM(transactions), SUM(amount_sum), SUM(area_amount_sum), "
+                    "SUM(area_sum), MAX(max_price), MIN(min_price), SUM(partitions), ? "
+                    "FROM rollups AS child WHERE level = ? AND parent = ? AND year_month = ? "
+                    f"{PARENT_CITY_FILTER if level == 'sido' else ''}GROUP BY year_month",
+                    (level, key, parent, now, CHILD_LEVELS[level], key, year_month)
+                )
+
+    def trend(
+        self,
+        level: str,
+        key: str,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """한 지역 단위의 월별 집계 (monthly_data 형식)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT year_month, {ADDITIVE_COLUMNS} FROM rollups "
+                "WHERE level = ? AND key = ? AND year_month BETWEEN ? AND ? ORDER BY year_month",
+                (level, key, start_month or "000000", end_month or "999999")
+            ).fetchall()
+        return [{"month": row[0], **self._summary(row[1:])} for row in rows]
+
+    def summary(
+        self,
+        level: str,
+        key: str,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """한 지역 단위의 기간 전체 합계"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT SUM(transactions), SUM(amount_sum), SUM(area_amount_sum), SUM(area_sum), "
+                "MAX(max_price), MIN(min_price), SUM(partitions) FROM rollups "
+                "WHERE level = ? AND key = ? AND year_month BETWEEN ? AND ?",
+                (level, key, start_month or "000000", end_month or "999999")
+            ).fetchone()
+        return self._summary(row)
+
+    def breakdown(
+        self,
+        level: str,
+        key: str,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """한 지역 단위 바로 아래 단위들의 기간 합계 - 평균가 내림차순"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, SUM(transactions), SUM(amount_sum), SUM(area_amount_sum), SUM(area_sum), "
+                "MAX(max_price), MIN(min_price), SUM(partitions) FROM rollups "
+                "WHERE level = ? AND parent = ? AND year_month BETWEEN ? AND ? GROUP BY key",
+                (CHILD_LEVELS[level], key, start_month or "000000", end_month or "999999")
+            ).fetchall()
+        children = [{"key": row[0], **self._summary(row[1:])} for row in rows]
+        return sorted(children, key=lambda child: child["avg_price"], reverse=True)
+
+    def coverage(self, level: str, key: str, year_months: List[str]) -> Dict[str, int]:
+        """월별로 집계에 포함된 시/군/구 파티션 수"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT year_month, partitions FROM rollups WHERE level = ? AND key = ? "
+                f"AND year_month IN ({','.join('?' * len(year_months))})",
+                (level, key, *year_months)
+            ).fetchall()
+        found = dict(rows)
+        return {year_month: int(found.get(year_month, 0)) for year_month in year_months}
+
+    def rebuild(self, trade_store) -> int:
+        """거래 저장소의 모든 파티션으로 집계를 다시 만듭니다. (집계 도입 전에 쌓인 파티션용)"""
+        partitions = trade_store.partitions()
+        for region_code, year_month in partitions:
+            frame = trade_store.scan([region_code], year_month, year_month, columns=["deal_amount", "area", "dong"])
+            self.update_partition(region_code, year_month, frame)
+        logger.info(f"🧮 지역 집계 재구성: {len(partitions)}개 파티션")
+        return len(partitions)
+
+    def _leaf_rows(self, frame: pd.DataFrame) -> Tuple[List[Tuple[str, Tuple]], Tuple]:
+        """파티션 DataFrame에서 동별/전체 합계를 계산합니다."""
+        if frame.empty or "deal_amount" not in frame.columns:
+            return [], (0, 0.0, 0.0, 0.0, None, None)
+
+        frame = frame[frame["deal_amount"].notna()]
+        area = frame["area"] if "area" in frame.columns else pd.Series(0.0, index=frame.index)
+        with_area = area > 0
+        data = pd.DataFrame({
+            "dong": frame["dong"].astype(object).fillna("") if "dong" in frame.columns else "",
+            "amount": frame["deal_amount"].astype(float),
+            "area_amount": frame["deal_amount"].where(with_area, 0.0).astype(float),
+            "area": area.where(with_area, 0.0).astype(float),
+        })
+
+        table = data.groupby("dong").agg(
+            transactions=("amount", "size"),
+            amount_sum=("amount", "sum"),
+            area_amount_sum=("area_amount", "sum"),
+            area_sum=("area", "sum"),
+            max_price=("amount", "max"),
+            min_price=("amount", "min"),
+        )
+        dong_rows = [(str(dong), self._stats_tuple(row)) for dong, row in zip(table.index, table.itertuples(index=False))]
+        total = self._stats_tuple(table.agg({
+            "transactions": "sum", "amount_sum": "sum", "area_amount_sum": "sum",
+            "area_sum": "sum", "max_price": "max", "min_price": "min"
+        }))
+        return dong_rows, total
+
+    def _stats_tuple(self, row) -> Tuple:
+        """집계 행을 SQLite에 바로 넣을 수 있는 파이썬 값 튜플로 변환합니다."""
+        transactions, amount_sum, area_amount_sum, area_sum, max_price, min_price = row
+        return (
+            int(transactions), float(amount_sum), float(area_amount_sum), float(area_sum),
+            None if pd.isna(max_price) else float(max_price),
+            None if pd.isna(min_price) else float(min_price)
+        )
+
+    def _summary(self, row: Tuple) -> Dict[str, Any]:
+        """합계 행을 평균가/단위면적가를 포함한 요약으로 변환합니다."""
+        transactions, amount_sum, area_amount_sum, area_sum, max_price, min_price, partitions = row
+        return to_json_safe({
+            "transactions": int(transactions or 0),
+            "total_amount": float(amount_sum or 0),
+            "avg_price": float(amount_sum / transactions) if transactions else 0.0,
+            "avg_price_per_area": float(area_amount_sum / area_sum) if area_sum else None,
+            "max_price": max_price or 0,
+            "min_price": min_price or 0,
+            "partitions": int(partitions or 0),
+        })
+
+    @contextmanager
+    def _connect(self):
+        """호출마다 새 연결을 열고 커밋 후 닫음 - 스레드(asyncio.to_thread)에서도 안전하게 사용"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+def main() -> None:
+    """저장소 파티션으로 지역 집계를 재구성하는 CLI"""
+    from app.trade_store import TradeStore
+
+    parser = argparse.ArgumentParser(description="지역 계층 집계 재구성")
+    parser.add_argument("--rebuild", action="store_true", help="저장소의 모든 파티션으로 집계 재구성")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = TradeStore()
+    if args.rebuild:
+        store.rollups.rebuild(store)
+    print(store.rollups.trend("nation", NATION_KEY))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ from typing import Dict, Any, List
 import logging
 from dataclasses import dataclass
 
+from .utils.html_inspection import inspect_html
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,40 +37,18 @@ class HTMLValidationAgent:
         warnings = []
         suggestions = []
         
-        # 기본 HTML 구조 체크
-        if not html_content.strip().startswith('<!DOCTYPE'):
-            errors.append("DOCTYPE 선언이 없습니다")
-        
-        if '<html' not in html_content:
-            errors.append("html 태그가 없습니다")
-        
-        if '<head>' not in html_content:
-            errors.append("head 태그가 없습니다")
-            
-        if '<body>' not in html_content:
-            errors.append("body 태그가 없습니다")
-        
-        # 메타 태그 체크
-        if 'charset=' not in html_content:
-            warnings.append("문자 인코딩이 지정되지 않았습니다")
-        
-        if 'viewport' not in html_content:
-            warnings.append("반응형 viewport 메타태그가 없습니다")
+        # 구조/차트/script 짝/Python 코드 혼입을 파서 한 번 순회로 검사 (같은 내용은 캐시)
+        inspection = inspect_html(html_content)
+        errors.extend(inspection.structure_errors())
+        warnings.extend(inspection.structure_warnings())
         
         # 차트 라이브러리 체크
-        if 'chart' in html_content.lower():
-            if 'chart.js' not in html_content and 'chartjs' not in html_content:
+        if inspection.canvas_count or inspection.chart_constructors:
+            if not inspection.chart_library:
                 errors.append("Chart.js 라이브러리가 포함되지 않았습니다")
-            elif 'cdn' not in html_content and 'https://' not in html_content:
+            elif inspection.chart_library_local:
                 warnings.append("Chart.js가 로컬 파일로 참조되어 있습니다. CDN 사용을 권장합니다")
-        
-        # Python 코드가 HTML에 섞여있는지 체크
-        if 'import ' in html_content or 'def ' in html_content:
-            errors.append("HTML에 Python 코드가 섞여있습니다")
-        
-        # 완료되지 않은 태그 체크
-        if html_content.count('<script>') != html_content.count('</script>'):
-            errors.append("script 태그가 제대로 닫히지 않았습니다")
+        errors.extend(inspection.chart_errors)
         
         # 개선 제안
         if errors:
@@ -118,18 +98,19 @@ class HTMLValidationAgent:
         """개선 제안 생성"""
         
         suggestions = []
+        inspection = inspect_html(html_content)
         
         if not validation_result.is_valid:
             suggestions.append("🔥 긴급: HTML 구조가 잘못되었습니다. 완전히 재생성이 필요합니다.")
         
-        if 'chart' in html_content.lower() and validation_result.errors:
+        if (inspection.canvas_count or inspection.chart_constructors) and validation_result.errors:
             suggestions.append("📊 차트를 제대로 표시하려면 Chart.js CDN을 추가하세요:")
             suggestions.append("   <script src='https://cdn.jsdelivr.net/npm/chart.js'></script>")
         
-        if '예시' in html_content or '가정' in html_content:
+        if inspection.has_example_data:
             suggestions.append("📋 실제 데이터를 사용하여 리포트를 재생성하세요")
         
-        if 'def ' in html_content or 'import ' in html_content:
+        if inspection.python_code:
             suggestions.append("🧹 HTML에서 Python 코드를 제거하고 순수 HTML로 만드세요")
         
         if validation_result.warnings:
@@ -25,6 +25,12 @@ from langchain_core.outputs import ChatGeneration, ChatResult
 from app.llm_client import OpenRouterClient
 from app.mcp_client import MCPClient
 from app.browser_agent import BrowserAgent
+from app.data_profiler import DataProfiler
+from app.trade_store import TradeStore
+from app.region_gazetteer import get_region_gazetteer
+from app.report_manifest import uses_data_loader
+from app.report_store import current_session, get_report_store
+from app.utils.chart_reduction import reduce_nested_data
 
 logger = logging.getLogger(__name__)
 
@@ -526,11 +532,18 @@ class BrowserTestTool(BaseTool):
         super().__init__()
         object.__setattr__(self, 'browser_agent', BrowserAgent())
         object.__setattr__(self, 'openrouter_client', OpenRouterClient())
+        object.__setattr__(self, 'token_usage', {})
     
     def _run(self, **kwargs) -> str:
         """도구 실행"""
         return asyncio.run(self._arun(**kwargs))
     
+    def _add_token_usage(self, usage: Optional[Dict[str, Any]]):
+        """LLM 응답의 usage를 이번 리포트 생성의 토큰 수에 더합니다."""
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            if usage and usage.get(key) is not None:
+                self.token_usage[key] = self.token_usage.get(key, 0) + int(usage[key])
+    
     async def _arun(self, **kwargs) -> str:
         """🔥 에이전틱 HTML 리포트 생성 - LLM이 데이터를 보고 스스로 시각화 결정"""
         try:
@@ -539,6 +552,7 @@ class BrowserTestTool(BaseTool):
             
             analysis_data = kwargs.get('analysis_data')
             html_content = kwargs.get('html_content')
+            object.__setattr__(self, 'token_usage', {})
             
             if analysis_data:
                 logger.info("📊 실제 MCP 데이터를 사용한 에이전틱 HTML 생성 시작")
@@ -560,12 +574,19 @@ class BrowserTestTool(BaseTool):
                     parsed_data = analysis_data
                     logger.info(f"🎯 MCP 데이터 타입: {type(parsed_data)}")
                 
+                # 긴 시계열은 차트 예산만큼 축소 (LLM 프롬프트와 리포트 데이터 블록에 같은 데이터 사용)
+                parsed_data = reduce_nested_data(parsed_data)
+                
                 # 🔥 MCP 데이터를 직접 LLM에 전달해서 HTML 생성
                 html_content = await self._generate_html_with_llm(
                     parsed_data,  # 실제 MCP 데이터
                     user_query=kwargs.get('user_query', '데이터 분석 리포트')
                 )
                 
+                # loadReportData()로 데이터를 읽는 리포트에 데이터 블록 삽입 (크면 sidecar 파일로 분리)
+                if uses_data_loader(html_content):
+                    html_content = get_report_store().embed_data(html_content, parsed_data)
+                
                 # 🔥 실시간 HTML 코드 스트리밍 전송
                 if hasattr(self, 'streaming_callback') and self.streaming_callback:
                     await self.streaming_callback.send_html_code(html_content)
@@ -606,20 +627,17 @@ class BrowserTestTool(BaseTool):
 </html>
 """
             
-            # HTML 파일 저장
+            # HTML 파일 저장 (세션 ID + 내용 해시로 식별, 같은 내용은 한 번만 저장)
             try:
-                import tempfile
-                import os
-                
-                # reports 디렉터리에 저장
-                reports_dir = os.path.join(os.getcwd(), 'reports')
-                os.makedirs(reports_dir, exist_ok=True)
-                
-                final_path = os.path.join(reports_dir, f'report_{int(time.time())}.html')
-                with open(final_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                report = get_report_store().save(
+                    html_content,
+                    tokens=self.token_usage,
+                    query=kwargs.get('user_query'),
+                    kind="agentic"
+                )
+                final_path = report["path"]
                 
-                logger.info(f"✅ HTML 리포트 저장 완료: {final_path}")
+                logger.info(f"✅ HTML 리포트 저장 완료: {report['report_id']} ({final_path})")
                 
                 # 🔥 리포트 저장 완료 후 분석 완료 메시지 전송
                 try:
@@ -667,10 +685,9 @@ class BrowserTestTool(BaseTool):
                 # 기본 HTML 검증만 수행
                 if '<!DOCTYPE' in html_content and '<html' in html_content and '<body' in html_content:
                     # 서빙 URL 생성
-                    filename = os.path.basename(final_path)
-                    serving_url = f"http://localhost:7001/reports/{filename}"
+                    serving_url = f"http://localhost:7001{report['url']}"
                     
-                    return f"✅ HTML 리포트가 성공적으로 생성되고 저장되었습니다!\n📁 파일: {final_path}\n🌐 URL: {serving_url}"
+                    return f"✅ HTML 리포트가 성공적으로 생성되고 저장되었습니다!\n🆔 리포트: {report['report_id']}\n📁 파일: {final_path}\n🌐 URL: {serving_url}"
                 else:
                     return f"⚠️ HTML 구조에 문제가 있지만 파일은 저장되었습니다: {final_path}"
                     
@@ -719,6 +736,9 @@ class BrowserTestTool(BaseTool):
 3. 위 실제 데이터의 모든 중요한 인사이트 시각화
 4. 완전한 HTML 문서 (<!DOCTYPE html>부터 </html>까지)
 5. CDN에서 Chart.js 라이브러리 로드
+6. 차트와 표는 위 데이터와 같은 구조의 JSON을 loadReportData() (Promise를 반환)로 읽어 그리고, 차트는 whenVisible(차트 컨테이너 요소, 콜백)로 화면에 보일 때 그리기
+   예: whenVisible(document.getElementById('priceChart'), () => loadReportData().then(data => new Chart(...)))
+   loadReportData/whenVisible 함수와 데이터 블록(<script id="report-data">)은 저장 시 자동으로 삽입되므로 직접 정의하지 마세요
 
 **사용자 요청:** {user_query}
 
@@ -757,6 +777,7 @@ class BrowserTestTool(BaseTool):
                 
                 if response.status_code == 200:
                     result = response.json()
+                    self._add_token_usage(result.get("usage"))
                     html_content = result["choices"][0]["message"]["content"]
                     
                     # HTML 태그 추출 (마크다운 코드 블록 제거)
@@ -824,6 +845,7 @@ class BrowserTestTool(BaseTool):
 4. **데이터 정확성**: 실제 수집된 데이터와 일치하는지 확인
 5. **사용자 경험**: 인터랙티브 요소, 명확한 정보 전달
 6. **브라우저 호환성**: 모든 브라우저에서 정상 작동
+7. **데이터 로딩 유지**: loadReportData()/whenVisible() 호출은 그대로 두고 데이터를 HTML에 직접 넣지 마세요 (저장 시 자동 삽입)
 
 **반환 형식:**
 - 개선된 완전한 HTML 코드만 반환
@@ -855,6 +877,7 @@ class BrowserTestTool(BaseTool):
                 
                 if response.status_code == 200:
                     result = response.json()
+                    self._add_token_usage(result.get("usage"))
                     improved_html = result["choices"][0]["message"]["content"]
                     
                     # HTML 태그 추출
@@ -948,6 +971,13 @@ class TrueAgenticWorkflow:
         self.mcp_client = MCPClient()
         self.tool_discovery = MCPToolDiscovery(self.mcp_client)
         
+        # 대용량 도구 결과 축약기 (LLM에는 프로파일 + 대표 샘플만, 원본 거래는 로컬 거래 저장소에 적재)
+        self.data_profiler = DataProfiler()
+        self.trade_store = TradeStore()
+        
+        # 지역명 → 지역코드 사전 (초기 프롬프트에 코드를 미리 제공)
+        self.region_gazetteer = get_region_gazetteer()
+        
         # 커스텀 OpenRouterLLM 사용 (도구 호출 지원)
         self.llm = OpenRouterLLM()
         
@@ -983,6 +1013,10 @@ class TrueAgenticWorkflow:
         
         # 우선순위 도구를 앞에 배치
         self.tools = priority_tools + other_tools
+        
+        # 전국 지역코드 사전이 없으면 get_region_codes로 한 번 수집 (백그라운드)
+        if any(tool.name == 'get_region_codes' for tool in self.tools):
+            self.region_gazetteer.ensure_loaded(self.mcp_client)
         logger.info(f"🔧 최적화된 도구 순서: 우선순위 {len(priority_tools)}개 + 기타 {len(other_tools)}개")
         
         # LLM에 도구 바인딩
@@ -1064,21 +1098,31 @@ class TrueAgenticWorkflow:
                     result = await target_tool._arun(**tool_args)
                     logger.info(f"✅ 도구 실행 완료: {tool_name}")
                     
+                    # 🔥 거래 원시 데이터는 로컬 컬럼 저장소에도 적재
+                    if tool_name == "get_apt_trade_data" and tool_args.get("region_code") and tool_args.get("year_month"):
+                        try:
+                            self.trade_store.ingest_tool_result(
+                                str(tool_args["region_code"]), str(tool_args["year_month"]), str(result)
+                            )
+                        except Exception as e:
+                            logger.warning(f"⚠️ 거래 데이터 저장 실패: {e}")
+                    
+                    # 🔥 대용량 레코드 결과는 프로파일 + 대표 샘플로 축약 (파일 경로 결과는 파일을 읽어 경로와 함께 전달, 원본 거래는 위 저장소에 적재됨)
+                    reduced = self.data_profiler.reduce_tool_output(str(result))
+                    if reduced:
+                        result = reduced
+                    
                     # 🔥 html_report 완료 시 직접 알림 처리
                     if tool_name == "html_report" and hasattr(self.llm, 'streaming_callback') and self.llm.streaming_callback:
                         try:
                             logger.info(f"🔍 execute_tools에서 html_report 완료 감지!")
                             
-                            # 가장 최근 생성된 리포트 파일 찾기
-                            import os
-                            import glob
-                            reports_dir = os.getenv('REPORTS_PATH', './reports')
-                            report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
+                            # 이 세션이 저장한 리포트 조회
+                            report = get_report_store().session_report(current_session.get())
                             
-                            if report_files:
-                                # 생성 시간 기준 최신 파일
-                                latest_report = max(report_files, key=os.path.getctime)
-                                logger.info(f"🎉 execute_tools에서 최신 리포트 감지: {latest_report}")
+                            if report:
+                                latest_report = report["path"]
+                                logger.info(f"🎉 execute_tools에서 세션 리포트 감지: {report['report_id']}")
                                 await self.llm.streaming_callback.send_report_update(latest_report)
                                 
                                 # HTML 파일에서 내용 읽어서 코드 뷰에 전송
@@ -1155,7 +1199,7 @@ class TrueAgenticWorkflow:
 
 **제공된 데이터:**
 ```json
-{json_module.dumps(json_data, ensure_ascii=False, indent=2)}
+{json_module.dumps(reduce_nested_data(json_data), ensure_ascii=False, indent=2)}
 ```
 
 사용자가 이미 분석할 데이터를 제공했으므로, MCP 도구를 호출하지 말고 직접 이 데이터를 분석하여 html_report 도구로 시각화 리포트를 생성해주세요.
@@ -1184,6 +1228,23 @@ class TrueAgenticWorkflow:
                     for tool in tools_info
                 ])
                 
+                # 🔥 쿼리의 지역명을 미리 코드로 변환해 get_region_codes 호출 단계 생략
+                resolved_regions = self.region_gazetteer.resolve_districts(user_query)
+                if resolved_regions:
+                    region_lines = "\n".join(
+                        f"- {region['full_name']}: {region['code']}"
+                        + (f" (동명 지역 있음: {', '.join(c['full_name'] for c in region['candidates'])})" if region.get("ambiguous") else "")
+                        for region in resolved_regions
+                    )
+                    region_section = f"""
+**확인된 지역 코드 (get_region_codes 호출 불필요):**
+{region_lines}
+"""
+                    region_step = "- 위에 확인된 지역 코드를 바로 사용 (get_region_codes 호출 생략)"
+                else:
+                    region_section = ""
+                    region_step = "- get_region_codes로 지역 코드 확인"
+                
                 initial_prompt = f"""**현재 날짜: {current_date} (시스템 날짜: {current_year_month})**
 
 **🚫 절대 금지사항:**
@@ -1192,7 +1253,7 @@ class TrueAgenticWorkflow:
 - 하드코딩된 날짜나 데이터를 사용하지 마세요
 
 **사용자 요청:** {user_query}
-
+{region_section}
 **🎯 에이전틱 분석 전략:**
 
 **1단계: 전략 수립**
@@ -1202,7 +1263,7 @@ class TrueAgenticWorkflow:
 - 어떤 결과를 목표로 하는지
 
 **2단계: 실제 데이터 수집**
-- get_region_codes로 지역 코드 확인
+{region_step}
 - get_apt_trade_data로 실제 거래 데이터 수집 (최신 가능한 년월)
 - analyze_apartment_trade로 **실제 데이터 분석**
 
@@ -1262,8 +1323,8 @@ class TrueAgenticWorkflow:
                                     "data": str(msg.content)
                                 })
                     
-                    # 🔥 실제 분석 데이터를 JSON 문자열로 변환
-                    analysis_json = json.dumps(collected_analysis_data, ensure_ascii=False, indent=2)
+                    # 🔥 실제 분석 데이터를 JSON 문자열로 변환 (긴 시계열은 차트 예산만큼 축소)
+                    analysis_json = json.dumps(reduce_nested_data(collected_analysis_data), ensure_ascii=False, indent=2)
                     
                     context_prompt = f"""이전 단계 결과:
 {content}
@@ -1618,16 +1679,12 @@ class TrueAgenticWorkflow:
                             logger.info(f"🔍 html_report 완료됨 - 리포트 갱신 시작")
                             logger.info(f"🔍 html_report 감지됨!")
                             
-                            # 가장 최근 생성된 리포트 파일 찾기
-                            import os
-                            import glob
-                            reports_dir = os.getenv('REPORTS_PATH', './reports')
-                            report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
+                            # 이 세션이 저장한 리포트 조회
+                            report = get_report_store().session_report(current_session.get())
                             
-                            if report_files:
-                                # 가장 최근 파일 선택 (파일명의 타임스탬프 기준)
-                                latest_report = max(report_files, key=os.path.getctime)
-                                logger.info(f"🎉 execute_tools에서 최신 리포트 감지: {latest_report}")
+                            if report:
+                                latest_report = report["path"]
+                                logger.info(f"🎉 execute_tools에서 세션 리포트 감지: {report['report_id']}")
                                 
                                 # HTML 파일에서 내용 읽어서 코드 뷰에 전송
                                 try:
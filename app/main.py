@@ -6,21 +6,32 @@ AI 레포트 에이전트 FastAPI Application
 import os
 import asyncio
 import uuid
+from urllib.parse import quote
 from datetime import datetime
 from typing import Optional, List, Dict
-from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, constr
 import logging
 from dotenv import load_dotenv
 import json
 import httpx
 from contextlib import asynccontextmanager
 
+from app.browser_pool import get_browser_pool
+from app.chart_renderer import get_chart_renderer
 from app.orchestrator import RealestateOrchestrator
+from app.precompressed import PrecompressedStaticFiles, precompress_tree
+from app.realestate_workflow import RealestateWorkflow
+from app.report_cache import get_report_cache
+from app.report_catalog import SORT_COLUMNS, get_report_catalog
+from app.report_gc import get_report_gc
+from app.report_scheduler import ReportScheduler
+from app.report_store import get_report_store
+from app.sandbox_pool import get_execution_slots, get_interpreter_pool
 from app.streaming_api import create_streaming_endpoints
+from app.backfill import get_backfill, list_backfills, resume_backfills, start_backfill
 
 # 환경 변수 로드 - override=True로 강제 갱신
 load_dotenv(override=True)
@@ -39,7 +50,28 @@ async def lifespan(app: FastAPI):
     # 동적 프롬프트 생성 (백그라운드 태스크)
     asyncio.create_task(generate_dynamic_prompts())
     
+    # 중단된 백필 작업 이어서 실행
+    if os.getenv("BACKFILL_RESUME_ON_START", "true").lower() == "true":
+        resume_backfills()
+    
+    # 정적 자원 압축본 생성 (없거나 원본보다 오래된 것만)
+    for directory in PRECOMPRESSED_DIRS:
+        asyncio.create_task(asyncio.to_thread(precompress_tree, directory, os.path.join(PRECOMPRESSED_ROOT, directory)))
+    
+    # 인기 리포트 사전 생성 일정 시작
+    if os.getenv("REPORT_SCHEDULER_ENABLED", "false").lower() == "true":
+        report_scheduler.start()
+    
+    # 리포트 보관 기간/용량 정리 시작
+    if os.getenv("REPORT_GC_ENABLED", "true").lower() == "true":
+        get_report_gc().start()
+    
     yield
+    await report_scheduler.stop()
+    await get_report_gc().stop()
+    await get_report_cache().close()
+    await get_browser_pool().close()
+    get_chart_renderer().close()
     logger.info("FastAPI 서버 종료")
 
 # FastAPI 앱 생성
@@ -61,12 +93,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 정적 파일 제공
-app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/reports", StaticFiles(directory="reports"), name="reports")
+# 정적 파일 제공 - 미리 만든 gzip/brotli 압축본과 ETag로 전송량 절감
+# 정적 자원 압축본은 추적되는 디렉터리를 건드리지 않도록 캐시 디렉터리에 생성
+PRECOMPRESSED_ROOT = os.path.join(os.getenv('CACHE_PATH', './cache'), 'precompressed')
+PRECOMPRESSED_DIRS = ["static", "frontend"]
+
+app.mount(
+    "/static",
+    PrecompressedStaticFiles(directory="static", variants_dir=os.path.join(PRECOMPRESSED_ROOT, "static")),
+    name="static"
+)
+# 저장소 objects/ 아래 리포트는 내용 해시가 이름이므로 바뀌지 않음
+app.mount(
+    "/reports",
+    PrecompressedStaticFiles(
+        directory="reports",
+        immutable=lambda path: path.startswith("objects" + os.sep),
+        on_access=get_report_catalog().note_access
+    ),
+    name="reports"
+)
+
+# report_id로 조회한 리포트 전송 - report_id가 가리키는 파일은 갱신 시 바뀌므로 immutable 없이 ETag로 재검증
+report_files = PrecompressedStaticFiles(
+    directory=get_report_store().root, check_dir=False, on_access=get_report_catalog().note_access
+)
+# nginx 뒤에서는 파일 전송을 X-Accel-Redirect로 nginx에 넘김 (config/nginx.conf의 internal location)
+REPORT_ACCEL_REDIRECT = os.getenv("REPORT_ACCEL_REDIRECT", "false").lower() == "true"
+REPORT_ACCEL_PREFIX = os.getenv("REPORT_ACCEL_PREFIX", "/_reports_internal/")
 
 # 새로운 프론트엔드 정적 파일 제공
-app.mount("/frontend", StaticFiles(directory="frontend"), name="frontend")
+app.mount(
+    "/frontend",
+    PrecompressedStaticFiles(directory="frontend", variants_dir=os.path.join(PRECOMPRESSED_ROOT, "frontend")),
+    name="frontend"
+)
 
 # 오케스트레이터 초기화 (lazy initialization)
 orchestrator = None
@@ -78,6 +139,10 @@ def get_orchestrator() -> RealestateOrchestrator:
         orchestrator = RealestateOrchestrator()
     return orchestrator
 
+async def get_realestate_workflow() -> RealestateWorkflow:
+    """리포트 갱신용 부동산 워크플로우 반환 - 채팅의 지역 비교 처리와 같은 인스턴스"""
+    return await get_orchestrator().get_realestate_workflow()
+
 # 스트리밍 엔드포인트 추가 (lazy initialization 사용)
 create_streaming_endpoints(app, get_orchestrator)
 
@@ -107,9 +172,20 @@ class HealthResponse(BaseModel):
     timestamp: str
 
 
+class BackfillRequest(BaseModel):
+    region_codes: List[constr(pattern=r"^[0-9]{5}$")]
+    start_month: constr(pattern=r"^[0-9]{6}$")
+    end_month: constr(pattern=r"^[0-9]{6}$")
+    job_id: Optional[constr(pattern=r"^[A-Za-z0-9_-]{1,64}$")] = None
+    refresh: bool = False
+
+
 # 동적 프롬프트 생성을 위한 변수
 dynamic_prompts = []
 
+# 인기 리포트 사전 생성 스케줄러 - /api/prompts 프롬프트도 대상에 포함
+report_scheduler = ReportScheduler(get_report_cache(), prompts_provider=lambda: dynamic_prompts)
+
 async def generate_dynamic_prompts():
     """MCP 도구 정보를 기반으로 동적 프롬프트 생성"""
     global dynamic_prompts
@@ -297,49 +373,63 @@ async def health_check():
         }
 
 
-@app.get("/reports/{report_filename}")
-async def get_report(report_filename: str):
-    """생성된 리포트 파일 조회"""
-    
-    report_path = f"reports/{report_filename}"
-    
-    if not os.path.exists(report_path):
-        raise HTTPException(status_code=404, detail="리포트 파일을 찾을 수 없습니다.")
-    
-    return FileResponse(
-        path=report_path,
-        media_type="text/html",
-        filename=report_filename
-    )
-
-
 @app.get("/reports")
-async def list_reports():
-    """생성된 리포트 목록 조회"""
+async def list_reports(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+    sort: str = Query("created_at"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    session_id: Optional[str] = None,
+    region: Optional[str] = None,
+    kind: Optional[str] = None,
+    q: Optional[str] = Query(None, description="쿼리 내용 검색")
+):
+    """생성된 리포트 목록 조회 (리포트 카탈로그 기반 페이지 조회)"""
+    
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"정렬 기준은 {', '.join(sorted(SORT_COLUMNS))} 중 하나여야 합니다.")
     
     try:
-        reports_dir = "reports"
-        if not os.path.exists(reports_dir):
-            return {"reports": []}
-        
-        reports = []
-        for filename in os.listdir(reports_dir):
-            if filename.endswith('.html'):
-                file_path = os.path.join(reports_dir, filename)
-                stat = os.stat(file_path)
-                
-                reports.append({
-                    "filename": filename,
-                    "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    "size": stat.st_size,
-                    "url": f"/reports/{filename}"
-                })
+        total, rows = get_report_catalog().query(
+            get_report_store().root,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+            sort=sort,
+            descending=order == "desc",
+            session_id=session_id,
+            region=region,
+            kind=kind,
+            search=q
+        )
         
-        # 생성 시간 기준 내림차순 정렬
-        reports.sort(key=lambda x: x["created_at"], reverse=True)
+        reports = [
+            {
+                "filename": row["filename"],
+                "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+                "size": row["size"],
+                "report_id": row["report_id"],
+                "url": get_report_store().url(row["path"]),
+                "session_id": row["session_id"],
+                "query": row["query"],
+                "region": row["region"],
+                "kind": row["kind"],
+                "duration_seconds": row["duration_seconds"],
+                "tokens": {
+                    "prompt": row["prompt_tokens"],
+                    "completion": row["completion_tokens"],
+                    "total": row["total_tokens"]
+                },
+                "content_hash": row["content_hash"],
+                "access_count": row["access_count"],
+                "last_accessed_at": datetime.fromtimestamp(row["last_accessed_at"]).isoformat() if row["last_accessed_at"] else None
+            }
+            for row in rows
+        ]
         
         return {
-            "total": len(reports),
+            "total": total,
+            "page": page,
+            "page_size": page_size,
             "reports": reports
         }
         
@@ -348,11 +438,151 @@ async def list_reports():
         raise HTTPException(status_code=500, detail="리포트 목록 조회 중 오류가 발생했습니다.")
 
 
+@app.get("/api/reports/{report_id}")
+async def get_report_info(report_id: str):
+    """report_id로 리포트 조회 (경로, URL, 카탈로그 정보)"""
+    
+    entry = get_report_catalog().get(report_id)
+    report_store = get_report_store()
+    if not entry or not report_store.resolve(report_id):
+        raise HTTPException(status_code=404, detail="리포트를 찾을 수 없습니다.")
+    return {**entry, "url": report_store.url(entry["path"]), "content_url": f"/api/reports/{report_id}/content"}
+
+
+@app.get("/api/reports/{report_id}/content")
+async def get_report_content(report_id: str, request: Request):
+    """report_id의 리포트 파일 전송 - 카탈로그에 등록된 리포트만 허용"""
+    
+    report_store = get_report_store()
+    report_path = report_store.resolve(report_id)
+    if not report_path:
+        raise HTTPException(status_code=404, detail="리포트를 찾을 수 없습니다.")
+    
+    relative_path = os.path.relpath(report_path, report_store.root)
+    if relative_path.startswith(os.pardir):
+        raise HTTPException(status_code=404, detail="리포트를 찾을 수 없습니다.")
+    
+    if REPORT_ACCEL_REDIRECT:
+        # 조회만 하고 본문은 nginx가 sendfile로 전송 (압축본은 gzip_static) - 조회 기록은 여기서 남김
+        get_report_catalog().note_access(report_path)
+        return Response(
+            headers={
+                "X-Accel-Redirect": REPORT_ACCEL_PREFIX + quote(relative_path.replace(os.sep, "/")),
+                "Cache-Control": "no-cache"
+            },
+            media_type="text/html"
+        )
+    return report_files.file_response(report_path, os.stat(report_path), request.scope)
+
+
+@app.get("/api/reports/{report_id}/manifest")
+async def get_report_manifest(report_id: str):
+    """리포트 입력 데이터 매니페스트 조회"""
+    
+    if os.path.basename(report_id) != report_id:
+        raise HTTPException(status_code=400, detail="잘못된 리포트 ID입니다.")
+    
+    manifest = get_report_store().load_manifest(report_id)
+    if not manifest:
+        raise HTTPException(status_code=404, detail="리포트 매니페스트를 찾을 수 없습니다.")
+    return manifest
+
+
+@app.post("/api/reports/{report_id}/refresh")
+async def refresh_report(report_id: str):
+    """리포트 갱신 - 새 월/바뀐 월만 수집하고 바뀐 경우에만 다시 렌더링"""
+    
+    if os.path.basename(report_id) != report_id:
+        raise HTTPException(status_code=400, detail="잘못된 리포트 ID입니다.")
+    if not get_report_store().load_manifest(report_id):
+        # 매니페스트는 부동산 워크플로우(지역 비교, 시/도·전국 동향) 리포트에만 있음 - 에이전트 리포트는 갱신 불가
+        raise HTTPException(status_code=404, detail="갱신할 수 있는 리포트가 아닙니다. (매니페스트 없음 - 에이전트가 생성한 리포트는 다시 요청해 주세요)")
+    
+    workflow = await get_realestate_workflow()
+    result = await workflow.refresh_report(report_id)
+    if not result.get("success"):
+        raise HTTPException(status_code=500, detail=result.get("error", "리포트 갱신 실패"))
+    
+    result.pop("report_content", None)
+    return result
+
+
 @app.get("/api/prompts")
 async def get_dynamic_prompts():
     """동적으로 생성된 프롬프트 반환"""
     return {"prompts": dynamic_prompts}
 
+@app.get("/scheduler")
+async def get_scheduler_status():
+    """리포트 사전 생성 스케줄러 상태 (일정, 대상 쿼리별 캐시 여부, 최근 실행 결과)"""
+    return report_scheduler.status()
+
+
+@app.post("/scheduler/run")
+async def run_scheduler_now():
+    """만료된 대상 리포트 사전 생성을 지금 시작 (대화형 세션이 없을 때만 진행)"""
+    asyncio.create_task(report_scheduler.run_once())
+    return {"started": True, "targets": report_scheduler.targets()}
+
+
+@app.get("/gc")
+async def get_gc_status():
+    """리포트 GC 상태 (한도 설정, 최근 실행 결과, 누적 삭제량)"""
+    return get_report_gc().status()
+
+
+@app.post("/gc/run")
+async def run_gc_now():
+    """리포트 GC를 지금 실행"""
+    return await get_report_gc().run_once()
+
+
+@app.get("/sandbox")
+async def get_sandbox_status():
+    """코드 실행 슬롯 사용/대기 지표, 작업자 풀, 브라우저 풀과 차트 렌더러 상태"""
+    return {
+        "slots": get_execution_slots().metrics(),
+        "pool": get_interpreter_pool().status(),
+        "browser": get_browser_pool().status(),
+        "charts": get_chart_renderer().status()
+    }
+
+
+@app.post("/backfill")
+async def create_backfill(request: BackfillRequest):
+    """지역코드 × 기간 거래 데이터 백필 작업 시작 (같은 job_id면 체크포인트에서 이어서 실행)"""
+    
+    if not request.region_codes:
+        raise HTTPException(status_code=400, detail="region_codes가 필요합니다")
+    if request.start_month > request.end_month:
+        raise HTTPException(status_code=400, detail="start_month는 end_month보다 이후일 수 없습니다")
+    
+    job = start_backfill(
+        request.region_codes,
+        request.start_month,
+        request.end_month,
+        job_id=request.job_id,
+        refresh=request.refresh
+    )
+    return job.progress()
+
+
+@app.get("/backfill")
+async def get_backfill_jobs():
+    """백필 작업 목록 및 진행 상황"""
+    return {"jobs": list_backfills()}
+
+
+@app.get("/backfill/{job_id}")
+async def get_backfill_progress(job_id: str):
+    """백필 작업 진행 상황 조회"""
+    
+    job = get_backfill(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="백필 작업을 찾을 수 없습니다.")
+    return job.progress()
+
+
 # 실행 중인 세션들을 추적하는 딕셔너리
 running_sessions: Dict[str, Dict] = {}
 
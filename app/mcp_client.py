@@ -4,7 +4,8 @@ import logging
 import os
 import subprocess
 import uuid
-from typing import Dict, Any, List, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -14,7 +15,9 @@ class MCPClient:
     
     def __init__(self):
         self.active_servers = {}
-        self.server_locks = {}  # 서버별 락 추가
+        self.server_locks = {}  # 서버별 시작/중지 락
+        # 서버별 프로세스 수 - stdio 요청은 프로세스당 하나씩만 처리되므로 동시 호출 수만큼 띄움
+        self.pool_size = max(1, int(os.getenv("MCP_SERVER_POOL_SIZE", "1")))
         
         # 기본 MCP 서버 설정 (환경 변수로 제어)
         self.mcp_configs = {}
@@ -127,31 +130,57 @@ class MCPClient:
         return servers
     
     async def start_mcp_server(self, server_name: str) -> bool:
-        """MCP 서버를 시작합니다."""
+        """MCP 서버를 시작합니다. MCP_SERVER_POOL_SIZE만큼 프로세스를 띄워 풀로 관리합니다."""
         
-        if server_name in self.active_servers:
-            logger.info(f"MCP 서버 '{server_name}'이 이미 실행 중입니다.")
-            return True
-        
-        config = self.mcp_configs.get(server_name)
-        if not config:
-            logger.error(f"알 수 없는 MCP 서버: {server_name}")
-            return False
-        
-        try:
+        async with self._server_lock(server_name):
+            if server_name in self.active_servers:
+                logger.info(f"MCP 서버 '{server_name}'이 이미 실행 중입니다.")
+                return True
+            
+            config = self.mcp_configs.get(server_name)
+            if not config:
+                logger.error(f"알 수 없는 MCP 서버: {server_name}")
+                return False
+            
             # 서버 디렉토리 확인
-            server_path = config["path"]
-            if not os.path.exists(server_path):
-                logger.error(f"MCP 서버 경로가 존재하지 않습니다: {server_path}")
+            if not os.path.exists(config["path"]):
+                logger.error(f"MCP 서버 경로가 존재하지 않습니다: {config['path']}")
                 return False
             
+            started = await asyncio.gather(*(self._spawn_process(config) for _ in range(self.pool_size)))
+            workers = [item for item in started if item]
+            if not workers:
+                return False
+            
+            pool: asyncio.Queue = asyncio.Queue()
+            for process, _ in workers:
+                pool.put_nowait(process)
+            
+            # 서버 등록
+            process, init_response = workers[0]
+            self.active_servers[server_name] = {
+                "process": process,
+                "workers": [worker for worker, _ in workers],
+                "pool": pool,
+                "config": config,
+                "capabilities": init_response.get("result", {}).get("capabilities", {}),
+                "started_at": datetime.now()
+            }
+            
+            logger.info(f"MCP 서버 '{server_name}' 시작 완료 (프로세스 {len(workers)}개)")
+            return True
+    
+    async def _spawn_process(self, config: Dict[str, Any]) -> Optional[Tuple[asyncio.subprocess.Process, Dict[str, Any]]]:
+        """MCP 서버 프로세스 하나를 시작하고 초기화 핸드셰이크를 수행합니다."""
+        
+        try:
             # 프로세스 시작
             process = await asyncio.create_subprocess_exec(
                 *config["command"],
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                cwd=server_path
+                cwd=config["path"]
             )
             
             # 초기화 메시지 전송
@@ -177,7 +206,7 @@ class MCPClient:
             if not init_response or "error" in init_response:
                 logger.error(f"MCP 서버 초기화 실패: {init_response}")
                 process.terminate()
-                return False
+                return None
             
             # initialized notification 전송 (MCP 표준 필수)
             initialized_notification = {
@@ -190,7 +219,7 @@ class MCPClient:
                 if process.stdin is None:
                     logger.error("프로세스 stdin이 None입니다")
                     process.terminate()
-                    return False
+                    return None
                     
                 message = json.dumps(initialized_notification) + "\n"
                 process.stdin.write(message.encode())
@@ -199,22 +228,29 @@ class MCPClient:
             except Exception as e:
                 logger.error(f"initialized notification 전송 실패: {e}")
                 process.terminate()
-                return False
-            
-            # 서버 등록
-            self.active_servers[server_name] = {
-                "process": process,
-                "config": config,
-                "capabilities": init_response.get("result", {}).get("capabilities", {}),
-                "started_at": datetime.now()
-            }
+                return None
             
-            logger.info(f"MCP 서버 '{server_name}' 시작 완료")
-            return True
+            return process, init_response
             
         except Exception as e:
             logger.error(f"MCP 서버 시작 실패: {e}")
-            return False
+            return None
+    
+    def _server_lock(self, server_name: str) -> asyncio.Lock:
+        """서버별 시작/중지 락"""
+        if server_name not in self.server_locks:
+            self.server_locks[server_name] = asyncio.Lock()
+        return self.server_locks[server_name]
+    
+    @asynccontextmanager
+    async def _acquire_process(self, server_name: str) -> AsyncIterator[asyncio.subprocess.Process]:
+        """풀에서 유휴 프로세스를 하나 빌려 요청이 끝나면 반환합니다."""
+        pool = self.active_servers[server_name]["pool"]
+        process = await pool.get()
+        try:
+            yield process
+        finally:
+            pool.put_nowait(process)
     
     async def stop_mcp_server(self, server_name: str):
         """MCP 서버를 중지합니다."""
@@ -223,20 +259,19 @@ class MCPClient:
             return
         
         try:
-            server_info = self.active_servers[server_name]
-            process = server_info["process"]
-            
-            # 정상 종료 시도
-            process.terminate()
+            server_info = self.active_servers.pop(server_name)
             
-            # 5초 대기 후 강제 종료
-            try:
-                await asyncio.wait_for(process.wait(), timeout=5.0)
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
+            for process in server_info.get("workers", [server_info["process"]]):
+                # 정상 종료 시도
+                process.terminate()
+                
+                # 5초 대기 후 강제 종료
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
             
-            del self.active_servers[server_name]
             logger.info(f"MCP 서버 '{server_name}' 중지 완료")
             
         except Exception as e:
@@ -251,15 +286,8 @@ class MCPClient:
         if server_name not in self.active_servers:
             return []
         
-        # 서버별 락 사용
-        if server_name not in self.server_locks:
-            self.server_locks[server_name] = asyncio.Lock()
-        
-        async with self.server_locks[server_name]:
+        async with self._acquire_process(server_name) as process:
             try:
-                server_info = self.active_servers[server_name]
-                process = server_info["process"]
-                
                 request = {
                     "jsonrpc": "2.0",
                     "id": str(uuid.uuid4()),
@@ -288,15 +316,8 @@ class MCPClient:
         if server_name not in self.active_servers:
             return {"error": f"MCP 서버 '{server_name}'을 시작할 수 없습니다."}
         
-        # 서버별 락 사용
-        if server_name not in self.server_locks:
-            self.server_locks[server_name] = asyncio.Lock()
-        
-        async with self.server_locks[server_name]:
+        async with self._acquire_process(server_name) as process:
             try:
-                server_info = self.active_servers[server_name]
-                process = server_info["process"]
-                
                 # MCP 서버 별로 파라미터 구조가 다를 수 있으므로 두 가지 방식 시도
                 request = {
                     "jsonrpc": "2.0",
@@ -321,9 +342,9 @@ class MCPClient:
                         "name": tool_name,
                         "params": arguments  # arguments 대신 params 사용
                     }
-                
-                
-                response = await self._send_request(process, request)
+                    request["id"] = str(uuid.uuid4())
+                    
+                    response = await self._send_request(process, request)
                 
                 if response and "result" in response:
                     return response["result"]
@@ -530,7 +551,8 @@ class MCPClient:
                 "config": server_info["config"],
                 "capabilities": server_info["capabilities"],
                 "started_at": server_info["started_at"].isoformat(),
-                "pid": process.pid if process.returncode is None else None
+                "pid": process.pid if process.returncode is None else None,
+                "pool_size": len(server_info.get("workers", [process]))
             }
         
         return status 
\ No newline at end of file
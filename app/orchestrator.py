@@ -11,6 +11,8 @@ if TYPE_CHECKING:
     from app.streaming_api import StreamingCallback
 
 from app.langgraph_workflow import TrueAgenticWorkflow
+from app.realestate_workflow import RealestateWorkflow
+from app.report_store import current_session
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,9 @@ class RealestateOrchestrator:
     def __init__(self):
         self.workflow = TrueAgenticWorkflow()
         self.initialized = False
+        # 지역 비교처럼 정해진 절차로 처리하는 쿼리와 리포트 갱신용 워크플로우 (최초 사용 시 초기화)
+        self.realestate_workflow: Optional[RealestateWorkflow] = None
+        self._realestate_lock = asyncio.Lock()
     
     async def initialize(self) -> bool:
         """에이전틱 워크플로우 초기화"""
@@ -28,6 +33,15 @@ class RealestateOrchestrator:
             self.initialized = True
         return self.initialized
     
+    async def get_realestate_workflow(self) -> RealestateWorkflow:
+        """부동산 워크플로우 반환 - 에이전트와 같은 MCP 클라이언트를 쓰고, 최초 호출 시 MCP 서버 시작"""
+        async with self._realestate_lock:
+            if self.realestate_workflow is None:
+                workflow = RealestateWorkflow(mcp_client=self.workflow.mcp_client)
+                await workflow.initialize()
+                self.realestate_workflow = workflow
+        return self.realestate_workflow
+    
     async def process_query(
         self,
         query: str,
@@ -37,19 +51,31 @@ class RealestateOrchestrator:
         """에이전틱 쿼리 처리 - LLM이 도구를 자율 선택"""
         
         start_time = datetime.now()
+        # 이 태스크에서 저장되는 리포트는 세션 ID로 식별
+        current_session.set(session_id)
         
         try:
-            logger.info(f"🤖 에이전틱 쿼리 처리 시작: {query}")
-            
-            # 초기화 확인
-            if not self.initialized:
-                await self.initialize()
+            realestate_workflow = await self.get_realestate_workflow()
+            mode = realestate_workflow.query_mode(query)
             
-            if streaming_callback:
-                await streaming_callback.send_status("🤖 AI 에이전트가 도구를 자율 선택합니다...")  # type: ignore
-            
-            # 에이전틱 워크플로우 실행
-            result = await self.workflow.run_with_streaming(query, streaming_callback)
+            if mode:
+                # 여러 지역 비교는 지역별 동시 수집 → 병합 → 순위 리포트, 시/도·전국 동향은 지역 집계로 처리 (에이전트 도구 호출 없이)
+                logger.info(f"🏠 부동산 워크플로우로 처리 ({mode}): {query}")
+                result = await realestate_workflow.process_query(query, streaming_callback)
+                result.setdefault("analysis", result.get("analysis_content", ""))
+                result["workflow_mode"] = mode
+            else:
+                logger.info(f"🤖 에이전틱 쿼리 처리 시작: {query}")
+                
+                # 초기화 확인
+                if not self.initialized:
+                    await self.initialize()
+                
+                if streaming_callback:
+                    await streaming_callback.send_status("🤖 AI 에이전트가 도구를 자율 선택합니다...")  # type: ignore
+                
+                # 에이전틱 워크플로우 실행
+                result = await self.workflow.run_with_streaming(query, streaming_callback)
             
             # 실행 시간 계산
             execution_time = (datetime.now() - start_time).total_seconds()
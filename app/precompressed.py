@@ -0,0 +1,209 @@
+"""
+미리 압축된 정적 파일 제공
+리포트는 저장 시, 정적 자원은 시작 시 gzip/brotli 파일을 한 번 만들어 두고 Accept-Encoding에 맞춰 강한 ETag와 함께 제공
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip만 제공
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# 선호 순서 (brotli가 같은 품질에서 더 작음)
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".css", ".json", ".svg", ".txt", ".map"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+CONTENT_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def min_compress_bytes() -> int:
+    """이보다 작은 파일은 압축하지 않음"""
+    return int(os.getenv('PRECOMPRESS_MIN_BYTES', '1024'))
+
+
+def write_variants(source_path: str, data: Optional[bytes] = None, target_base: Optional[str] = None) -> List[str]:
+    """파일의 gzip/brotli 버전을 만듭니다. 원본보다 충분히 작아지지 않으면 만들지 않습니다.
+
+    target_base가 없으면 원본 옆({원본}.gz, {원본}.br)에 저장합니다.
+    """
+    if data is None:
+        with open(source_path, 'rb') as f:
+            data = f.read()
+    if len(data) < min_compress_bytes():
+        return []
+
+    target_base = target_base or source_path
+    os.makedirs(os.path.dirname(target_base) or ".", exist_ok=True)
+    compressors = {"gzip": lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors["br"] = lambda raw: brotli.compress(raw, quality=11)
+
+    written = []
+    for encoding, suffix in ENCODINGS:
+        if encoding not in compressors:
+            continue
+        compressed = compressors[encoding](data)
+        # 10% 이상 줄지 않으면 압축 해제 비용만 늘어남
+        if len(compressed) > len(data) * 0.9:
+            continue
+        temp_path = f"{target_base}{suffix}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(temp_path, f"{target_base}{suffix}")
+        written.append(encoding)
+    return written
+
+
+def precompress_tree(directory: str, variants_dir: str) -> int:
+    """디렉터리의 압축 가능한 파일 중 압축본이 없거나 오래된 것을 variants_dir에 만듭니다."""
+    count = 0
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if os.path.splitext(filename)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            source = os.path.join(root, filename)
+            target_base = os.path.join(variants_dir, os.path.relpath(source, directory))
+            try:
+                if _variants_fresh(source, target_base):
+                    continue
+                if write_variants(source, target_base=target_base):
+                    count += 1
+            except OSError as e:
+                logger.warning(f"⚠️ 압축본 생성 실패 ({source}): {e}")
+    if count:
+        logger.info(f"🗜️ {directory} 압축본 생성: {count}개")
+    return count
+
+
+def _variants_fresh(source: str, target_base: str) -> bool:
+    """압축본이 원본보다 나중에 만들어졌는지 확인합니다."""
+    source_mtime = os.stat(source).st_mtime
+    existing = [f"{target_base}{suffix}" for _, suffix in ENCODINGS if os.path.exists(f"{target_base}{suffix}")]
+    return bool(existing) and all(os.stat(path).st_mtime >= source_mtime for path in existing)
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding 헤더를 인코딩 → q값으로 변환합니다."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            quality = float(match.group(1))
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """미리 만든 압축본을 Accept-Encoding에 따라 고르고, 내용 해시 ETag로 304를 돌려주는 StaticFiles
+
+    variants_dir가 있으면 압축본을 그 아래 같은 상대 경로에서, 없으면 원본 옆에서 찾습니다.
+    immutable(상대 경로) → True인 파일(내용 주소 파일)은 1년 immutable 캐시로 제공합니다.
+    on_access(전체 경로)는 파일을 전송하거나 304를 돌려줄 때마다 호출됩니다. (조회 기록)
+    """
+
+    def __init__(
+        self,
+        *args,
+        variants_dir: Optional[str] = None,
+        immutable: Optional[Callable[[str], bool]] = None,
+        on_access: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.variants_dir = variants_dir
+        self.immutable = immutable or (lambda relative_path: False)
+        self.on_access = on_access
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        request_headers = Headers(scope=scope)
+        relative_path = os.path.relpath(full_path, str(self.directory))
+        if self.on_access:
+            self.on_access(full_path)
+
+        encoding, served_path, served_stat = self._negotiate(full_path, relative_path, stat_result, request_headers)
+        digest = self._content_digest(full_path, stat_result)
+        # 표현(인코딩)마다 바이트가 다르므로 강한 ETag도 인코딩별로 다름
+        etag = f'"{digest[:32]}{"-" + encoding if encoding else ""}"'
+        headers = {
+            "etag": etag,
+            "vary": "Accept-Encoding",
+            "cache-control": IMMUTABLE_CACHE_CONTROL if self.immutable(relative_path) else REVALIDATE_CACHE_CONTROL,
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+
+        # 압축본 확장자(.gz/.br)가 아니라 원본 형식으로 전송
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            stat_result=served_stat,
+            method=scope["method"],
+            media_type=media_type,
+            headers=headers
+        )
+        if encoding:
+            response.headers["content-encoding"] = encoding
+        return response
+
+    def _negotiate(
+        self,
+        full_path: str,
+        relative_path: str,
+        stat_result: os.stat_result,
+        request_headers: Headers
+    ) -> Tuple[Optional[str], str, os.stat_result]:
+        """클라이언트가 받을 수 있는 압축본 중 가장 선호하는 것을 고릅니다. 없으면 원본."""
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        base = os.path.join(self.variants_dir, relative_path) if self.variants_dir else full_path
+
+        for encoding, suffix in ENCODINGS:
+            if accepted.get(encoding, accepted.get("*", 0)) <= 0:
+                continue
+            try:
+                variant_stat = os.stat(f"{base}{suffix}")
+            except OSError:
+                continue
+            # 원본이 압축본보다 새로우면 오래된 압축본이므로 사용하지 않음
+            if variant_stat.st_mtime >= stat_result.st_mtime:
+                return encoding, f"{base}{suffix}", variant_stat
+        return None, full_path, stat_result
+
+    def _content_digest(self, full_path: str, stat_result: os.stat_result) -> str:
+        """원본 내용 해시 - 내용 주소 파일은 파일 이름을 그대로 쓰고, 나머지는 (경로, 수정 시각, 크기)별로 한 번만 계산"""
+        stem = os.path.splitext(os.path.basename(full_path))[0]
+        if CONTENT_HASH_PATTERN.match(stem):
+            return stem
+
+        key = (full_path, stat_result.st_mtime_ns, stat_result.st_size)
+        digest = self._digests.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(full_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(chunk)
+            digest = self._digests[key] = sha.hexdigest()
+        return digest
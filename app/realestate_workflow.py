@@ -5,25 +5,59 @@
 
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import asyncio
 
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.tools import BaseTool
+import pandas as pd
 
 from app.llm_client import OpenRouterClient, ModelType
 from app.mcp_client import MCPClient
+from app.trade_analytics import PYEONG_IN_SQM, TradeAnalytics
+from app.trade_store import TradeStore
+from app.chart_renderer import get_chart_renderer
+from app.geo_rollups import NATION_KEY
+from app.region_gazetteer import SIDO_CODES, get_region_gazetteer
+from app.report_catalog import record_report
+from app.report_manifest import (
+    TEMPLATE_RENDERER_META, changed_inputs, frame_digest, input_key, is_template_report,
+    save_manifest, text_digest
+)
+from app.report_store import current_session, get_report_store
+from app.utils.chart_reduction import downsample_rows, reduce_report_data
+from app.utils.trade_data import load_trade_records, recent_year_months, to_trade_frame
 
 logger = logging.getLogger(__name__)
 
+# 여러 지역 비교 요청 표현 - "서울 구별 비교", "서울 25개 구 순위" 등
+COMPARISON_PATTERN = re.compile(r"비교|순위|랭킹|구별|시별|군별|\d+\s*개\s*(?:구|시|군)")
+
 class RealestateWorkflow:
     """부동산 MCP 전용 워크플로우"""
     
-    def __init__(self):
+    def __init__(self, mcp_client: Optional[MCPClient] = None):
         self.llm_client = OpenRouterClient()
-        self.mcp_client = MCPClient()
+        # 오케스트레이터에서 만들 때는 에이전트의 MCP 클라이언트(서버 프로세스)를 공유
+        self.mcp_client = mcp_client or MCPClient()
+        self.analytics = TradeAnalytics()
+        self.trade_store = TradeStore()
+        self.region_gazetteer = get_region_gazetteer()
+        self.report_store = get_report_store()
+        self.chart_renderer = get_chart_renderer()
         self.tools = []
+        # 분석 기간(개월)과 월별 수집 동시 실행 수
+        self.default_months = int(os.getenv('DEFAULT_ANALYSIS_MONTHS', '3'))
+        self.max_months = int(os.getenv('MAX_ANALYSIS_MONTHS', '36'))
+        self.collect_concurrency = int(os.getenv('COLLECT_CONCURRENCY', '4'))
+        # 지역 비교 모드의 최대 지역 수와 지역×월 수집 동시 실행 수
+        self.max_compare_regions = int(os.getenv('MAX_COMPARE_REGIONS', '50'))
+        self.compare_concurrency = int(os.getenv('COMPARE_CONCURRENCY', '8'))
+        # 시/도·전국 동향 분석 시 집계에 없는 시/군/구를 한 번에 수집하는 최대 수
+        self.rollup_fill_regions = int(os.getenv('ROLLUP_FILL_REGIONS', '50'))
         
     async def initialize(self) -> bool:
         """부동산 MCP 도구 초기화"""
@@ -37,12 +71,28 @@ class RealestateWorkflow:
             logger.info(f"🏠 부동산 도구 {len(tools_info)}개 발견")
             self.tools = tools_info
             
+            # 전국 지역코드 사전이 없으면 get_region_codes로 한 번 수집 (백그라운드)
+            self.region_gazetteer.ensure_loaded(self.mcp_client)
+            
             return True
             
         except Exception as e:
             logger.error(f"❌ 부동산 워크플로우 초기화 실패: {e}")
             return False
     
+    def query_mode(self, user_query: str) -> Optional[str]:
+        """에이전트 대신 이 워크플로우가 처리할 쿼리 유형 - 여러 지역 비교면 "comparison",
+        시/군/구 없이 시/도나 전국 동향이면 "area"(지역 집계), 아니면 None
+
+        지역 사전만 사용하므로 MCP/LLM 호출 없이 판정합니다.
+        """
+        districts = self.region_gazetteer.resolve_districts(user_query)
+        if len(self._comparison_regions(user_query, districts)) > 1:
+            return "comparison"
+        if not districts and self._area_region(user_query):
+            return "area"
+        return None
+
     async def process_query(
         self, 
         user_query: str, 
@@ -73,6 +123,7 @@ class RealestateWorkflow:
             if streaming_callback:
                 await streaming_callback.send_status("2️⃣ 단계 2: 분석 유형 결정 중...")  # type: ignore
             analysis_type = await self._determine_analysis_type(user_query)
+            analysis_months = self._determine_period(user_query)
             
             if streaming_callback:
                 type_info = {
@@ -83,13 +134,26 @@ class RealestateWorkflow:
                         "house": "단독/다가구",
                         "row_house": "연립다세대"
                     }.get(analysis_type, "부동산"),
-                    "관련_MCP_도구": f"get_{analysis_type}_trade_data, analyze_{analysis_type}_trade"
+                    "관련_MCP_도구": f"get_{analysis_type}_trade_data, analyze_{analysis_type}_trade",
+                    "분석_기간": f"최근 {analysis_months}개월"
                 }
                 await streaming_callback.send_content(f"🏘️ 분석 유형 결정:\n```json\n{json.dumps(type_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
                 await streaming_callback.send_status("3️⃣ 단계 3: 실제 데이터 수집 시작...")  # type: ignore
             
+            # 여러 지역이 대상이면 비교 모드로 처리
+            if len(region_info["regions"]) > 1:
+                return await self._process_comparison(
+                    user_query, region_info["regions"], analysis_type, analysis_months, streaming_callback
+                )
+            
+            # 시/도 또는 전국 동향은 지역 집계에서 바로 조회
+            if region_info.get("level") in ("sido", "nation"):
+                return await self._process_area_trend(
+                    user_query, region_info, analysis_type, analysis_months, streaming_callback
+                )
+            
             # 3단계: 데이터 수집
-            data_files = await self._collect_data(region_info, analysis_type, streaming_callback)
+            data_files = await self._collect_data(region_info, analysis_type, streaming_callback, analysis_months)
             
             # 4단계: 분석 실행
             if streaming_callback:
@@ -99,8 +163,13 @@ class RealestateWorkflow:
             # 5단계: HTML 리포트 생성
             if streaming_callback:
                 await streaming_callback.send_status("5️⃣ 단계 5: 전문 HTML 리포트 생성...")  # type: ignore
+            report_id = self._new_report_id("realestate_report")
             report_html = await self._generate_html_report(
-                user_query, region_info, analysis_type, analysis_results, streaming_callback
+                user_query, region_info, analysis_type, analysis_results, streaming_callback, report_id
+            )
+            self._write_manifest(
+                report_id, "single", user_query, analysis_type, analysis_months, region_info,
+                self._collected_inputs(region_info["code"], data_files)
             )
             
             if streaming_callback:
@@ -122,6 +191,8 @@ class RealestateWorkflow:
             return {
                 "success": True,
                 "report_content": report_html,
+                "report_id": report_id,
+                "report_url": self._report_url(report_id),
                 "analysis_content": json.dumps(analysis_results, ensure_ascii=False, indent=2),
                 "region_info": region_info,
                 "analysis_type": analysis_type
@@ -138,44 +209,335 @@ class RealestateWorkflow:
                 "analysis_content": ""
             }
     
+    async def refresh_report(self, report_id: str, streaming_callback=None) -> Dict[str, Any]:
+        """리포트 갱신 - 분석 기간을 현재 기준으로 옮겨 새 월과 바뀐 월만 반영합니다.
+
+        확정된 월은 로컬 저장소에서 읽고 새 월/미확정 월만 MCP로 수집합니다. 입력 해시가 바뀌지 않았으면 그대로 두고,
+        템플릿 리포트는 다시 렌더링, LLM 리포트는 LLM 호출 없이 report-data 블록만 교체합니다.
+        """
+        report_path = self._report_path(report_id)
+        manifest = self.report_store.load_manifest(report_id)
+        if not manifest or not report_path:
+            return {"success": False, "report_id": report_id, "error": "매니페스트가 있는 리포트를 찾을 수 없습니다"}
+
+        kind, region_info = manifest["kind"], manifest["region_info"]
+        analysis_type, analysis_months, user_query = manifest["analysis_type"], manifest["months"], manifest["query"]
+
+        if streaming_callback:
+            await streaming_callback.send_status(f"🔄 리포트 갱신: {region_info['full_name']} 최근 {analysis_months}개월")  # type: ignore
+
+        if kind == "comparison":
+            labels = self._region_labels(region_info["regions"])
+            region_data = await self._collect_regions(region_info["regions"], labels, analysis_type, streaming_callback, analysis_months)
+            analysis_results = await self._comparison_results(region_data, labels)
+            inputs: Dict[str, Dict[str, Any]] = {}
+            for data in region_data:
+                inputs.update(self._collected_inputs(data["region"]["code"], data["entries"]))
+        elif kind == "area":
+            analysis_results, inputs = await self._area_trend_results(region_info, analysis_type, analysis_months, streaming_callback)
+        else:
+            collected = await self._collect_data(region_info, analysis_type, streaming_callback, analysis_months)
+            analysis_results = await self._analyze_data(collected, streaming_callback)
+            inputs = self._collected_inputs(region_info["code"], collected)
+
+        changed = changed_inputs(manifest.get("inputs", {}), inputs)
+        result = {
+            "success": True,
+            "report_id": report_id,
+            "changed_inputs": changed,
+            "fetched_inputs": sum(1 for entry in inputs.values() if entry["source"] == "mcp"),
+            "total_inputs": len(inputs)
+        }
+        if not changed:
+            logger.info(f"🔄 리포트 입력 변경 없음: {report_id}")
+            return {**result, "refreshed": False, "mode": "unchanged", "report_url": self._report_url(report_id)}
+
+        with open(report_path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        if not is_template_report(html):
+            mode = "patch"
+            html = self._save_report(report_id, html, analysis_results)
+        elif kind == "comparison":
+            mode = "rerender"
+            html = self._generate_comparison_html(user_query, analysis_type, analysis_results, report_id)
+        else:
+            mode = "rerender"
+            html = await self._generate_fallback_html(user_query, region_info, analysis_type, analysis_results, report_id)
+
+        save_manifest(self.report_store.manifest_base(report_id), {
+            **manifest,
+            "inputs": inputs,
+            "refreshed_at": datetime.now().timestamp(),
+            "last_changed_inputs": changed
+        })
+
+        logger.info(f"🔄 리포트 갱신 완료 ({mode}): {report_id}, 변경 입력 {len(changed)}개")
+        if streaming_callback:
+            await streaming_callback.send_status(f"✅ 리포트 갱신 완료: 변경된 입력 {len(changed)}개")  # type: ignore
+        return {**result, "refreshed": True, "mode": mode, "report_url": self._report_url(report_id), "report_content": html}
+
+    async def _process_comparison(
+        self,
+        user_query: str,
+        regions: List[Dict[str, Any]],
+        analysis_type: str,
+        analysis_months: int,
+        streaming_callback
+    ) -> Dict[str, Any]:
+        """지역 비교 처리 - 지역별 동시 수집 → 하나의 DataFrame으로 병합 → 지역 순위 분석 → 비교 리포트"""
+
+        labels = self._region_labels(regions)
+        region_info = {
+            "name": f"{labels[regions[0]['code']]} 외 {len(regions) - 1}개 지역",
+            "code": regions[0]["code"],
+            "full_name": ", ".join(labels.values()),
+            "is_default": False,
+            "regions": regions,
+            "comparison": True
+        }
+
+        if streaming_callback:
+            comparison_info = {
+                "비교_모드": True,
+                "지역_수": len(regions),
+                "지역": list(labels.values()),
+                "분석_기간": f"최근 {analysis_months}개월",
+                "동시_수집_수": self.compare_concurrency
+            }
+            await streaming_callback.send_content(f"🗺️ 지역 비교 분석:\n```json\n{json.dumps(comparison_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+
+        region_data = await self._collect_regions(regions, labels, analysis_type, streaming_callback, analysis_months)
+
+        if streaming_callback:
+            await streaming_callback.send_status("4️⃣ 단계 4: 지역별 데이터 병합 및 순위 분석...")  # type: ignore
+
+        analysis_results = await self._comparison_results(region_data, labels)
+
+        if streaming_callback:
+            top_regions = [
+                {"순위": row["rank"], "지역": row["region"], "평균가": f"{row['avg_price']:,.0f}만원", "거래건수": row["transactions"]}
+                for row in analysis_results["region_comparison"][:5]
+            ]
+            await streaming_callback.send_content(f"🏆 평균 거래가 상위 지역:\n```json\n{json.dumps(top_regions, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+            await streaming_callback.send_status("5️⃣ 단계 5: 지역 비교 리포트 생성...")  # type: ignore
+
+        report_id = self._new_report_id("realestate_comparison")
+        report_html = self._generate_comparison_html(user_query, analysis_type, analysis_results, report_id)
+        inputs: Dict[str, Dict[str, Any]] = {}
+        for data in region_data:
+            inputs.update(self._collected_inputs(data["region"]["code"], data["entries"]))
+        self._write_manifest(report_id, "comparison", user_query, analysis_type, analysis_months, region_info, inputs)
+
+        if streaming_callback:
+            await streaming_callback.send_code(report_html)  # type: ignore
+            await streaming_callback.send_status(f"✅ {len(regions)}개 지역 비교 분석이 완료되었습니다")  # type: ignore
+
+        return {
+            "success": True,
+            "report_content": report_html,
+            "report_id": report_id,
+            "report_url": self._report_url(report_id),
+            "analysis_content": json.dumps(analysis_results, ensure_ascii=False, indent=2),
+            "region_info": region_info,
+            "analysis_type": analysis_type
+        }
+
+    async def _process_area_trend(
+        self,
+        user_query: str,
+        region_info: Dict[str, Any],
+        analysis_type: str,
+        analysis_months: int,
+        streaming_callback
+    ) -> Dict[str, Any]:
+        """시/도·전국 동향 처리 - 미리 계산된 지역 집계로 분석하고, 집계에 없는 시/군/구만 수집"""
+
+        analysis_results, inputs = await self._area_trend_results(region_info, analysis_type, analysis_months, streaming_callback)
+        coverage = analysis_results["coverage"]
+
+        if streaming_callback:
+            summary_json = {
+                "지역_집계_결과": {
+                    "지역": region_info["full_name"],
+                    "총_거래건수": analysis_results["total_transactions"],
+                    "평균_거래가격": f"{analysis_results['avg_price_overall']:,.0f}만원",
+                    "분석_기간": analysis_results["analysis_period"],
+                    "월별_집계_지역_수": coverage["regions_by_month"],
+                    "대상_지역_수": coverage["expected_regions"]
+                }
+            }
+            await streaming_callback.send_content(f"📊 지역 집계 분석 결과:\n```json\n{json.dumps(summary_json, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+            await streaming_callback.send_status("5️⃣ 단계 5: 전문 HTML 리포트 생성...")  # type: ignore
+
+        report_id = self._new_report_id("realestate_report")
+        report_html = await self._generate_html_report(
+            user_query, region_info, analysis_type, analysis_results, streaming_callback, report_id
+        )
+        self._write_manifest(report_id, "area", user_query, analysis_type, analysis_months, region_info, inputs)
+
+        if streaming_callback:
+            await streaming_callback.send_status("✅ 부동산 분석이 완료되었습니다")  # type: ignore
+
+        return {
+            "success": True,
+            "report_content": report_html,
+            "report_id": report_id,
+            "report_url": self._report_url(report_id),
+            "analysis_content": json.dumps(analysis_results, ensure_ascii=False, indent=2),
+            "region_info": region_info,
+            "analysis_type": analysis_type
+        }
+
+    def _region_labels(self, regions: List[Dict[str, Any]]) -> Dict[str, str]:
+        """비교 지역 표시 이름 - 여러 시/도에 걸치면 "중구"처럼 겹치는 이름이 있으므로 시/도명까지 표시"""
+        multi_sido = len({region["sido_code"] for region in regions}) > 1
+        return {region["code"]: region["full_name"] if multi_sido else region["name"] for region in regions}
+
+    async def _comparison_results(self, region_data: List[Dict[str, Any]], labels: Dict[str, str]) -> Dict[str, Any]:
+        """지역별 DataFrame을 지역 컬럼과 함께 하나로 합쳐 전체 분석과 지역 순위를 한 번에 계산합니다."""
+
+        frames = [
+            data["frame"].assign(region_code=data["region"]["code"], region_name=labels[data["region"]["code"]])
+            for data in region_data if not data["frame"].empty
+        ]
+        merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if not merged.empty:
+            merged["region_name"] = merged["region_name"].astype("category")
+
+        analysis_results = await asyncio.to_thread(self.analytics.analyze, merged)
+        analysis_results["region_comparison"] = await asyncio.to_thread(self.analytics.compare_regions, merged)
+        analysis_results["regions_count"] = len(labels)
+        return analysis_results
+
+    async def _area_trend_results(
+        self,
+        region_info: Dict[str, Any],
+        analysis_type: str,
+        analysis_months: int,
+        streaming_callback
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """집계에 없는 시/군/구만 수집한 뒤 지역 집계로 월별 동향과 하위 지역 순위를 계산합니다."""
+
+        level, key = region_info["level"], region_info["code"]
+        year_months = recent_year_months(analysis_months)
+        start_month, end_month = min(year_months), max(year_months)
+
+        sido_codes = [key] if level == "sido" else list(SIDO_CODES)
+        leaves = [district for sido_code in sido_codes for district in self.region_gazetteer.districts_of(sido_code)]
+        missing = [
+            leaf for leaf in leaves
+            if not all(self.trade_store.has_partition(leaf["code"], year_month) for year_month in year_months)
+        ]
+
+        if missing:
+            fill = missing[:self.rollup_fill_regions]
+            if len(missing) > len(fill):
+                logger.warning(f"⚠️ 집계에 없는 {len(missing)}개 지역 중 {len(fill)}개만 수집 - 나머지는 백필로 채워야 합니다")
+            if streaming_callback:
+                await streaming_callback.send_status(f"📊 집계에 없는 {len(fill)}개 지역 데이터를 수집합니다...")  # type: ignore
+            # 수집한 파티션은 저장소에 쓰이면서 지역 집계도 함께 갱신됨
+            await self._collect_regions(
+                fill, {leaf["code"]: leaf["full_name"] for leaf in fill}, analysis_type, streaming_callback, analysis_months
+            )
+        elif streaming_callback:
+            await streaming_callback.send_status(f"⚡ {region_info['full_name']} 지역 집계에서 조회합니다 ({len(leaves)}개 시/군/구)")  # type: ignore
+
+        if streaming_callback:
+            await streaming_callback.send_status("4️⃣ 단계 4: 지역 집계 조회 및 분석...")  # type: ignore
+
+        rollups = self.trade_store.rollups
+        monthly = await asyncio.to_thread(rollups.trend, level, key, start_month, end_month)
+        # 월별 집계 행 자체를 입력으로 기록 - 하위 지역 파티션이 바뀌면 해시도 바뀜
+        inputs = {
+            input_key(key, row["month"]): {
+                "source": "rollup",
+                "digest": text_digest(json.dumps(row, sort_keys=True)),
+                "rows": row["transactions"]
+            }
+            for row in monthly
+        }
+        totals = await asyncio.to_thread(rollups.summary, level, key, start_month, end_month)
+        children = await asyncio.to_thread(rollups.breakdown, level, key, start_month, end_month)
+        coverage = await asyncio.to_thread(rollups.coverage, level, key, year_months)
+
+        analysis_results = self.analytics.add_monthly_summaries(self.analytics.empty_result(), monthly)
+        if totals.get("avg_price_per_area"):
+            analysis_results["avg_price_per_area"] = totals["avg_price_per_area"]
+            analysis_results["avg_price_per_pyeong"] = round(totals["avg_price_per_area"] * PYEONG_IN_SQM, 2)
+
+        # 하위 단위(시/도 → 시/군/구, 전국 → 시/도) 평균가 순위
+        analysis_results["region_comparison"] = [
+            {
+                "rank": rank,
+                "region": self._rollup_child_name(level, child["key"]),
+                "transactions": child["transactions"],
+                "avg_price": child["avg_price"],
+                "avg_price_per_pyeong": round(child["avg_price_per_area"] * PYEONG_IN_SQM, 2) if child["avg_price_per_area"] else None,
+                "max_price": child["max_price"],
+                "min_price": child["min_price"]
+            }
+            for rank, child in enumerate(children, 1)
+        ]
+        analysis_results["coverage"] = {"expected_regions": len(leaves), "regions_by_month": coverage}
+
+        return analysis_results, inputs
+
+    def _rollup_child_name(self, level: str, key: str) -> str:
+        """집계 하위 단위 키(시/도 코드 또는 시/군/구 코드)를 이름으로 변환합니다."""
+        if level == "nation":
+            return SIDO_CODES.get(key, (key, []))[0]
+        entry = self.region_gazetteer.regions.get(key)
+        return entry["name"] if entry else key
+
     async def _extract_region_info(self, query: str, streaming_callback) -> Dict[str, Any]:
-        """지역 정보 추출"""
+        """지역 정보 추출 - 지역 사전으로 쿼리의 시/군/구를 코드로 변환"""
         
         if streaming_callback:
             await streaming_callback.send_status("📍 지역 정보를 파악 중...")  # type: ignore
         
-        # 간단한 지역 매핑
-        region_map = {
-            "강남구": "11680", "서초구": "11650", "송파구": "11710", "강동구": "11740",
-            "마포구": "11440", "영등포구": "11560", "용산구": "11170", "중구": "11140",
-            "종로구": "11110", "성동구": "11200", "광진구": "11215", "동대문구": "11230",
-            "중랑구": "11260", "성북구": "11290", "강북구": "11305", "도봉구": "11320",
-            "노원구": "11350", "은평구": "11380", "서대문구": "11410", "양천구": "11470",
-            "강서구": "11500", "구로구": "11530", "금천구": "11545", "관악구": "11620",
-            "동작구": "11590", "과천시": "41290", "광명시": "41210", "하남시": "41450"
-        }
+        regions = self._comparison_regions(query, self.region_gazetteer.resolve_districts(query))
+        if not regions:
+            area = self._area_region(query)
+            if area:
+                logger.info(f"📍 분석 지역: {area['full_name']} (지역 집계)")
+                if streaming_callback:
+                    await streaming_callback.send_status(f"✅ 분석 지역 확정: {area['full_name']} (지역 집계 사용)")  # type: ignore
+                return area
         
-        region_name = None
-        region_code = None
+        region = regions[0] if regions else self.region_gazetteer.default_region()
         
-        for name, code in region_map.items():
-            if name in query:
-                region_name = name
-                region_code = code
-                break
+        if len(regions) > 1:
+            logger.info(f"📍 비교 지역 {len(regions)}개: {', '.join(entry['name'] for entry in regions)}")
+            if streaming_callback:
+                await streaming_callback.send_status(f"✅ 비교 지역 {len(regions)}개 확정")  # type: ignore
+            return {
+                "name": region["name"],
+                "code": region["code"],
+                "full_name": region["full_name"],
+                "is_default": False,
+                "regions": regions
+            }
         
-        if not region_name:
-            region_name = "강남구"  # 기본값
-            region_code = "11680"
+        if region.get("is_default"):
+            logger.warning(f"⚠️ 쿼리에서 지역을 찾지 못해 기본 지역 사용: {region['full_name']} ({region['code']})")
+            if streaming_callback:
+                await streaming_callback.send_status(f"⚠️ 지역을 찾지 못해 기본 지역({region['full_name']})으로 분석합니다")  # type: ignore
+        elif region.get("ambiguous") and streaming_callback:
+            candidates = ", ".join(candidate["full_name"] for candidate in region["candidates"])
+            await streaming_callback.send_status(f"⚠️ 같은 이름의 지역이 여러 곳입니다 ({candidates}) - {region['full_name']}으로 분석합니다")  # type: ignore
         
-        logger.info(f"📍 분석 지역: {region_name} ({region_code})")
+        logger.info(f"📍 분석 지역: {region['full_name']} ({region['code']})")
         
         if streaming_callback:
-            await streaming_callback.send_status(f"✅ 분석 지역 확정: {region_name}")  # type: ignore
+            await streaming_callback.send_status(f"✅ 분석 지역 확정: {region['full_name']}")  # type: ignore
         
         return {
-            "name": region_name,
-            "code": region_code
+            "name": region["name"],
+            "code": region["code"],
+            "full_name": region["full_name"],
+            "is_default": region.get("is_default", False),
+            "regions": regions
         }
     
     async def _determine_analysis_type(self, query: str) -> str:
@@ -192,145 +554,333 @@ class RealestateWorkflow:
         else:
             return "apartment"  # 기본값
     
+    def _determine_period(self, query: str) -> int:
+        """쿼리에서 분석 기간(개월 수)을 파악합니다. 예: "최근 6개월", "최근 1년", "3년간", "반년\""""
+        
+        months = None
+        month_match = re.search(r"(\d{1,3})\s*개월", query)
+        # "24년 아파트 거래"처럼 연도를 줄여 쓴 경우와 구분하기 위해 기간 표지(최근/지난, 간/동안/치)가 있을 때만 기간으로 봄
+        year_match = re.search(r"(?:최근|지난)\s*(\d{1,2})\s*년(?!도)", query) or \
+            re.search(r"(?<!\d)(\d{1,2})\s*년\s*(?:간|동안|치)", query)
+        
+        if month_match:
+            months = int(month_match.group(1))
+        elif year_match:
+            months = int(year_match.group(1)) * 12
+        elif "반년" in query:
+            months = 6
+        
+        months = months or self.default_months
+        return max(1, min(months, self.max_months))
+
+    def _area_region(self, query: str) -> Optional[Dict[str, Any]]:
+        """시/군/구 없이 시/도만 언급되었거나 "전국"이 언급된 쿼리의 집계 단위"""
+
+        if "전국" in query:
+            return {"name": "전국", "code": NATION_KEY, "full_name": "전국", "level": "nation", "is_default": False, "regions": []}
+
+        sidos = [region for region in self.region_gazetteer.resolve(query) if region["level"] == "sido"]
+        if not sidos:
+            return None
+        sido = sidos[0]
+        return {"name": sido["name"], "code": sido["sido_code"], "full_name": sido["full_name"], "level": "sido", "is_default": False, "regions": []}
+
+    def _comparison_regions(self, query: str, districts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """분석 대상 시/군/구 - 비교 요청에서 시/도가 언급되면 그 시/도의 모든 시/군/구를 추가"""
+
+        regions = list(districts)
+        if COMPARISON_PATTERN.search(query):
+            for region in self.region_gazetteer.resolve(query):
+                if region["level"] == "sido":
+                    regions.extend(self.region_gazetteer.districts_of(region["sido_code"]))
+
+        unique = list({region["code"]: region for region in regions}.values())
+        if len(unique) > self.max_compare_regions:
+            logger.warning(f"⚠️ 비교 지역 {len(unique)}개 중 {self.max_compare_regions}개만 분석")
+            unique = unique[:self.max_compare_regions]
+        return unique
+
     async def _collect_data(
         self, 
         region_info: Dict[str, Any], 
         analysis_type: str, 
-        streaming_callback
+        streaming_callback,
+        months: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """데이터 수집 - 실제 MCP 도구 호출"""
+        """데이터 수집 - 월별 MCP 도구 호출을 동시에 실행하고 완료되는 순서대로 결과 전송"""
         
         if streaming_callback:
             await streaming_callback.send_status("📊 부동산 거래 데이터를 수집 중...")  # type: ignore
             await streaming_callback.send_tool_start(f"get_{analysis_type}_trade_data")  # type: ignore
         
-        # 최근 3개월 데이터 수집
-        current_date = datetime.now()
-        year_months = []
+        year_months = recent_year_months(months or self.default_months)
+        semaphore = asyncio.Semaphore(self.collect_concurrency)
         
-        for i in range(3):
-            if current_date.month - i > 0:
-                year_month = f"{current_date.year}{current_date.month - i:02d}"
-            else:
-                year_month = f"{current_date.year - 1}{12 + current_date.month - i:02d}"
-            year_months.append(year_month)
+        async def collect(year_month: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._collect_month(region_info, year_month, streaming_callback)
         
+        tasks = [asyncio.create_task(collect(year_month)) for year_month in year_months]
         collected_data = []
         
-        for idx, year_month in enumerate(year_months):
-            try:
-                if streaming_callback:
-                    await streaming_callback.send_status(f"📅 {year_month} 데이터 수집 중... ({idx+1}/{len(year_months)})")  # type: ignore
-                
-                # MCP 도구 호출하여 실제 데이터 수집
-                tool_name = f"get_apt_trade_data"  # 아파트 매매 데이터
-                args = {
-                    "region_code": region_info["code"],
-                    "year_month": year_month
-                }
-                
-                logger.info(f"🔧 MCP 도구 호출: {tool_name}, args: {args}")
+        try:
+            for completed, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                entry = await next_done
+                if not entry:
+                    continue
+                collected_data.append(entry)
                 
                 if streaming_callback:
-                    # JSON 형태로 도구 호출 정보 전송
-                    tool_call_info = {
-                        "tool": tool_name,
-                        "arguments": args,
-                        "region": region_info["name"],
-                        "period": year_month
+                    # 월별 결과를 완료되는 즉시 표시
+                    frame = entry.get("frame")
+                    analysis = entry.get("analysis", {})
+                    month_summary = {
+                        "period": entry["year_month"],
+                        "source": entry.get("source", "mcp"),
+                        "transactions": len(frame) if frame is not None else analysis.get("총_거래건수", 0),
+                        "avg_price": round(float(frame["deal_amount"].mean()), 0)
+                        if frame is not None and "deal_amount" in frame.columns and len(frame) else analysis.get("평균_거래가격", 0)
                     }
-                    await streaming_callback.send_content(f"🔧 MCP 도구 호출:\n```json\n{json.dumps(tool_call_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
-                
-                result = await self.mcp_client.call_tool('kr-realestate', tool_name, args)
-                
-                if result and result.get('content'):
-                    content = result['content'][0]['text'] if isinstance(result['content'], list) else result['content']
-                    logger.info(f"📊 {year_month} 데이터 수집 완료: {content[:100]}...")
-                    
-                    if streaming_callback:
-                        # MCP 응답 결과를 UI에 표시
-                        response_info = {
-                            "tool_response": {
-                                "tool": tool_name,
-                                "status": "success",
-                                "file_path": content if content.endswith('.json') else "N/A",
-                                "content_preview": content[:200] + "..." if len(content) > 200 else content
-                            }
-                        }
-                        await streaming_callback.send_content(f"📥 MCP 응답 결과:\n```json\n{json.dumps(response_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
-                        await streaming_callback.send_status(f"✅ {year_month} 원시 데이터 수집 완료")  # type: ignore
-                    
-                    # 파일 경로가 아닌 실제 데이터로 분석
-                    if content.endswith('.json'):
-                        if streaming_callback:
-                            await streaming_callback.send_status(f"🔍 {year_month} 데이터 분석 중...")  # type: ignore
-                        
-                        # 분석 도구로 통계 생성
-                        analyze_tool = f"analyze_apartment_trade"
-                        analyze_args = {"file_path": content}
-                        
-                        if streaming_callback:
-                            analyze_call_info = {
-                                "tool": analyze_tool,
-                                "arguments": analyze_args,
-                                "data_file": content.split('/')[-1]
-                            }
-                            await streaming_callback.send_content(f"📊 분석 도구 호출:\n```json\n{json.dumps(analyze_call_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
-                        
-                        analyze_result = await self.mcp_client.call_tool('kr-realestate', analyze_tool, analyze_args)
-                        if analyze_result and analyze_result.get('content'):
-                            analyze_content = analyze_result['content'][0]['text'] if isinstance(analyze_result['content'], list) else analyze_result['content']
-                            
-                            if streaming_callback:
-                                # 분석 도구 응답 결과 표시
-                                analyze_response_info = {
-                                    "analyze_response": {
-                                        "tool": analyze_tool,
-                                        "status": "success",
-                                        "content_length": len(analyze_content),
-                                        "response_preview": analyze_content[:300] + "..." if len(analyze_content) > 300 else analyze_content
-                                    }
-                                }
-                                await streaming_callback.send_content(f"📥 분석 도구 응답:\n```json\n{json.dumps(analyze_response_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
-                            
-                            try:
-                                # JSON 파싱하여 실제 분석 데이터 추출
-                                analysis_data = json.loads(analyze_content)
-                                collected_data.append({
-                                    "year_month": year_month,
-                                    "raw_file": content,
-                                    "analysis": analysis_data,
-                                    "raw_response": analyze_content  # 원시 응답 데이터도 보관
-                                })
-                                
-                                if streaming_callback:
-                                    # 분석 결과를 예쁜 JSON으로 표시
-                                    result_summary = {
-                                        "period": year_month,
-                                        "transactions": analysis_data.get("총_거래건수", 0),
-                                        "avg_price": analysis_data.get("평균_거래가격", 0),
-                                        "max_price": analysis_data.get("최고_거래가격", 0),
-                                        "min_price": analysis_data.get("최저_거래가격", 0)
-                                    }
-                                    await streaming_callback.send_content(f"📈 {year_month} 분석 결과:\n```json\n{json.dumps(result_summary, ensure_ascii=False, indent=2)}\n```")  # type: ignore
-                                    await streaming_callback.send_status(f"✅ {year_month} 분석 완료: {analysis_data.get('총_거래건수', 0)}건")  # type: ignore
-                                
-                                logger.info(f"✅ {year_month} 분석 완료")
-                            except json.JSONDecodeError:
-                                logger.warning(f"⚠️ {year_month} 분석 결과 JSON 파싱 실패")
-                                if streaming_callback:
-                                    await streaming_callback.send_status(f"⚠️ {year_month} 분석 실패: JSON 파싱 오류")  # type: ignore
-                
-            except Exception as e:
-                logger.warning(f"⚠️ {year_month} 데이터 수집 실패: {e}")
-                if streaming_callback:
-                    await streaming_callback.send_status(f"⚠️ {year_month} 데이터 수집 실패: {str(e)}")  # type: ignore
+                    await streaming_callback.send_content(f"📈 {entry['year_month']} 수집 결과:\n```json\n{json.dumps(month_summary, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+                    await streaming_callback.send_status(f"✅ {entry['year_month']} 완료 ({completed}/{len(year_months)})")  # type: ignore
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        collected_data.sort(key=lambda entry: entry["year_month"])
         
         if streaming_callback:
             await streaming_callback.send_tool_complete(f"get_{analysis_type}_trade_data", f"{len(collected_data)}개월 데이터 수집 및 분석")  # type: ignore
             await streaming_callback.send_status("📊 전체 데이터 수집 완료")  # type: ignore
         
         return collected_data
+
+    async def _collect_regions(
+        self,
+        regions: List[Dict[str, Any]],
+        labels: Dict[str, str],
+        analysis_type: str,
+        streaming_callback,
+        months: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """비교 수집 - 지역×월 호출을 하나의 제한된 작업 풀에서 동시에 실행하고 지역이 끝나는 순서대로 결과 전송"""
+
+        if streaming_callback:
+            await streaming_callback.send_status(f"📊 {len(regions)}개 지역 거래 데이터를 동시에 수집 중...")  # type: ignore
+            await streaming_callback.send_tool_start(f"get_{analysis_type}_trade_data")  # type: ignore
+
+        year_months = recent_year_months(months or self.default_months)
+        # 모든 지역이 같은 한도를 공유 - MCP 서버 프로세스 풀(MCP_SERVER_POOL_SIZE)이 실제 병렬도를 결정
+        semaphore = asyncio.Semaphore(self.compare_concurrency)
+
+        async def collect_month(region: Dict[str, Any], year_month: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                # 지역×월 단위 메시지는 생략하고 지역 단위로만 진행 상황 전송
+                return await self._collect_month(region, year_month, None)
+
+        async def collect_region(region: Dict[str, Any]):
+            entries = await asyncio.gather(*(collect_month(region, year_month) for year_month in year_months))
+            return region, [entry for entry in entries if entry]
+
+        tasks = [asyncio.create_task(collect_region(region)) for region in regions]
+        region_data = []
+
+        try:
+            for completed, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                region, entries = await next_done
+                frames = [entry["frame"] for entry in entries if entry.get("frame") is not None and not entry["frame"].empty]
+                frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+                skipped = len(entries) - len(frames)
+                if skipped:
+                    logger.info(f"ℹ️ {region['full_name']}: 원시 레코드가 없는 {skipped}개월은 비교에서 제외")
+                region_data.append({"region": region, "frame": frame, "months": len(entries), "entries": entries})
+
+                if streaming_callback:
+                    region_summary = {
+                        "region": labels[region["code"]],
+                        "code": region["code"],
+                        "months": len(entries),
+                        "transactions": len(frame),
+                        "avg_price": round(float(frame["deal_amount"].mean()), 0)
+                        if "deal_amount" in frame.columns and len(frame) else 0
+                    }
+                    await streaming_callback.send_content(f"📍 {labels[region['code']]} 수집 결과:\n```json\n{json.dumps(region_summary, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+                    await streaming_callback.send_status(f"✅ {labels[region['code']]} 완료 ({completed}/{len(regions)})")  # type: ignore
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if streaming_callback:
+            await streaming_callback.send_tool_complete(f"get_{analysis_type}_trade_data", f"{len(region_data)}개 지역 x {len(year_months)}개월 데이터 수집")  # type: ignore
+            await streaming_callback.send_status("📊 전체 지역 데이터 수집 완료")  # type: ignore
+
+        return region_data
+
+    async def _collect_month(
+        self,
+        region_info: Dict[str, Any],
+        year_month: str,
+        streaming_callback
+    ) -> Optional[Dict[str, Any]]:
+        """한 달치 데이터 수집 - 저장소 조회 → MCP 수집 → 로컬 정규화 (실패 시 MCP 분석 도구)"""
+        
+        try:
+            # 백필 등으로 이미 확정된 월은 로컬 저장소에서 바로 읽음
+            if self.trade_store.is_settled(region_info["code"], year_month):
+                frame = await asyncio.to_thread(
+                    self.trade_store.scan, [region_info["code"]], year_month, year_month
+                )
+                return {
+                    "year_month": year_month,
+                    "frame": frame,
+                    "source": "trade_store"
+                }
+            
+            if streaming_callback:
+                await streaming_callback.send_status(f"📅 {year_month} 데이터 수집 중...")  # type: ignore
+            
+            # MCP 도구 호출하여 실제 데이터 수집
+            tool_name = f"get_apt_trade_data"  # 아파트 매매 데이터
+            args = {
+                "region_code": region_info["code"],
+                "year_month": year_month
+            }
+            
+            logger.info(f"🔧 MCP 도구 호출: {tool_name}, args: {args}")
+            
+            if streaming_callback:
+                # JSON 형태로 도구 호출 정보 전송
+                tool_call_info = {
+                    "tool": tool_name,
+                    "arguments": args,
+                    "region": region_info["name"],
+                    "period": year_month
+                }
+                await streaming_callback.send_content(f"🔧 MCP 도구 호출:\n```json\n{json.dumps(tool_call_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+            
+            result = await self.mcp_client.call_tool('kr-realestate', tool_name, args)
+            if not (result and result.get('content')):
+                return None
+            
+            content = result['content'][0]['text'] if isinstance(result['content'], list) else result['content']
+            logger.info(f"📊 {year_month} 데이터 수집 완료: {content[:100]}...")
+            
+            if streaming_callback:
+                # MCP 응답 결과를 UI에 표시
+                response_info = {
+                    "tool_response": {
+                        "tool": tool_name,
+                        "status": "success",
+                        "file_path": content if content.endswith('.json') else "N/A",
+                        "content_preview": content[:200] + "..." if len(content) > 200 else content
+                    }
+                }
+                await streaming_callback.send_content(f"📥 MCP 응답 결과:\n```json\n{json.dumps(response_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+            
+            # 원시 거래 레코드를 직접 읽어 정규화 - 다른 월의 수집과 겹치도록 스레드에서 실행
+            frame = await asyncio.to_thread(self._load_month_frame, region_info["code"], year_month, content)
+            if not frame.empty:
+                logger.info(f"✅ {year_month} 거래 레코드 {len(frame)}건 로드")
+                return {
+                    "year_month": year_month,
+                    "raw_file": content,
+                    "frame": frame,
+                    "source": "mcp"
+                }
+            
+            # 로컬에서 파일을 읽을 수 없으면 MCP 분석 도구로 대체
+            if content.endswith('.json'):
+                return await self._analyze_with_mcp(year_month, content, streaming_callback)
+            return None
+            
+        except Exception as e:
+            logger.warning(f"⚠️ {year_month} 데이터 수집 실패: {e}")
+            if streaming_callback:
+                await streaming_callback.send_status(f"⚠️ {year_month} 데이터 수집 실패: {str(e)}")  # type: ignore
+            return None
+    
+    def _load_month_frame(self, region_code: str, year_month: str, content: str) -> pd.DataFrame:
+        """MCP 결과 파일을 정규화된 DataFrame으로 읽고 로컬 저장소에 적재합니다."""
+        
+        records = load_trade_records(content)
+        if not records:
+            return pd.DataFrame()
+        
+        frame = to_trade_frame(records)
+        
+        # 로컬 컬럼 저장소에 파티션으로 적재 (다기간/다지역 분석용)
+        try:
+            self.trade_store.write_partition(region_code, year_month, frame)
+        except Exception as e:
+            logger.warning(f"⚠️ {year_month} 거래 데이터 저장 실패: {e}")
+        
+        return frame.assign(source_month=year_month)
+    
+    async def _analyze_with_mcp(self, year_month: str, file_path: str, streaming_callback) -> Optional[Dict[str, Any]]:
+        """MCP 분석 도구(analyze_apartment_trade)로 월별 통계 생성"""
+        
+        if streaming_callback:
+            await streaming_callback.send_status(f"🔍 {year_month} 데이터 분석 중...")  # type: ignore
+        
+        # 분석 도구로 통계 생성
+        analyze_tool = f"analyze_apartment_trade"
+        analyze_args = {"file_path": file_path}
+        
+        if streaming_callback:
+            analyze_call_info = {
+                "tool": analyze_tool,
+                "arguments": analyze_args,
+                "data_file": file_path.split('/')[-1]
+            }
+            await streaming_callback.send_content(f"📊 분석 도구 호출:\n```json\n{json.dumps(analyze_call_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+        
+        analyze_result = await self.mcp_client.call_tool('kr-realestate', analyze_tool, analyze_args)
+        if not (analyze_result and analyze_result.get('content')):
+            return None
+        
+        analyze_content = analyze_result['content'][0]['text'] if isinstance(analyze_result['content'], list) else analyze_result['content']
+        
+        if streaming_callback:
+            # 분석 도구 응답 결과 표시
+            analyze_response_info = {
+                "analyze_response": {
+                    "tool": analyze_tool,
+                    "status": "success",
+                    "content_length": len(analyze_content),
+                    "response_preview": analyze_content[:300] + "..." if len(analyze_content) > 300 else analyze_content
+                }
+            }
+            await streaming_callback.send_content(f"📥 분석 도구 응답:\n```json\n{json.dumps(analyze_response_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+        
+        try:
+            # JSON 파싱하여 실제 분석 데이터 추출
+            analysis_data = json.loads(analyze_content)
+        except json.JSONDecodeError:
+            logger.warning(f"⚠️ {year_month} 분석 결과 JSON 파싱 실패")
+            if streaming_callback:
+                await streaming_callback.send_status(f"⚠️ {year_month} 분석 실패: JSON 파싱 오류")  # type: ignore
+            return None
+        
+        if streaming_callback:
+            # 분석 결과를 예쁜 JSON으로 표시
+            result_summary = {
+                "period": year_month,
+                "transactions": analysis_data.get("총_거래건수", 0),
+                "avg_price": analysis_data.get("평균_거래가격", 0),
+                "max_price": analysis_data.get("최고_거래가격", 0),
+                "min_price": analysis_data.get("최저_거래가격", 0)
+            }
+            await streaming_callback.send_content(f"📈 {year_month} 분석 결과:\n```json\n{json.dumps(result_summary, ensure_ascii=False, indent=2)}\n```")  # type: ignore
+            await streaming_callback.send_status(f"✅ {year_month} 분석 완료: {analysis_data.get('총_거래건수', 0)}건")  # type: ignore
+        
+        logger.info(f"✅ {year_month} 분석 완료")
+        return {
+            "year_month": year_month,
+            "raw_file": file_path,
+            "analysis": analysis_data,
+            "raw_response": analyze_content  # 원시 응답 데이터도 보관
+        }
     
     async def _analyze_data(self, collected_data: List[Dict[str, Any]], streaming_callback) -> Dict[str, Any]:
         """데이터 분석 - 수집된 실제 데이터 종합"""
@@ -338,44 +888,29 @@ class RealestateWorkflow:
         if streaming_callback:
             await streaming_callback.send_status("🔍 수집된 데이터를 종합 분석 중...")  # type: ignore
         
-        # 실제 수집된 데이터 종합
-        total_transactions = 0
-        total_amount = 0
-        avg_prices = []
-        monthly_summary = []
+        # 원시 레코드/저장소 데이터가 있는 월은 로컬 엔진에서 한 번에 분석
+        frames = [
+            data["frame"] for data in collected_data
+            if data.get("frame") is not None and not data["frame"].empty
+        ]
+        analysis_results = self.analytics.analyze(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
         
+        # MCP 분석 도구 결과만 있는 월은 월별 요약으로 합침
+        mcp_summaries = []
         for data in collected_data:
             analysis = data.get("analysis", {})
-            if isinstance(analysis, dict):
-                # 거래 건수
-                if "총_거래건수" in analysis:
-                    total_transactions += analysis.get("총_거래건수", 0)
-                
-                # 거래 금액
-                if "총_거래금액" in analysis:
-                    total_amount += analysis.get("총_거래금액", 0)
-                
-                # 평균 가격
-                if "평균_거래가격" in analysis:
-                    avg_prices.append(analysis.get("평균_거래가격", 0))
-                
-                # 월별 요약
-                monthly_summary.append({
+            if isinstance(analysis, dict) and analysis:
+                mcp_summaries.append({
                     "month": data["year_month"],
                     "transactions": analysis.get("총_거래건수", 0),
                     "avg_price": analysis.get("평균_거래가격", 0),
                     "max_price": analysis.get("최고_거래가격", 0),
                     "min_price": analysis.get("최저_거래가격", 0)
                 })
+        analysis_results = self.analytics.add_monthly_summaries(analysis_results, mcp_summaries)
         
-        analysis_results = {
-            "total_transactions": total_transactions,
-            "total_amount": total_amount,
-            "avg_price_overall": sum(avg_prices) / len(avg_prices) if avg_prices else 0,
-            "monthly_data": monthly_summary,
-            "data_files_count": len(collected_data),
-            "analysis_period": f"{len(collected_data)}개월"
-        }
+        total_transactions = analysis_results["total_transactions"]
+        monthly_summary = analysis_results["monthly_data"]
         
         if streaming_callback:
             # 종합 분석 결과를 예쁜 JSON으로 표시
@@ -383,6 +918,7 @@ class RealestateWorkflow:
                 "종합_분석_결과": {
                     "총_거래건수": total_transactions,
                     "평균_거래가격": f"{analysis_results['avg_price_overall']:,.0f}만원",
+                    "중위_거래가격": f"{analysis_results.get('median_price', 0):,.0f}만원",
                     "분석_기간": analysis_results['analysis_period'],
                     "데이터_파일_수": len(collected_data)
                 },
@@ -401,14 +937,18 @@ class RealestateWorkflow:
         region_info: Dict[str, Any],
         analysis_type: str,
         analysis_results: Dict[str, Any],
-        streaming_callback
+        streaming_callback,
+        report_id: Optional[str] = None
     ) -> str:
         """HTML 리포트 생성 - 실제 분석 데이터를 LLM에게 전달"""
         
+        report_id = report_id or self._new_report_id("realestate_report")
+        
         if streaming_callback:
             await streaming_callback.send_status("📝 LLM이 분석 리포트를 생성 중...")  # type: ignore
         
-        # 모든 도구 호출 결과와 응답 데이터를 LLM에게 전달
+        # 모든 도구 호출 결과와 응답 데이터를 LLM에게 전달 (월별 점이 많으면 차트 예산만큼 축소)
+        chart_results = reduce_report_data(analysis_results)
         comprehensive_data = {
             "사용자_요청": user_query,
             "분석_지역": {
@@ -416,12 +956,12 @@ class RealestateWorkflow:
                 "코드": region_info['code']
             },
             "분석_유형": analysis_type,
-            "종합_분석_결과": analysis_results,
+            "종합_분석_결과": chart_results,
             "월별_상세_데이터": []  # type: ignore
         }
         
         # 각 월별 상세 데이터 추가
-        monthly_data_list = analysis_results.get("monthly_data", [])
+        monthly_data_list = chart_results.get("monthly_data", [])
         if isinstance(monthly_data_list, list):
             for data in monthly_data_list:
                 monthly_detail = {
@@ -446,6 +986,7 @@ class RealestateWorkflow:
 3. 다음 요소들을 포함한 시각적 리포트:
    - 월별 거래량 차트 (JavaScript Chart.js 사용)
    - 가격 추이 그래프
+   - 가격 분포 차트 (price_distribution의 구간별 거래건수 사용)
    - 거래 현황 테이블
    - 주요 지표 요약 카드
 4. 전문적인 분석 인사이트:
@@ -459,6 +1000,8 @@ class RealestateWorkflow:
 - 실제 데이터 수치를 정확히 반영해주세요
 - 거래건수가 0인 경우 "데이터 없음" 또는 "거래 없음"으로 표시
 - 모든 금액은 "만원" 단위로 표시
+- 차트와 표는 종합_분석_결과와 같은 구조의 JSON을 loadReportData() (Promise를 반환)로 읽어 그리세요. 차트는 whenVisible(차트 컨테이너 요소, 콜백)로 화면에 보일 때 그리세요. 예: whenVisible(document.getElementById('priceChart'), () => loadReportData().then(data => new Chart(...)))
+- loadReportData/whenVisible 함수와 데이터 블록(<script id="report-data">)은 저장 시 자동으로 삽입되므로 직접 정의하지 마세요 (데이터 갱신 시 이 블록만 교체되고, 데이터가 크면 별도 파일로 분리됨)
 - HTML 코드만 반환하고 설명이나 주석은 제외하세요
 
 HTML 코드만 반환하세요:
@@ -495,17 +1038,13 @@ HTML 코드만 반환하세요:
             
             # HTML 검증 및 저장
             if '<!DOCTYPE' in html_content and '<html' in html_content:
-                timestamp = int(datetime.now().timestamp())
-                filename = f"realestate_report_{timestamp}.html"
-                filepath = f"./reports/{filename}"
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                html_content = self._save_report(report_id, html_content, analysis_results)
+                filepath = self._report_path(report_id)
                 
                 if streaming_callback:
                     # 생성된 HTML 정보 표시
                     html_info = {
-                        "file_name": filename,
+                        "report_id": report_id,
                         "file_path": filepath,
                         "html_size": len(html_content),
                         "contains_charts": "chart" in html_content.lower() or "canvas" in html_content.lower(),
@@ -515,7 +1054,7 @@ HTML 코드만 반환하세요:
                     }
                     await streaming_callback.send_content(f"📄 데이터 기반 HTML 리포트:\n```json\n{json.dumps(html_info, ensure_ascii=False, indent=2)}\n```")  # type: ignore
                     await streaming_callback.send_code(html_content)  # type: ignore
-                    await streaming_callback.send_status(f"✅ 실제 데이터 기반 HTML 저장: {filename}")  # type: ignore
+                    await streaming_callback.send_status(f"✅ 실제 데이터 기반 HTML 저장: {report_id}")  # type: ignore
                 
                 logger.info(f"📝 실제 데이터 기반 HTML 리포트 생성 완료: {filepath}")
                 return html_content
@@ -523,16 +1062,23 @@ HTML 코드만 반환하세요:
                 logger.warning("⚠️ LLM이 완전한 HTML을 생성하지 못함")
                 if streaming_callback:
                     await streaming_callback.send_status("⚠️ LLM HTML 검증 실패, 폴백 HTML 생성 중...")  # type: ignore
-                return self._generate_fallback_html(user_query, region_info, analysis_type, analysis_results)
+                return await self._generate_fallback_html(user_query, region_info, analysis_type, analysis_results, report_id)
                 
         except Exception as e:
             logger.error(f"❌ LLM HTML 생성 실패: {e}")
             if streaming_callback:
                 await streaming_callback.send_status(f"❌ LLM 오류: {str(e)}, 폴백 HTML 생성 중...")  # type: ignore
-            return self._generate_fallback_html(user_query, region_info, analysis_type, analysis_results)
+            return await self._generate_fallback_html(user_query, region_info, analysis_type, analysis_results, report_id)
     
-    def _generate_fallback_html(self, user_query: str, region_info: Dict[str, Any], analysis_type: str, analysis_results: Dict[str, Any]) -> str:
-        """폴백 HTML 생성 - 실제 데이터 포함"""
+    async def _generate_fallback_html(
+        self,
+        user_query: str,
+        region_info: Dict[str, Any],
+        analysis_type: str,
+        analysis_results: Dict[str, Any],
+        report_id: Optional[str] = None
+    ) -> str:
+        """폴백 HTML 생성 - 실제 데이터 포함 (차트는 서버에서 그린 정적 이미지)"""
         
         analysis_type_kr = {
             "apartment": "아파트",
@@ -552,12 +1098,20 @@ HTML 코드만 반환하세요:
                 <td>{month_data['min_price']:,.0f}만원</td>
             </tr>"""
         
+        charts_html = "".join(await self._static_charts(analysis_results))
+        charts_section = f"""
+        <div class="summary">
+            <h2>📉 월별 추이</h2>
+            {charts_html}
+        </div>""" if charts_html else ""
+        
         html = f"""<!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{region_info['name']} {analysis_type_kr} 분석 리포트</title>
+    {TEMPLATE_RENDERER_META}
     <style>
         body {{ font-family: 'Noto Sans KR', sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
         .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
@@ -568,6 +1122,8 @@ HTML 코드만 반환하세요:
         th, td {{ border: 1px solid #ddd; padding: 12px; text-align: center; }}
         th {{ background: #3498db; color: white; }}
         .metric {{ display: inline-block; margin: 10px; padding: 15px; background: #3498db; color: white; border-radius: 5px; }}
+        .static-chart {{ margin: 10px 0; }}
+        .static-chart svg {{ width: 100%; height: auto; }}
     </style>
 </head>
 <body>
@@ -585,6 +1141,7 @@ HTML 코드만 반환하세요:
             <h2>🔍 사용자 요청</h2>
             <p>{user_query}</p>
         </div>
+        {charts_section}
         
         <div class="summary">
             <h2>📈 월별 거래 현황</h2>
@@ -607,12 +1164,234 @@ HTML 코드만 반환하세요:
 </body>
 </html>"""
         
-        # 파일 저장
-        timestamp = int(datetime.now().timestamp())
-        filename = f"realestate_report_{timestamp}.html"
-        filepath = f"./reports/{filename}"
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        return html 
\ No newline at end of file
+        return self._save_report(report_id or self._new_report_id("realestate_report"), html, analysis_results)
+
+    async def _static_charts(self, analysis_results: Dict[str, Any]) -> List[str]:
+        """월별 가격/거래량 차트를 서버에서 그립니다. (렌더러를 쓸 수 없으면 빈 목록)"""
+        monthly = analysis_results.get("monthly_data", [])
+        if not monthly or not self.chart_renderer.enabled:
+            return []
+        monthly = downsample_rows(monthly, "avg_price")
+        months = [row["month"] for row in monthly]
+        specs = [
+            self.chart_renderer.chart_spec("line", "월별 거래가격", months, [
+                {"label": "평균", "values": [row.get("avg_price") for row in monthly]},
+                {"label": "최고", "values": [row.get("max_price") for row in monthly]},
+                {"label": "최저", "values": [row.get("min_price") for row in monthly]}
+            ], unit="만원"),
+            self.chart_renderer.chart_spec("bar", "월별 거래건수", months, [
+                {"label": "거래건수", "values": [row.get("transactions") for row in monthly]}
+            ], unit="건")
+        ]
+        return [chart for chart in await self.chart_renderer.render_many(specs) if chart]
+
+    def _generate_comparison_html(
+        self,
+        user_query: str,
+        analysis_type: str,
+        analysis_results: Dict[str, Any],
+        report_id: Optional[str] = None
+    ) -> str:
+        """지역 비교 HTML 생성 - 순위 차트는 수치가 정확하도록 집계 결과로 직접 렌더링"""
+
+        analysis_type_kr = {
+            "apartment": "아파트",
+            "officetel": "오피스텔",
+            "house": "단독/다가구",
+            "row_house": "연립다세대"
+        }.get(analysis_type, "부동산")
+
+        ranking = analysis_results.get("region_comparison", [])
+
+        def ranked(metric: str) -> Dict[str, List[Any]]:
+            rows = sorted((row for row in ranking if row.get(metric) is not None), key=lambda row: row[metric], reverse=True)
+            return {"labels": [row["region"] for row in rows], "values": [row[metric] for row in rows]}
+
+        chart_data = {
+            "avg_price": ranked("avg_price"),
+            "avg_price_per_pyeong": ranked("avg_price_per_pyeong"),
+            "transactions": ranked("transactions")
+        }
+
+        def fmt(value: Any, suffix: str = "", digits: int = 0) -> str:
+            return f"{value:,.{digits}f}{suffix}" if value is not None else "-"
+
+        ranking_rows = ""
+        for row in ranking:
+            ranking_rows += f"""
+            <tr>
+                <td>{row['rank']}</td>
+                <td>{row['region']}</td>
+                <td>{row['transactions']:,}건</td>
+                <td>{fmt(row.get('avg_price'), '만원')}</td>
+                <td>{fmt(row.get('median_price'), '만원')}</td>
+                <td>{fmt(row.get('avg_price_per_pyeong'), '만원')}</td>
+                <td>{fmt(row.get('avg_price_change_pct'), '%', 1)}</td>
+            </tr>"""
+
+        # 순위 차트 데이터는 리포트 데이터 블록(크면 별도 파일)에 넣어 차트가 보일 때 읽음
+        report_data = {**analysis_results, "chart_data": chart_data}
+        chart_height = max(320, len(ranking) * 26)
+        html = f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{analysis_type_kr} 지역 비교 리포트</title>
+    {TEMPLATE_RENDERER_META}
+    <script src="/static/js/chart.min.js"></script>
+    <style>
+        body {{ font-family: 'Noto Sans KR', sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
+        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+        h1 {{ color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px; }}
+        .summary {{ background: #ecf0f1; padding: 20px; border-radius: 5px; margin: 20px 0; }}
+        .chart-box {{ position: relative; height: {chart_height}px; }}
+        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
+        th, td {{ border: 1px solid #ddd; padding: 12px; text-align: center; }}
+        th {{ background: #3498db; color: white; }}
+        .metric {{ display: inline-block; margin: 10px; padding: 15px; background: #3498db; color: white; border-radius: 5px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🗺️ {analysis_type_kr} 지역 비교 리포트</h1>
+
+        <div class="summary">
+            <h2>📊 분석 개요</h2>
+            <div class="metric">비교 지역: {analysis_results.get('regions_count', len(ranking))}개</div>
+            <div class="metric">총 거래건수: {analysis_results.get('total_transactions', 0):,}건</div>
+            <div class="metric">평균 거래가격: {analysis_results.get('avg_price_overall', 0):,.0f}만원</div>
+            <div class="metric">분석 기간: {analysis_results.get('analysis_period', 'N/A')}</div>
+        </div>
+
+        <div class="summary">
+            <h2>🔍 사용자 요청</h2>
+            <p>{user_query}</p>
+        </div>
+
+        <div class="summary">
+            <h2>💰 지역별 평균 거래가 순위</h2>
+            <div class="chart-box"><canvas id="avgPriceChart"></canvas></div>
+        </div>
+
+        <div class="summary">
+            <h2>📐 지역별 평당 가격 순위</h2>
+            <div class="chart-box"><canvas id="pyeongPriceChart"></canvas></div>
+        </div>
+
+        <div class="summary">
+            <h2>📈 지역별 거래량 순위</h2>
+            <div class="chart-box"><canvas id="transactionsChart"></canvas></div>
+        </div>
+
+        <div class="summary">
+            <h2>🏆 지역 순위표</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>순위</th>
+                        <th>지역</th>
+                        <th>거래건수</th>
+                        <th>평균가격</th>
+                        <th>중위가격</th>
+                        <th>평당가격</th>
+                        <th>기간 내 평균가 변화</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {ranking_rows}
+                </tbody>
+            </table>
+        </div>
+    </div>
+    <script>
+        function rankingChart(canvasId, metric, label, color) {{
+            const canvas = document.getElementById(canvasId);
+            whenVisible(canvas.parentElement, () => loadReportData().then(report => {{
+                const data = report.chart_data[metric];
+                new Chart(canvas, {{
+                    type: 'bar',
+                    data: {{ labels: data.labels, datasets: [{{ label: label, data: data.values, backgroundColor: color }}] }},
+                    options: {{ indexAxis: 'y', responsive: true, maintainAspectRatio: false, plugins: {{ legend: {{ display: false }} }} }}
+                }});
+            }}));
+        }}
+        rankingChart('avgPriceChart', 'avg_price', '평균 거래가 (만원)', '#3498db');
+        rankingChart('pyeongPriceChart', 'avg_price_per_pyeong', '평당 가격 (만원)', '#9b59b6');
+        rankingChart('transactionsChart', 'transactions', '거래건수', '#2ecc71');
+    </script>
+</body>
+</html>"""
+
+        report_id = report_id or self._new_report_id("realestate_comparison")
+        html = self._save_report(report_id, html, report_data)
+        logger.info(f"📝 지역 비교 리포트 생성 완료: {report_id} ({len(ranking)}개 지역)")
+        return html
+
+    def _new_report_id(self, prefix: str) -> str:
+        """갱신해도 유지되는 report_id - 저장 전에 정하고, 내용이 바뀌면 같은 id가 새 내용 파일을 가리킴"""
+        return self.report_store.new_report_id(current_session.get() or prefix)
+
+    def _report_path(self, report_id: str) -> Optional[str]:
+        """리포트 파일 경로"""
+        return self.report_store.resolve(report_id)
+
+    def _report_url(self, report_id: str) -> Optional[str]:
+        """리포트 서빙 URL"""
+        path = self._report_path(report_id)
+        return self.report_store.url(path) if path else None
+
+    def _save_report(self, report_id: str, html: str, report_data: Dict[str, Any]) -> str:
+        """분석 데이터 블록을 넣은 HTML을 저장소에 저장하고 반환합니다. (차트 점 수는 예산만큼 축소)"""
+        html = self.report_store.embed_data(html, reduce_report_data(report_data))
+        self.report_store.save(html, report_id=report_id)
+        return html
+
+    def _collected_inputs(self, region_code: str, entries: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """수집된 월별 데이터의 매니페스트 입력 (출처, 내용 해시, 건수)"""
+        inputs = {}
+        for entry in entries:
+            frame = entry.get("frame")
+            if frame is not None:
+                digest, rows = frame_digest(frame), len(frame)
+            else:
+                digest, rows = text_digest(entry.get("raw_response", "")), entry.get("analysis", {}).get("총_거래건수", 0)
+            inputs[input_key(region_code, entry["year_month"])] = {
+                "source": entry.get("source", "mcp"),
+                "digest": digest,
+                "rows": rows
+            }
+        return inputs
+
+    def _write_manifest(
+        self,
+        report_id: str,
+        kind: str,
+        user_query: str,
+        analysis_type: str,
+        analysis_months: int,
+        region_info: Dict[str, Any],
+        inputs: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """리포트 갱신에 필요한 입력 정보를 매니페스트로 저장합니다."""
+        try:
+            save_manifest(self.report_store.manifest_base(report_id), {
+                "report_id": report_id,
+                "kind": kind,
+                "query": user_query,
+                "analysis_type": analysis_type,
+                "months": analysis_months,
+                "region_info": region_info,
+                "inputs": inputs,
+                "created_at": datetime.now().timestamp()
+            })
+        except Exception as e:
+            logger.warning(f"⚠️ 리포트 매니페스트 저장 실패 ({report_id}): {e}")
+        record_report(
+            self._report_path(report_id),
+            report_id=report_id,
+            directory=self.report_store.root,
+            query=user_query,
+            region=None if kind == "comparison" else region_info.get("full_name"),
+            kind=kind
+        )
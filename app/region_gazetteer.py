@@ -0,0 +1,415 @@
+"""
+전국 시/군/구 지역코드 사전
+get_region_codes로 한 번 수집해 파일로 보관하고, Aho-Corasick 다중 패턴 매칭으로 쿼리의 지역명을 한 번에 코드로 변환
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.trade_data import resolve_data_path
+
+logger = logging.getLogger(__name__)
+
+# 시/도 코드(앞 2자리) → (정식 명칭, 별칭)
+SIDO_CODES: Dict[str, Tuple[str, List[str]]] = {
+    "11": ("서울특별시", ["서울", "서울시"]),
+    "26": ("부산광역시", ["부산", "부산시"]),
+    "27": ("대구광역시", ["대구", "대구시"]),
+    "28": ("인천광역시", ["인천", "인천시"]),
+    "29": ("광주광역시", ["광주"]),
+    "30": ("대전광역시", ["대전", "대전시"]),
+    "31": ("울산광역시", ["울산", "울산시"]),
+    "36": ("세종특별자치시", ["세종", "세종시"]),
+    "41": ("경기도", ["경기"]),
+    "42": ("강원도", []),
+    "43": ("충청북도", ["충북"]),
+    "44": ("충청남도", ["충남"]),
+    "45": ("전라북도", []),
+    "46": ("전라남도", ["전남"]),
+    "47": ("경상북도", ["경북"]),
+    "48": ("경상남도", ["경남"]),
+    "50": ("제주특별자치도", ["제주", "제주도"]),
+    "51": ("강원특별자치도", ["강원", "강원도"]),
+    "52": ("전북특별자치도", ["전북", "전라북도"]),
+}
+# 특별자치도 출범 전 시/도 코드 → 현재 코드 (옛 명칭은 현재 코드의 별칭이고, 옛 코드의 시/군/구는 현재 시/도에 속함)
+LEGACY_SIDO_CODES: Dict[str, str] = {"42": "51", "45": "52"}
+
+# get_region_codes 수집 전에도 동작하도록 수도권 주요 시/군/구를 기본 포함
+SEED_REGIONS: Dict[str, str] = {
+    "11110": "종로구", "11140": "중구", "11170": "용산구", "11200": "성동구", "11215": "광진구",
+    "11230": "동대문구", "11260": "중랑구", "11290": "성북구", "11305": "강북구", "11320": "도봉구",
+    "11350": "노원구", "11380": "은평구", "11410": "서대문구", "11440": "마포구", "11470": "양천구",
+    "11500": "강서구", "11530": "구로구", "11545": "금천구", "11560": "영등포구", "11590": "동작구",
+    "11620": "관악구", "11650": "서초구", "11680": "강남구", "11710": "송파구", "11740": "강동구",
+    "28110": "중구", "28140": "동구", "28177": "미추홀구", "28185": "연수구", "28200": "남동구",
+    "28237": "부평구", "28245": "계양구", "28260": "서구", "28710": "강화군", "28720": "옹진군",
+    "36110": "세종특별자치시",
+    "41110": "수원시", "41130": "성남시", "41135": "성남시 분당구", "41150": "의정부시", "41170": "안양시",
+    "41210": "광명시", "41220": "평택시", "41270": "안산시", "41280": "고양시", "41290": "과천시",
+    "41310": "구리시", "41360": "남양주시", "41390": "시흥시", "41410": "군포시", "41430": "의왕시",
+    "41450": "하남시", "41460": "용인시", "41480": "파주시", "41500": "이천시", "41570": "김포시",
+    "41590": "화성시", "41610": "광주시",
+}
+
+DEFAULT_REGION_CODE = "11680"
+REGION_SUFFIXES = ("특별자치시", "시", "군", "구")
+# 접미사를 뗀 약칭("고양", "수원") 뒤에 올 수 있는 조사/어미 - 그 밖의 한글이 이어지면 다른 단어의 일부("고양이")로 봄
+# ("이"/"가"는 "고양이"처럼 명사를 이루는 경우가 많아 제외)
+ALIAS_PARTICLES = re.compile(r"(?:에서|으로|까지|부터|이랑|지역|일대|근처|의|에|은|는|을|를|과|와|랑|도|만|로|쪽)?(?![가-힣])")
+
+
+class AhoCorasick:
+    """여러 패턴을 텍스트 한 번 순회로 찾는 Aho-Corasick 매처"""
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+
+        for pattern in patterns:
+            self._add(pattern)
+        self._build_links()
+
+    def _add(self, pattern: str):
+        """트라이에 패턴을 추가합니다."""
+        state = 0
+        for char in pattern:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append(pattern)
+
+    def _build_links(self):
+        """BFS로 실패 링크를 계산합니다."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """(시작, 끝, 패턴) 목록 - 겹치는 매칭 모두 포함"""
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for pattern in self.output[state]:
+                matches.append((index - len(pattern) + 1, index + 1, pattern))
+        return matches
+
+    def find_longest(self, text: str, accept: Optional[Callable[[int, int, str], bool]] = None) -> List[Tuple[int, int, str]]:
+        """겹치지 않는 가장 왼쪽-가장 긴 매칭만 선택합니다. accept가 있으면 통과한 매칭만 후보로 사용"""
+        selected = []
+        last_end = 0
+        for start, end, pattern in sorted(self.find_all(text), key=lambda m: (m[0], -(m[1] - m[0]))):
+            if accept and not accept(start, end, pattern):
+                continue
+            if start >= last_end:
+                selected.append((start, end, pattern))
+                last_end = end
+        return selected
+
+
+class RegionGazetteer:
+    """시/군/구 코드 사전과 별칭 매처를 관리하는 클래스"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.getenv('CACHE_PATH', './cache'), 'region_gazetteer.json')
+        self.regions: Dict[str, Dict[str, str]] = {}
+        self.source = "seed"
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        if not self._load():
+            self._set_regions(SEED_REGIONS)
+
+    @property
+    def is_persisted(self) -> bool:
+        """get_region_codes로 수집한 사전이 파일로 저장되어 있는지 여부"""
+        return self.source == "mcp"
+
+    def resolve(self, query: str) -> List[Dict[str, Any]]:
+        """쿼리에서 언급된 시/군/구를 등장 순서대로 반환합니다. 시/도만 언급되면 level="sido"."""
+        # 약칭은 단어 경계(공백/문장부호/조사/끝)가 뒤따를 때만 지역으로 봄
+        matches = self.matcher.find_longest(
+            query,
+            lambda start, end, key: key not in self.short_aliases or ALIAS_PARTICLES.match(query, end) is not None
+        )
+        mentioned_sidos = {
+            entry["sido_code"] for _, _, key in matches for entry in self.index[key] if entry["level"] == "sido"
+        }
+
+        resolved: List[Dict[str, Any]] = []
+        seen = set()
+        for _, _, key in matches:
+            entries = self.index[key]
+            districts = [entry for entry in entries if entry["level"] == "sigungu"]
+            sidos = [entry for entry in entries if entry["level"] == "sido"]
+
+            # "광주"처럼 시/도와 시/군/구가 같은 이름이면 해당 시/도가 함께 언급된 경우에만 시/군/구로 봄
+            if districts and sidos:
+                in_mentioned = [entry for entry in districts if entry["sido_code"] in mentioned_sidos - {sidos[0]["sido_code"]}]
+                districts = in_mentioned
+
+            if districts:
+                # "중구"처럼 여러 시/도에 있는 이름은 함께 언급된 시/도로 좁힘
+                narrowed = [entry for entry in districts if entry["sido_code"] in mentioned_sidos] or districts
+                region = dict(narrowed[0])
+                region["ambiguous"] = len(narrowed) > 1
+                if region["ambiguous"]:
+                    region["candidates"] = [{"code": entry["code"], "full_name": entry["full_name"]} for entry in narrowed]
+            elif sidos:
+                region = dict(sidos[0])
+                region["ambiguous"] = False
+            else:
+                continue
+
+            if region["code"] not in seen:
+                seen.add(region["code"])
+                resolved.append(region)
+
+        # 시/군/구가 하나라도 있으면 그것이 언급된 시/도는 결과에서 제외
+        district_sidos = {region["sido_code"] for region in resolved if region["level"] == "sigungu"}
+        return [region for region in resolved if region["level"] == "sigungu" or region["sido_code"] not in district_sidos]
+
+    def resolve_districts(self, query: str) -> List[Dict[str, Any]]:
+        """쿼리의 시/군/구만 반환합니다. 시/도만 언급되었고 하위 시/군/구가 하나뿐이면(세종) 그것으로 대체."""
+        districts = []
+        for region in self.resolve(query):
+            if region["level"] == "sigungu":
+                districts.append(region)
+                continue
+            children = [entry for entry in self.regions.values() if entry["sido_code"] == region["sido_code"]]
+            if len(children) == 1:
+                districts.append({**self._entry(children[0]["code"], children[0]["name"], "sigungu"), "ambiguous": False})
+        return districts
+
+    def districts_of(self, sido_code: str) -> List[Dict[str, Any]]:
+        """시/도에 속한 시/군/구 목록 - 일반구가 있는 시(성남시 등)는 일반구로 대신합니다."""
+        children = [
+            entry for entry in self.regions.values()
+            if entry["sido_code"] == sido_code and entry["code"] not in self.superseded
+        ]
+        parents = {entry["name"].split(" ")[0] for entry in children if " " in entry["name"]}
+        return [
+            {**entry, "ambiguous": False}
+            for entry in sorted(children, key=lambda entry: entry["code"])
+            if entry["name"] not in parents
+        ]
+
+    def default_region(self) -> Dict[str, Any]:
+        """지역을 찾지 못했을 때 사용하는 기본 지역 - is_default로 표시"""
+        code = os.getenv('DEFAULT_REGION_CODE', DEFAULT_REGION_CODE)
+        entry = self.regions.get(code) or {"code": code, "name": SEED_REGIONS.get(code, code)}
+        return {**self._entry(entry["code"], entry["name"], "sigungu"), "ambiguous": False, "is_default": True}
+
+    def ensure_loaded(self, mcp_client) -> None:
+        """수집된 사전이 없으면 백그라운드에서 get_region_codes로 한 번 수집합니다."""
+        if self.is_persisted or (self._refresh_task and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.create_task(self.refresh_from_mcp(mcp_client))
+
+    async def refresh_from_mcp(self, mcp_client, server_name: str = "kr-realestate") -> int:
+        """시/도별 get_region_codes 호출 결과로 사전을 다시 만들고 파일로 저장합니다."""
+        collected: Dict[str, str] = {}
+        sido_names = {name for name, _ in SIDO_CODES.values()}
+
+        for sido_name in sorted(sido_names):
+            try:
+                result = await mcp_client.call_tool(server_name, "get_region_codes", {"region_name": sido_name})
+                content = result.get("content") if result else None
+                text = content[0].get("text", "") if isinstance(content, list) and content else str(content or "")
+                collected.update(parse_region_codes(text))
+            except Exception as e:
+                logger.warning(f"⚠️ {sido_name} 지역코드 수집 실패: {e}")
+
+        if not collected:
+            logger.warning("⚠️ get_region_codes 결과가 없어 기본 지역 사전 유지")
+            return 0
+
+        self._set_regions({**SEED_REGIONS, **collected})
+        self.source = "mcp"
+        self._save()
+        logger.info(f"🗺️ 지역 사전 갱신: {len(self.regions)}개 시/군/구")
+        return len(collected)
+
+    def _set_regions(self, regions: Dict[str, str]):
+        """코드 → 이름 사전으로 항목/별칭 인덱스/매처를 구성합니다."""
+        self.regions = {code: self._entry(code, name, "sigungu") for code, name in regions.items()}
+        # 옛 시/도 코드와 현재 코드에 같은 시/군/구가 있으면 현재 코드만 사용
+        current = {
+            (entry["sido_code"], entry["name"]) for entry in self.regions.values() if entry["code"][:2] not in LEGACY_SIDO_CODES
+        }
+        self.superseded = {
+            code for code, entry in self.regions.items()
+            if code[:2] in LEGACY_SIDO_CODES and (entry["sido_code"], entry["name"]) in current
+        }
+
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        for sido_code, (sido_name, aliases) in SIDO_CODES.items():
+            if sido_code in LEGACY_SIDO_CODES:
+                continue
+            entry = self._entry(sido_code, sido_name, "sido")
+            for alias in [sido_name] + aliases:
+                index.setdefault(alias, []).append(entry)
+
+        for code, entry in self.regions.items():
+            if code in self.superseded:
+                continue
+            for alias in region_aliases(entry["name"]):
+                index.setdefault(alias, []).append(entry)
+
+        # 정식 명칭/시도 별칭과 겹치지 않는 접미사 제거 약칭
+        full_names = {name for name, _ in SIDO_CODES.values()}
+        full_names |= {alias for _, aliases in SIDO_CODES.values() for alias in aliases}
+        full_names |= {alias for entry in self.regions.values() for alias in region_aliases(entry["name"], short=False)}
+        self.short_aliases = {alias for alias in index if alias not in full_names}
+
+        # 같은 이름의 시/군/구는 서울 → 코드 순으로 우선
+        for entries in index.values():
+            entries.sort(key=lambda entry: (entry["level"] != "sigungu", entry["code"]))
+
+        self.index = index
+        self.matcher = AhoCorasick(list(index))
+
+    def _entry(self, code: str, name: str, level: str) -> Dict[str, Any]:
+        """사전 항목"""
+        sido_code = LEGACY_SIDO_CODES.get(code[:2], code[:2])
+        sido_name = SIDO_CODES.get(sido_code, ("", []))[0]
+        return {
+            "code": code,
+            "name": name,
+            "level": level,
+            "sido_code": sido_code,
+            "sido": sido_name,
+            "full_name": name if level == "sido" or name == sido_name else f"{sido_name} {name}".strip()
+        }
+
+    def _load(self) -> bool:
+        """저장된 사전을 읽습니다."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._set_regions(data["regions"])
+            self.source = data.get("source", "mcp")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ 지역 사전 로드 실패: {e}")
+            return False
+
+    def _save(self):
+        """사전을 임시 파일에 쓴 뒤 교체하여 저장합니다."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "source": self.source,
+                "regions": {code: entry["name"] for code, entry in self.regions.items()}
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def region_aliases(name: str, short: bool = True) -> List[str]:
+    """시/군/구 이름의 별칭 - 정식 명칭, 접미사를 뗀 약칭(2자 이상, short=False면 제외), 공백 없는 표기"""
+    aliases = [name]
+    if " " in name:
+        aliases.append(name.replace(" ", ""))
+        aliases.append(name.split()[-1])
+    if not short:
+        return aliases
+
+    last = name.split()[-1]
+    for suffix in REGION_SUFFIXES:
+        if last.endswith(suffix) and len(last) - len(suffix) >= 2:
+            aliases.append(last[:-len(suffix)])
+            break
+    return list(dict.fromkeys(aliases))
+
+
+def parse_region_codes(text: str) -> Dict[str, str]:
+    """get_region_codes 결과(JSON, 파일 경로, 텍스트)에서 시/군/구 코드 → 이름을 추출합니다."""
+    text = text.strip()
+    if text.endswith('.json') and not text.startswith(('{', '[')):
+        file_path = resolve_data_path(text)
+        if not file_path:
+            return {}
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+    regions: Dict[str, str] = {}
+    try:
+        _collect_from_json(json.loads(text), regions)
+        if regions:
+            return regions
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    # "1168000000 서울특별시 강남구" / "11680: 강남구" 형태의 텍스트
+    for code, name in re.findall(r"(\d{5}(?:\d{5})?)\s*[:\-|,=]?\s*\"?([가-힣][가-힣 ]*[가-힣])", text):
+        _add_region(regions, code, name)
+    return regions
+
+
+def _collect_from_json(payload: Any, regions: Dict[str, str]):
+    """JSON 구조를 순회하며 코드/이름 쌍을 수집합니다."""
+    if isinstance(payload, list):
+        for item in payload:
+            _collect_from_json(item, regions)
+        return
+    if not isinstance(payload, dict):
+        return
+
+    code = next((str(payload[key]) for key in ("code", "region_code", "lawd_cd", "법정동코드", "지역코드") if key in payload), None)
+    name = next((str(payload[key]) for key in ("name", "region_name", "법정동명", "지역명") if key in payload), None)
+    if code and name:
+        _add_region(regions, code, name)
+
+    for key, value in payload.items():
+        if isinstance(value, (dict, list)):
+            _collect_from_json(value, regions)
+        elif isinstance(value, str) and re.fullmatch(r"\d{5}(\d{5})?", str(key)):
+            _add_region(regions, str(key), value)
+
+
+def _add_region(regions: Dict[str, str], code: str, name: str):
+    """시/군/구 단위(10자리 코드의 경우 뒷 5자리가 00000)만 추가합니다."""
+    if len(code) == 10 and code[5:] != "00000":
+        return
+    code = code[:5]
+    if code.endswith("000"):
+        return  # 시/도 단위
+
+    tokens = name.split()
+    # "서울특별시 강남구" → "강남구", "경기도 성남시 분당구" → "성남시 분당구"
+    while tokens and tokens[0] in {sido for sido, _ in SIDO_CODES.values()}:
+        tokens = tokens[1:]
+    if tokens and tokens[-1].endswith(REGION_SUFFIXES):
+        regions[code] = " ".join(tokens)
+
+
+_gazetteer: Optional[RegionGazetteer] = None
+
+
+def get_region_gazetteer() -> RegionGazetteer:
+    """프로세스 전체에서 공유하는 지역 사전"""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = RegionGazetteer()
+    return _gazetteer
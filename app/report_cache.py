@@ -0,0 +1,177 @@
+"""
+리포트 캐시 인덱스
+정규화된 쿼리 키 → 생성된 리포트 파일과 대화형 요청 빈도를 관리 (스케줄러와 /chat/stream 공용)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 변경을 모아 두었다가 이 간격마다 한 번만 파일에 씀 (요청마다 인덱스 전체를 다시 쓰지 않음)
+SAVE_INTERVAL_SECONDS = float(os.getenv('REPORT_CACHE_SAVE_INTERVAL', '5'))
+# 빈도를 기록할 최대 쿼리 수 - 넘으면 적게/오래전에 요청된 쿼리부터 제외
+MAX_TRACKED_QUERIES = int(os.getenv('REPORT_CACHE_MAX_QUERIES', '1000'))
+
+
+def normalize_query(user_query: str) -> str:
+    """캐시 키용 쿼리 정규화 - 공백/대소문자/끝 문장부호 차이 무시"""
+    return re.sub(r"\s+", " ", user_query).strip().rstrip(".!?").lower()
+
+
+def report_cache_key(user_query: str) -> str:
+    """리포트 캐시 키 - 스케줄러와 /chat/stream이 같은 키를 사용"""
+    return hashlib.sha256(normalize_query(user_query).encode('utf-8')).hexdigest()[:32]
+
+
+class ReportCache:
+    """쿼리 키 → 생성된 리포트 파일 인덱스와 쿼리 빈도를 관리하는 클래스"""
+
+    def __init__(self, path: Optional[str] = None, ttl_hours: Optional[float] = None):
+        cache_path = os.getenv('CACHE_PATH', './cache')
+        self.path = path or os.path.join(cache_path, 'report_cache.json')
+        self.ttl_seconds = (ttl_hours if ttl_hours is not None else float(os.getenv('REPORT_CACHE_TTL_HOURS', '24'))) * 3600
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.query_counts: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+        self._load()
+
+    def lookup(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """유효한 캐시 항목을 반환합니다. 만료되었거나 파일이 없으면 None."""
+        entry = self.entries.get(report_cache_key(user_query))
+        if not entry or not self.is_fresh(entry):
+            return None
+        entry["hits"] = entry.get("hits", 0) + 1
+        self._schedule_save()
+        return entry
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        """TTL 이내이고 리포트 파일이 남아 있는지 확인합니다."""
+        return bool(entry) and time.time() - entry["generated_at"] < self.ttl_seconds and os.path.exists(entry["report_path"])
+
+    def store(self, user_query: str, report_path: str, source: str) -> Dict[str, Any]:
+        """리포트를 쿼리 키로 저장합니다."""
+        entry = {
+            "query": user_query,
+            "report_path": report_path,
+            "source": source,
+            "generated_at": time.time(),
+            "hits": 0
+        }
+        self.entries[report_cache_key(user_query)] = entry
+        self._schedule_save()
+        return entry
+
+    def record_query(self, user_query: str):
+        """대화형 요청 빈도를 기록합니다."""
+        key = report_cache_key(user_query)
+        stats = self.query_counts.setdefault(key, {"query": user_query, "count": 0})
+        stats["count"] += 1
+        stats["last_requested_at"] = time.time()
+        if len(self.query_counts) > MAX_TRACKED_QUERIES:
+            self._prune_queries()
+        self._schedule_save()
+
+    def popular_queries(self, limit: int) -> List[str]:
+        """가장 자주 요청된 쿼리"""
+        ranked = sorted(self.query_counts.values(), key=lambda stats: stats["count"], reverse=True)
+        return [stats["query"] for stats in ranked[:limit]]
+
+    def _load(self):
+        """저장된 인덱스를 읽습니다."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get("entries", {})
+            self.query_counts = data.get("query_counts", {})
+        except Exception as e:
+            logger.warning(f"⚠️ 리포트 캐시 인덱스 로드 실패: {e}")
+
+    def _prune_queries(self):
+        """요청 횟수와 마지막 요청 시각 순으로 MAX_TRACKED_QUERIES개만 남깁니다."""
+        ranked = sorted(
+            self.query_counts.items(),
+            key=lambda item: (item[1]["count"], item[1].get("last_requested_at", 0)),
+            reverse=True
+        )
+        self.query_counts = dict(ranked[:MAX_TRACKED_QUERIES])
+
+    def _schedule_save(self):
+        """변경을 표시하고 저장을 예약합니다. 이벤트 루프 밖(CLI 등)에서는 바로 저장합니다."""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        """저장 간격만큼 변경을 모은 뒤 파일 쓰기는 스레드에서 실행합니다."""
+        await asyncio.sleep(SAVE_INTERVAL_SECONDS)
+        await self.aflush()
+
+    async def aflush(self):
+        """모아 둔 변경을 이벤트 루프를 막지 않고 저장합니다."""
+        if not self._dirty:
+            return
+        # 스레드가 쓰는 동안 요청 처리가 사전을 바꿔도 되도록 루프에서 복사본을 만듦
+        snapshot = self._snapshot()
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            self._dirty = True
+            logger.warning(f"⚠️ 리포트 캐시 인덱스 저장 실패: {e}")
+
+    async def close(self):
+        """예약된 저장을 취소하고 남은 변경을 저장합니다. (서버 종료 시)"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.aflush()
+
+    def flush(self):
+        """모아 둔 변경을 바로 저장합니다."""
+        if not self._dirty:
+            return
+        self._write(self._snapshot())
+        self._dirty = False
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """저장할 인덱스 복사본"""
+        return {
+            "entries": {key: dict(entry) for key, entry in self.entries.items()},
+            "query_counts": {key: dict(stats) for key, stats in self.query_counts.items()}
+        }
+
+    def _write(self, data: Dict[str, Any]):
+        """인덱스를 임시 파일에 쓴 뒤 교체하여 저장합니다."""
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+
+
+_report_cache: Optional[ReportCache] = None
+
+
+def get_report_cache() -> ReportCache:
+    """리포트 캐시 싱글톤"""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache()
+    return _report_cache
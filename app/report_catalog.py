@@ -0,0 +1,314 @@
+"""
+리포트 카탈로그
+리포트 저장 시 파일 정보(세션, 쿼리, 지역, 크기, 소요 시간, 토큰 수, 내용 해시)를 SQLite에 기록해 목록/최신 리포트 조회를 인덱스로 처리
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    session_id TEXT,
+    query TEXT,
+    region TEXT,
+    kind TEXT,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    duration_seconds REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    total_tokens INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    access_count INTEGER NOT NULL DEFAULT 0,
+    last_accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS reports_path ON reports (path);
+CREATE INDEX IF NOT EXISTS reports_created ON reports (directory, created_at);
+CREATE INDEX IF NOT EXISTS reports_size ON reports (directory, size);
+CREATE INDEX IF NOT EXISTS reports_session ON reports (session_id, created_at);
+CREATE INDEX IF NOT EXISTS reports_region ON reports (region, created_at);
+"""
+
+# 정렬 가능한 컬럼 (사용자 입력을 그대로 SQL에 넣지 않도록 화이트리스트)
+SORT_COLUMNS = {"created_at", "size", "duration_seconds", "total_tokens", "filename", "access_count", "last_accessed_at"}
+# 나중에 기록된 값이 비어 있으면 기존 값을 유지하는 메타데이터 컬럼
+METADATA_COLUMNS = [
+    "session_id", "query", "region", "kind", "duration_seconds",
+    "prompt_tokens", "completion_tokens", "total_tokens"
+]
+# 조회 기록은 모아서 한 번에 기록 (조회마다 쓰기 잠금을 잡지 않도록)
+ACCESS_FLUSH_SIZE = 256
+
+
+class ReportCatalog:
+    """리포트 파일 인덱스 - 저장 시점에 기록하고 목록/최신 조회는 인덱스로 처리하는 클래스"""
+
+    def __init__(self, path: Optional[str] = None):
+        cache_path = os.getenv('CACHE_PATH', './cache')
+        self.path = path or os.path.join(cache_path, 'report_catalog.sqlite')
+        self._write_lock = threading.Lock()
+        self._synced_dirs = set()
+        self._access_lock = threading.Lock()
+        self._pending_access: Dict[str, List[float]] = {}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(reports)")]
+            if columns and "report_id" not in columns:
+                # report_id 도입 전 카탈로그는 파일에서 다시 만들 수 있는 인덱스이므로 새로 생성
+                conn.execute("DROP TABLE reports")
+                columns = []
+            elif columns and "access_count" not in columns:
+                conn.execute("ALTER TABLE reports ADD COLUMN access_count INTEGER NOT NULL DEFAULT 0")
+                conn.execute("ALTER TABLE reports ADD COLUMN last_accessed_at REAL")
+            conn.executescript(SCHEMA)
+
+    def record(
+        self,
+        report_path: str,
+        content: Optional[Union[str, bytes]] = None,
+        tokens: Optional[Dict[str, Any]] = None,
+        report_id: Optional[str] = None,
+        directory: Optional[str] = None,
+        **metadata: Any
+    ) -> Optional[Dict[str, Any]]:
+        """리포트를 기록합니다. 이미 있으면 경로/크기/해시를 갱신하고 새로 주어진 메타데이터만 덮어씁니다.
+
+        report_id가 없으면 파일 이름(확장자 제외), directory가 없으면 파일이 있는 디렉터리를 사용합니다.
+        """
+        content_given = content is not None
+        try:
+            stat = os.stat(report_path)
+            if content is None:
+                with open(report_path, 'rb') as f:
+                    content = f.read()
+        except OSError as e:
+            logger.warning(f"⚠️ 리포트 카탈로그 기록 실패 ({report_path}): {e}")
+            return None
+
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        tokens = tokens or {}
+        path = os.path.abspath(report_path)
+        row = {
+            "report_id": report_id or os.path.splitext(os.path.basename(path))[0],
+            "path": path,
+            "directory": os.path.abspath(directory) if directory else os.path.dirname(path),
+            "filename": os.path.basename(path),
+            "size": len(data),
+            "content_hash": hashlib.sha256(data).hexdigest(),
+            # 저장 직후 기록(content 전달)은 지금, 기존 파일 등록은 수정 시각 (중복 제거된 파일은 수정 시각이 과거)
+            "created_at": time.time() if content_given else stat.st_mtime,
+            "updated_at": time.time(),
+            **{column: metadata.get(column) for column in METADATA_COLUMNS},
+        }
+        for column in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            if tokens.get(column) is not None:
+                row[column] = int(tokens[column])
+
+        columns = list(row)
+        updates = ", ".join(
+            f"{column} = COALESCE(excluded.{column}, reports.{column})" if column in METADATA_COLUMNS
+            else f"{column} = excluded.{column}"
+            for column in ("path", "filename", "size", "content_hash", "updated_at", *METADATA_COLUMNS)
+        )
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO reports ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT(report_id) DO UPDATE SET {updates}",
+                [row[column] for column in columns]
+            )
+        return row
+
+    def remove(self, report_id: str) -> None:
+        """리포트를 카탈로그에서 뺍니다."""
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+
+    def remove_path(self, report_path: str) -> None:
+        """삭제된 파일을 가리키는 리포트를 모두 뺍니다."""
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM reports WHERE path = ?", (os.path.abspath(report_path),))
+
+    def note_access(self, report_path: str) -> None:
+        """리포트 파일 조회를 기록합니다. 모아 두었다가 flush_access에서 반영합니다."""
+        with self._access_lock:
+            stats = self._pending_access.setdefault(os.path.abspath(report_path), [0, 0.0])
+            stats[0] += 1
+            stats[1] = time.time()
+            full = len(self._pending_access) >= ACCESS_FLUSH_SIZE
+        if full:
+            self.flush_access()
+
+    def flush_access(self) -> int:
+        """모아 둔 조회 수와 마지막 조회 시각을 카탈로그에 반영합니다. (같은 파일을 가리키는 리포트 모두)"""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+        if pending:
+            with self._write_lock, self._connect() as conn:
+                conn.executemany(
+                    "UPDATE reports SET access_count = access_count + ?, "
+                    "last_accessed_at = MAX(COALESCE(last_accessed_at, 0), ?) WHERE path = ?",
+                    [(count, accessed_at, path) for path, (count, accessed_at) in pending.items()]
+                )
+        return len(pending)
+
+    def lru_entries(self, reports_dir: str) -> List[Dict[str, Any]]:
+        """디렉터리의 리포트를 마지막 사용(생성 또는 조회) 시각이 오래된 순으로"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT report_id, path, size, MAX(created_at, COALESCE(last_accessed_at, 0)) AS last_used "
+                "FROM reports WHERE directory = ? ORDER BY last_used ASC, report_id ASC",
+                (os.path.abspath(reports_dir),)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """리포트 한 건의 카탈로그 정보"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+        return dict(row) if row else None
+
+    def count_path(self, report_path: str) -> int:
+        """같은 파일(내용)을 가리키는 리포트 수"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reports WHERE path = ?", (os.path.abspath(report_path),)).fetchone()[0]
+
+    def query(
+        self,
+        reports_dir: str,
+        offset: int = 0,
+        limit: int = 50,
+        sort: str = "created_at",
+        descending: bool = True,
+        prefix: Optional[str] = None,
+        session_id: Optional[str] = None,
+        region: Optional[str] = None,
+        kind: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """조건에 맞는 리포트 수와 정렬된 한 페이지"""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"정렬할 수 없는 컬럼: {sort}")
+        self.ensure_synced(reports_dir)
+
+        conditions, params = ["directory = ?"], [os.path.abspath(reports_dir)]
+        if prefix:
+            conditions.append("filename LIKE ? ESCAPE '\\'")
+            params.append(prefix.replace("\\", "\\\\").replace("_", "\\_").replace("%", "\\%") + "%")
+        for column, value in (("session_id", session_id), ("region", region), ("kind", kind)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if search:
+            conditions.append("query LIKE ?")
+            params.append(f"%{search}%")
+
+        where = " AND ".join(conditions)
+        direction = "DESC" if descending else "ASC"
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            total = conn.execute(f"SELECT COUNT(*) FROM reports WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM reports WHERE {where} ORDER BY {sort} {direction}, report_id {direction} LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return total, [dict(row) for row in rows]
+
+    def latest(self, reports_dir: str, prefix: Optional[str] = None, session_id: Optional[str] = None) -> Optional[str]:
+        """가장 최근 리포트 경로"""
+        entry = self.latest_entry(reports_dir, prefix=prefix, session_id=session_id)
+        return entry["path"] if entry else None
+
+    def latest_entry(
+        self,
+        reports_dir: str,
+        prefix: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """가장 최근 리포트 - 파일이 지워졌으면 카탈로그에서 빼고 다음 리포트를 찾음"""
+        while True:
+            _, rows = self.query(reports_dir, limit=1, prefix=prefix, session_id=session_id)
+            if not rows:
+                return None
+            if os.path.exists(rows[0]["path"]):
+                return rows[0]
+            self.remove(rows[0]["report_id"])
+
+    def ensure_synced(self, reports_dir: str) -> None:
+        """프로세스에서 처음 조회하는 디렉터리는 한 번 디스크와 맞춥니다. (카탈로그 도입 전 리포트, 외부 삭제 반영)"""
+        directory = os.path.abspath(reports_dir)
+        if directory not in self._synced_dirs:
+            self._synced_dirs.add(directory)
+            self.sync(directory)
+
+    def sync(self, reports_dir: str) -> int:
+        """디렉터리 바로 아래 HTML 리포트(저장소 도입 전 파일) 중 카탈로그에 없는 것을 추가하고 없어진 것을 뺍니다.
+
+        저장소 샤드 안의 리포트는 저장 시점에 기록되므로 다시 훑지 않습니다.
+        """
+        directory = os.path.abspath(reports_dir)
+        if not os.path.isdir(directory):
+            return 0
+
+        with os.scandir(directory) as entries:
+            on_disk = {entry.path for entry in entries if entry.is_file() and entry.name.endswith('.html')}
+        with self._connect() as conn:
+            known = {
+                row[0] for row in conn.execute(
+                    "SELECT path FROM reports WHERE directory = ? AND path = directory || '/' || filename", (directory,)
+                )
+            }
+
+        for path in on_disk - known:
+            self.record(path)
+        if known - on_disk:
+            with self._write_lock, self._connect() as conn:
+                conn.executemany("DELETE FROM reports WHERE path = ?", [(path,) for path in known - on_disk])
+
+        if on_disk ^ known:
+            logger.info(f"🗂️ 리포트 카탈로그 동기화: 추가 {len(on_disk - known)}개, 삭제 {len(known - on_disk)}개")
+        return len(on_disk - known)
+
+    @contextmanager
+    def _connect(self):
+        """호출마다 새 연결을 열고 커밋 후 닫음"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+_catalog: Optional[ReportCatalog] = None
+
+
+def get_report_catalog() -> ReportCatalog:
+    """프로세스 전역 리포트 카탈로그"""
+    global _catalog
+    if _catalog is None:
+        _catalog = ReportCatalog()
+    return _catalog
+
+
+def record_report(report_path: str, **kwargs: Any) -> None:
+    """리포트 저장 직후 카탈로그에 기록 - 실패해도 리포트 생성은 계속"""
+    try:
+        get_report_catalog().record(report_path, **kwargs)
+    except Exception as e:
+        logger.warning(f"⚠️ 리포트 카탈로그 기록 실패 ({report_path}): {e}")
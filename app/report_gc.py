@@ -0,0 +1,280 @@
+"""
+리포트 보관 기간/용량 관리
+오래 사용되지 않은 리포트를 나이와 전체 용량 한도에 맞춰 LRU 순으로 지우고, 참조 없는 파일과 임시 파일을 주기적으로 정리
+"""
+
+import asyncio
+import glob
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.precompressed import ENCODINGS
+from app.report_manifest import MANIFEST_SUFFIX
+from app.report_store import DATA_SUFFIX, MANIFESTS_DIR, OBJECTS_DIR, ReportStore, get_report_store
+
+logger = logging.getLogger(__name__)
+
+# 작업 디렉터리 도입 전 코드 실행기가 남긴 스크립트/컨텍스트 파일과 브라우저 테스트 스크린샷
+TEMP_PATTERNS = [
+    "/tmp/script_*.py",
+    "/tmp/context_*.json",
+    os.path.join(tempfile.gettempdir(), "tmp*_screenshot.png"),
+]
+# 저장 중인 파일(쓰기 → 카탈로그 기록 사이)을 참조 없는 파일로 지우지 않도록 두는 유예 시간
+ORPHAN_GRACE_SECONDS = 3600
+
+
+class ReportGC:
+    """리포트 저장소 정리 - 나이/용량 한도, 조회 기록 기반 LRU 삭제, 참조 없는 파일과 임시 파일 정리"""
+
+    def __init__(self, store: Optional[ReportStore] = None):
+        self.store = store or get_report_store()
+        self.catalog = self.store.catalog
+        self.interval_seconds = float(os.getenv('REPORT_GC_INTERVAL_MINUTES', '60')) * 60
+        self.max_age_seconds = float(os.getenv('REPORT_MAX_AGE_DAYS', '30')) * 86400
+        self.max_total_bytes = int(float(os.getenv('REPORT_MAX_TOTAL_MB', '2048')) * 1024 * 1024)
+        self.temp_max_age_seconds = float(os.getenv('TEMP_MAX_AGE_HOURS', '6')) * 3600
+        self.temp_patterns = list(TEMP_PATTERNS)
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.totals: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """정리 루프를 백그라운드 태스크로 시작합니다."""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"🧹 리포트 GC 시작: {self.interval_seconds / 60:.0f}분 간격")
+
+    async def stop(self):
+        """정리 루프를 중지합니다."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self) -> Dict[str, Any]:
+        """파일 I/O가 이벤트 루프를 막지 않도록 스레드에서 정리합니다."""
+        return await asyncio.to_thread(self.collect)
+
+    def status(self) -> Dict[str, Any]:
+        """GC 설정, 최근 실행 결과, 누적 삭제량"""
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "interval_minutes": self.interval_seconds / 60,
+            "max_age_days": self.max_age_seconds / 86400,
+            "max_total_bytes": self.max_total_bytes,
+            "temp_max_age_hours": self.temp_max_age_seconds / 3600,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_run": self.last_run,
+            "totals": dict(self.totals)
+        }
+
+    def collect(self, max_age_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """한 번 정리합니다. 한도가 0 이하이면 해당 기준은 적용하지 않습니다."""
+        with self._lock:
+            started = time.time()
+            max_age_seconds = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+            stats: Counter = Counter()
+
+            # 조회 기록을 먼저 반영해야 최근 본 리포트가 LRU 앞쪽에 오지 않음
+            self.catalog.flush_access()
+            self.catalog.ensure_synced(self.store.root)
+            entries = self.catalog.lru_entries(self.store.root)
+            references = Counter(entry["path"] for entry in entries)
+            sizes = self._scan_objects(set(references), started, stats)
+
+            live: List[Dict[str, Any]] = []
+            for entry in entries:
+                if entry["path"] not in sizes:
+                    size = self._file_size(entry["path"])
+                    if size is None:
+                        # 외부에서 지워진 파일
+                        self._evict(entry, references, sizes, stats, reason="missing")
+                        continue
+                    sizes[entry["path"]] = size
+                live.append(entry)
+
+            if max_age_seconds > 0:
+                cutoff = started - max_age_seconds
+                expired = [entry for entry in live if entry["last_used"] < cutoff]
+                for entry in expired:
+                    self._evict(entry, references, sizes, stats, reason="expired")
+                live = [entry for entry in live if entry["last_used"] >= cutoff]
+
+            # 용량 한도를 넘으면 가장 오래 사용되지 않은 리포트부터 삭제
+            total_bytes = sum(sizes.values())
+            if self.max_total_bytes > 0:
+                for entry in list(live):
+                    if total_bytes <= self.max_total_bytes:
+                        break
+                    total_bytes -= self._evict(entry, references, sizes, stats, reason="quota")
+                    live.remove(entry)
+
+            self._remove_orphan_manifests({entry["report_id"] for entry in live}, started, stats)
+            self._remove_temp_files(started, stats)
+
+            self.last_run = {
+                "started_at": datetime.fromtimestamp(started).isoformat(),
+                "duration_seconds": round(time.time() - started, 3),
+                "report_count": len(live),
+                "total_bytes": total_bytes,
+                **stats
+            }
+            self.totals.update(stats)
+            if stats:
+                logger.info(
+                    f"🧹 리포트 GC: 리포트 {stats['reports_removed']}개, 파일 {stats['files_removed']}개, "
+                    f"임시 파일 {stats['temp_files_removed']}개 삭제 ({stats['bytes_freed'] / 1024 / 1024:.1f}MB)"
+                )
+            return self.last_run
+
+    async def _loop(self):
+        """간격마다 정리하기를 반복합니다."""
+        while True:
+            self.next_run = datetime.fromtimestamp(time.time() + self.interval_seconds)
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"❌ 리포트 GC 실패: {e}")
+
+    def _scan_objects(self, referenced: set, now: float, stats: Counter) -> Dict[str, int]:
+        """저장소 파일 크기(압축본, 데이터 sidecar 포함). 참조 없는 파일과 남은 임시 파일은 유예 시간이 지나면 삭제합니다."""
+        sizes: Dict[str, int] = {}
+        sidecars: List[str] = []
+        objects_dir = os.path.join(self.store.root, OBJECTS_DIR)
+        for root, _, files in os.walk(objects_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                if filename.endswith(DATA_SUFFIX) and not filename.endswith(MANIFEST_SUFFIX):
+                    sidecars.append(path)
+                elif filename.endswith(".html"):
+                    if path in referenced:
+                        sizes[path] = self._file_size(path) or 0
+                    elif self._older_than(path, now - ORPHAN_GRACE_SECONDS):
+                        # 갱신으로 더 이상 어떤 report_id도 가리키지 않는 이전 내용
+                        stats["bytes_freed"] += self._remove_report_file(path)
+                        stats["orphans_removed"] += 1
+                elif filename.endswith(".tmp") and self._older_than(path, now - ORPHAN_GRACE_SECONDS):
+                    stats["bytes_freed"] += self._remove(path)
+                    stats["files_removed"] += 1
+
+        if sidecars:
+            # 데이터 sidecar는 참조하는 리포트가 남아 있는 동안 유지하고, 크기는 처음 참조한 리포트에 더함
+            owners: Dict[str, str] = {}
+            for report_path in sizes:
+                for data_path in self.store.data_paths(report_path):
+                    owners.setdefault(data_path, report_path)
+            for path in sidecars:
+                owner = owners.get(path)
+                if owner:
+                    sizes[owner] += self._file_size(path) or 0
+                elif self._older_than(path, now - ORPHAN_GRACE_SECONDS):
+                    stats["bytes_freed"] += self._remove_report_file(path)
+                    stats["orphans_removed"] += 1
+        return sizes
+
+    def _evict(
+        self,
+        entry: Dict[str, Any],
+        references: Counter,
+        sizes: Dict[str, int],
+        stats: Counter,
+        reason: str
+    ) -> int:
+        """리포트를 카탈로그에서 빼고, 그 파일을 가리키는 리포트가 더 없으면 파일도 삭제합니다. (줄어든 저장소 크기 반환)"""
+        self.catalog.remove(entry["report_id"])
+        stats["reports_removed"] += 1
+        stats[f"reports_{reason}"] += 1
+        stats["bytes_freed"] += self._remove(f"{self.store.manifest_base(entry['report_id'])}{MANIFEST_SUFFIX}")
+
+        references[entry["path"]] -= 1
+        if references[entry["path"]] > 0:
+            return 0
+        stats["bytes_freed"] += self._remove_report_file(entry["path"])
+        stats["files_removed"] += 1
+        return sizes.pop(entry["path"], 0)
+
+    def _remove_report_file(self, path: str) -> int:
+        """리포트 파일과 압축본, (저장소 도입 전 리포트의) 옆 매니페스트 삭제"""
+        freed = self._remove(path)
+        for _, suffix in ENCODINGS:
+            freed += self._remove(f"{path}{suffix}")
+        freed += self._remove(f"{path}{MANIFEST_SUFFIX}")
+        return freed
+
+    def _remove_orphan_manifests(self, report_ids: set, now: float, stats: Counter) -> None:
+        """삭제된 리포트의 매니페스트 정리"""
+        manifests_dir = os.path.join(self.store.root, MANIFESTS_DIR)
+        if not os.path.isdir(manifests_dir):
+            return
+        with os.scandir(manifests_dir) as entries:
+            for entry in entries:
+                report_id = entry.name[:-len(MANIFEST_SUFFIX)] if entry.name.endswith(MANIFEST_SUFFIX) else None
+                if report_id and report_id not in report_ids and self._older_than(entry.path, now - ORPHAN_GRACE_SECONDS):
+                    stats["bytes_freed"] += self._remove(entry.path)
+                    stats["files_removed"] += 1
+
+    def _remove_temp_files(self, now: float, stats: Counter) -> None:
+        """오래된 임시 파일 삭제 (실행 중인 작업의 파일은 최대 실행 시간보다 충분히 오래 두어 보호)"""
+        if self.temp_max_age_seconds <= 0:
+            return
+        for pattern in self.temp_patterns:
+            for path in glob.glob(pattern):
+                if self._older_than(path, now - self.temp_max_age_seconds):
+                    stats["bytes_freed"] += self._remove(path)
+                    stats["temp_files_removed"] += 1
+
+    def _older_than(self, path: str, cutoff: float) -> bool:
+        """파일 수정 시각이 cutoff 이전인지 확인합니다."""
+        try:
+            return os.path.getmtime(path) < cutoff
+        except OSError:
+            return False
+
+    def _file_size(self, path: str) -> Optional[int]:
+        """파일과 압축본 크기 합. 파일이 없으면 None."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        for _, suffix in ENCODINGS:
+            try:
+                size += os.path.getsize(f"{path}{suffix}")
+            except OSError:
+                pass
+        return size
+
+    def _remove(self, path: str) -> int:
+        """파일을 지우고 확보한 바이트 수를 돌려줍니다."""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.warning(f"⚠️ 파일 삭제 실패 ({path}): {e}")
+            return 0
+
+
+_gc: Optional[ReportGC] = None
+
+
+def get_report_gc() -> ReportGC:
+    """프로세스 전역 리포트 GC"""
+    global _gc
+    if _gc is None:
+        _gc = ReportGC()
+    return _gc
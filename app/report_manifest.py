@@ -0,0 +1,164 @@
+"""
+리포트 입력 데이터 매니페스트
+리포트가 사용한 지역/유형/기간과 월별 입력 데이터 해시를 리포트 옆에 저장해 갱신 시 바뀐 월만 다시 반영
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = ".manifest.json"
+# 템플릿으로 렌더링한 리포트 표시 - 갱신 시 전체를 다시 렌더링 (없으면 LLM 리포트로 보고 데이터 블록만 교체)
+TEMPLATE_RENDERER_META = '<meta name="report-renderer" content="template">'
+REPORT_DATA_PATTERN = re.compile(r'<script id="report-data" type="application/json"[^>]*>.*?</script>', re.S)
+# 이 크기 이상인 데이터는 HTML에 넣지 않고 별도 JSON 파일(sidecar)로 저장 (0이면 항상 인라인)
+SIDECAR_MIN_BYTES = int(os.getenv('REPORT_DATA_SIDECAR_MIN_BYTES', '8192'))
+# 리포트 스크립트가 데이터 블록을 읽는 함수 - 이 함수를 쓰는 리포트만 sidecar로 분리할 수 있음
+REPORT_DATA_LOADER_CALL = "loadReportData("
+# 데이터 블록 로더 - 인라인이면 블록을 파싱하고, data-src가 있으면 처음 요청될 때 한 번만 가져옴.
+# whenVisible은 요소가 화면 근처에 오면 콜백 실행 (인쇄 직전, IntersectionObserver가 없거나 자동 검사 중이면 바로)
+REPORT_DATA_LOADER = """<script id="report-data-loader">
+(function () {
+    var promise = null;
+    var pending = [];
+    window.loadReportData = function () {
+        if (!promise) {
+            var block = document.getElementById('report-data');
+            var src = block && block.getAttribute('data-src');
+            promise = src
+                ? fetch(src).then(function (response) { return response.json(); })
+                : Promise.resolve(block ? JSON.parse(block.textContent || '{}') : {});
+        }
+        return promise;
+    };
+    window.whenVisible = function (element, callback) {
+        if (!element || window.REPORT_EAGER_CHARTS || !('IntersectionObserver' in window)) {
+            callback();
+            return;
+        }
+        var item = { callback: callback };
+        item.observer = new IntersectionObserver(function (entries) {
+            if (!entries.some(function (entry) { return entry.isIntersecting; })) return;
+            item.observer.disconnect();
+            var index = pending.indexOf(item);
+            if (index >= 0) pending.splice(index, 1);
+            callback();
+        }, { rootMargin: '200px' });
+        pending.push(item);
+        item.observer.observe(element);
+    };
+    window.addEventListener('beforeprint', function () {
+        pending.splice(0).forEach(function (item) {
+            item.observer.disconnect();
+            item.callback();
+        });
+    });
+})();
+</script>"""
+
+# 입력 해시에 쓰는 컬럼 - 로컬 저장소에 보관되는 컬럼과 같아야 MCP/저장소 어느 쪽에서 읽어도 같은 해시
+DIGEST_NUMERIC_COLUMNS = ["deal_amount", "area", "deal_day", "floor", "build_year"]
+DIGEST_TEXT_COLUMNS = ["apt_name", "dong"]
+
+
+def manifest_path(report_path: str) -> str:
+    """리포트 파일의 매니페스트 경로"""
+    return f"{report_path}{MANIFEST_SUFFIX}"
+
+
+def load_manifest(report_path: str) -> Optional[Dict[str, Any]]:
+    """리포트 매니페스트를 읽습니다. 없으면 None."""
+    path = manifest_path(report_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(report_path: str, manifest: Dict[str, Any]) -> None:
+    """매니페스트를 임시 파일에 쓴 뒤 교체합니다."""
+    path = manifest_path(report_path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({**manifest, "updated_at": time.time()}, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def input_key(region_code: str, year_month: str) -> str:
+    """매니페스트 입력 키"""
+    return f"{region_code}/{year_month}"
+
+
+def frame_digest(frame: pd.DataFrame) -> str:
+    """거래 DataFrame의 내용 해시 - 행 순서와 저장 dtype(float32/카테고리)에 영향받지 않음"""
+    columns: Dict[str, Any] = {}
+    for column in DIGEST_NUMERIC_COLUMNS:
+        if column in frame.columns:
+            columns[column] = np.round(pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype="float64"), 2)
+    for column in DIGEST_TEXT_COLUMNS:
+        if column in frame.columns:
+            columns[column] = frame[column].astype(object).where(frame[column].notna(), "").astype(str).to_numpy()
+
+    row_hashes = np.sort(pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).to_numpy())
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def text_digest(text: str) -> str:
+    """문자열(MCP 응답 등)의 내용 해시"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def changed_inputs(previous: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]) -> List[str]:
+    """새로 생기거나, 빠지거나, 해시가 달라진 입력 키 목록"""
+    keys = set(previous) | set(current)
+    return sorted(
+        key for key in keys
+        if (previous.get(key) or {}).get("digest") != (current.get(key) or {}).get("digest")
+    )
+
+
+def encode_report_data(data: Dict[str, Any]) -> bytes:
+    """분석 데이터를 공백 없는 JSON 바이트로 직렬화합니다."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def uses_data_loader(html: str) -> bool:
+    """리포트 스크립트가 loadReportData()로 데이터를 읽는지 (JSON.parse로 블록을 직접 읽는 리포트는 인라인 유지)"""
+    return REPORT_DATA_LOADER_CALL in html
+
+
+def embed_report_data(html: str, data: Dict[str, Any], data_url: Optional[str] = None) -> str:
+    """리포트 HTML에 분석 데이터 JSON 블록을 넣거나 교체합니다.
+
+    data_url이 있으면 데이터 대신 sidecar 파일 주소(data-src)만 넣고, 로더가 필요할 때 가져옵니다.
+    """
+    if data_url:
+        block = f'<script id="report-data" type="application/json" data-src="{data_url}"></script>'
+    else:
+        payload = encode_report_data(data).decode('utf-8').replace("</", "<\\/")
+        block = f'<script id="report-data" type="application/json">{payload}</script>'
+    if 'id="report-data-loader"' not in html:
+        block = f"{block}\n{REPORT_DATA_LOADER}"
+
+    if REPORT_DATA_PATTERN.search(html):
+        return REPORT_DATA_PATTERN.sub(lambda _: block, html, count=1)
+    # 리포트 스크립트보다 먼저 파싱되도록 <head> 바로 뒤에 넣음
+    anchor = re.search(r"<head[^>]*>|<body[^>]*>", html, re.I)
+    if anchor:
+        return f"{html[:anchor.end()]}\n{block}{html[anchor.end():]}"
+    return f"{block}\n{html}"
+
+
+def is_template_report(html: str) -> bool:
+    """템플릿으로 렌더링된 리포트인지 확인합니다."""
+    return TEMPLATE_RENDERER_META in html
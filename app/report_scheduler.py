@@ -0,0 +1,248 @@
+"""
+인기 리포트 사전 생성 스케줄러
+cron 일정에 맞춰 자주 요청되는 리포트를 대화형 세션이 없을 때만 미리 생성하고, /chat/stream과 같은 키로 캐시
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.report_cache import ReportCache, report_cache_key
+from app.report_catalog import record_report
+from app.report_store import get_report_store
+from app.streaming_api import StreamingCallback, running_sessions
+
+logger = logging.getLogger(__name__)
+
+
+class CronSchedule:
+    """5필드 cron 표현식(분 시 일 월 요일) - *, */n, a-b, a-b/n, 쉼표 목록 지원"""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 표현식은 5개 필드여야 합니다: {expression}")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        )
+        # 일요일은 0과 7 모두 허용
+        self.weekdays = {0 if day == 7 else day for day in weekdays}
+        # 일/요일이 모두 지정되면 둘 중 하나만 맞아도 실행 (표준 cron 동작)
+        self.day_or_weekday = fields[2] != "*" and fields[4] != "*"
+
+    def matches(self, moment: datetime) -> bool:
+        """주어진 시각(분 단위)이 일정에 해당하는지 확인합니다."""
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.month in self.months
+            and self._day_matches(moment)
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """주어진 시각 이후 처음으로 일정에 해당하는 시각"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = candidate.year + candidate.month // 12, candidate.month % 12 + 1
+                candidate = datetime(year, month, 1)
+            elif not self._day_matches(candidate):
+                candidate = datetime(candidate.year, candidate.month, candidate.day) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"일정에 해당하는 시각이 없습니다: {self.expression}")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        """일/요일 조건"""
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays  # cron: 일요일=0
+        return (day_ok or weekday_ok) if self.day_or_weekday else (day_ok and weekday_ok)
+
+    def _parse(self, field: str, low: int, high: int) -> Set[int]:
+        """필드 하나를 허용 값 집합으로 변환합니다."""
+        values: Set[int] = set()
+        for part in field.split(","):
+            range_part, _, step_part = part.partition("/")
+            step = int(step_part) if step_part else 1
+            if range_part == "*":
+                start, end = low, high
+            elif "-" in range_part:
+                start, end = (int(value) for value in range_part.split("-", 1))
+            else:
+                start = int(range_part)
+                end = high if step_part else start
+            if not (low <= start <= end <= high) or step < 1:
+                raise ValueError(f"cron 필드 범위 오류: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+
+class _DiscardQueue:
+    """이벤트를 보관하지 않는 큐"""
+
+    async def put(self, item: Dict[str, Any]):
+        pass
+
+    def empty(self) -> bool:
+        return True
+
+
+class BackgroundCallback(StreamingCallback):
+    """스케줄러 작업용 콜백 - 보는 사용자가 없으므로 이벤트를 버림"""
+
+    def __init__(self):
+        self.queue = _DiscardQueue()
+
+
+class ReportScheduler:
+    """cron 일정마다 대상 쿼리의 만료된 리포트를 낮은 우선순위로 다시 생성하는 클래스"""
+
+    def __init__(
+        self,
+        cache: ReportCache,
+        prompts_provider: Optional[Callable[[], List[str]]] = None,
+        orchestrator_factory: Optional[Callable[[], Any]] = None
+    ):
+        self.cache = cache
+        self.prompts_provider = prompts_provider or (lambda: [])
+        self.orchestrator_factory = orchestrator_factory
+        self.schedule = CronSchedule(os.getenv('REPORT_SCHEDULE_CRON', '0 3 * * *'))
+        self.concurrency = int(os.getenv('SCHEDULER_CONCURRENCY', '1'))
+        self.top_queries = int(os.getenv('SCHEDULE_TOP_QUERIES', '5'))
+        self.idle_poll_seconds = float(os.getenv('SCHEDULER_IDLE_POLL_SECONDS', '5'))
+        self.configured_queries = [
+            query.strip() for query in os.getenv('SCHEDULED_REPORT_QUERIES', '').split('|') if query.strip()
+        ]
+        self.report_store = get_report_store()
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._orchestrator = None
+        self._task: Optional[asyncio.Task] = None
+        self._run_lock = asyncio.Lock()
+
+    def start(self):
+        """일정 루프를 백그라운드 태스크로 시작합니다."""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"⏰ 리포트 스케줄러 시작: '{self.schedule.expression}'")
+
+    async def stop(self):
+        """일정 루프를 중지합니다."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def targets(self) -> List[str]:
+        """사전 생성 대상 쿼리 - 설정된 쿼리, /api/prompts 프롬프트, 자주 요청된 쿼리 (키 기준 중복 제거)"""
+        queries = self.configured_queries + list(self.prompts_provider()) + self.cache.popular_queries(self.top_queries)
+        unique: Dict[str, str] = {}
+        for query in queries:
+            unique.setdefault(report_cache_key(query), query)
+        return list(unique.values())
+
+    def status(self) -> Dict[str, Any]:
+        """스케줄러 상태"""
+        return {
+            "schedule": self.schedule.expression,
+            "running": bool(self._task and not self._task.done()),
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "concurrency": self.concurrency,
+            "targets": [
+                {"query": query, "cached": self.cache.is_fresh(self.cache.entries.get(report_cache_key(query)))}
+                for query in self.targets()
+            ],
+            "last_run": self.last_run
+        }
+
+    async def run_once(self) -> Dict[str, Any]:
+        """만료된 대상 리포트를 생성합니다. 대화형 세션이 진행 중이면 끝날 때까지 기다립니다."""
+        async with self._run_lock:
+            pending = [query for query in self.targets() if not self.cache.is_fresh(self.cache.entries.get(report_cache_key(query)))]
+            started = time.time()
+            results: Dict[str, str] = {}
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def generate(query: str):
+                async with semaphore:
+                    await self._wait_for_idle()
+                    results[query] = await self._generate(query)
+
+            logger.info(f"⏰ 리포트 사전 생성 시작: {len(pending)}개")
+            await asyncio.gather(*(generate(query) for query in pending))
+
+            self.last_run = {
+                "started_at": datetime.fromtimestamp(started).isoformat(),
+                "duration_seconds": round(time.time() - started, 1),
+                "results": results
+            }
+            return self.last_run
+
+    async def _loop(self):
+        """다음 일정 시각까지 기다렸다가 실행하기를 반복합니다."""
+        while True:
+            self.next_run = self.schedule.next_after(datetime.now())
+            await asyncio.sleep(max(0.0, (self.next_run - datetime.now()).total_seconds()))
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"❌ 리포트 사전 생성 실패: {e}")
+
+    async def _wait_for_idle(self):
+        """대화형 세션이 없을 때까지 양보합니다."""
+        while running_sessions:
+            await asyncio.sleep(self.idle_poll_seconds)
+
+    async def _generate(self, query: str) -> str:
+        """쿼리 하나의 리포트를 생성하고 캐시에 저장합니다."""
+        session_id = f"scheduled_{report_cache_key(query)[:8]}_{int(time.time())}"
+        started = time.time()
+        try:
+            orchestrator = self._get_orchestrator()
+            result = await orchestrator.process_query(query, session_id, BackgroundCallback())
+        except Exception as e:
+            logger.warning(f"⚠️ 사전 생성 실패 ({query}): {e}")
+            return f"failed: {e}"
+
+        # 이 작업의 세션 ID로 저장된 리포트를 정확히 조회
+        report = self.report_store.session_report(session_id)
+        if not result.get("success") or not report:
+            return f"failed: {result.get('error') or '리포트 파일 없음'}"
+
+        record_report(
+            report["path"],
+            report_id=report["report_id"],
+            directory=self.report_store.root,
+            query=query,
+            kind="scheduled",
+            duration_seconds=time.time() - started
+        )
+        self.cache.store(query, report["path"], source="scheduled")
+        logger.info(f"✅ 사전 생성 완료: {query} → {report['report_id']}")
+        return report["report_id"]
+
+    def _get_orchestrator(self):
+        """스케줄러 전용 오케스트레이터 - 워크플로우/도구가 스트리밍 콜백을 인스턴스에 보관하므로 대화형과 분리"""
+        if self._orchestrator is None:
+            if self.orchestrator_factory:
+                self._orchestrator = self.orchestrator_factory()
+            else:
+                from app.orchestrator import RealestateOrchestrator
+                self._orchestrator = RealestateOrchestrator()
+        return self._orchestrator
@@ -0,0 +1,169 @@
+"""
+리포트 저장소
+리포트 내용을 해시로 샤딩된 경로(objects/ab/cd/{해시}.html)에 한 번만 저장하고, report_id(세션 ID + 내용 해시) → 경로를 카탈로그로 조회
+"""
+
+import hashlib
+import logging
+import os
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from app.precompressed import write_variants
+from app.report_catalog import ReportCatalog, get_report_catalog
+from app.report_manifest import SIDECAR_MIN_BYTES, embed_report_data, encode_report_data, load_manifest, uses_data_loader
+
+logger = logging.getLogger(__name__)
+
+# 현재 작업의 세션 ID - 오케스트레이터가 설정하고, 같은 태스크에서 실행되는 도구가 리포트 저장 시 사용
+current_session: ContextVar[Optional[str]] = ContextVar("report_session", default=None)
+
+OBJECTS_DIR = "objects"
+MANIFESTS_DIR = "manifests"
+DATA_SUFFIX = ".json"
+# 리포트 HTML의 sidecar 참조 (report_manifest.embed_report_data의 data-src)
+DATA_REFERENCE_PATTERN = re.compile(r'data-src="/reports/(objects/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.json)"')
+
+
+class ReportStore:
+    """내용 주소 기반 리포트 저장소 - 같은 내용은 한 파일만 두고, 리포트는 report_id로 정확히 찾는 클래스"""
+
+    def __init__(self, root: Optional[str] = None, catalog: Optional[ReportCatalog] = None):
+        self.root = os.path.abspath(root or os.getenv('REPORTS_PATH', './reports'))
+        self.catalog = catalog or get_report_catalog()
+
+    def save(
+        self,
+        html: str,
+        session_id: Optional[str] = None,
+        report_id: Optional[str] = None,
+        **metadata: Any
+    ) -> Dict[str, Any]:
+        """리포트를 저장하고 카탈로그에 기록합니다.
+
+        report_id가 없으면 세션 ID와 내용 해시로 만들고, 주어지면 그 리포트가 새 내용을 가리키도록 바꿉니다. (갱신)
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        deduplicated = self._write_object(path, data)
+
+        session_id = session_id or current_session.get()
+        report_id = report_id or self.new_report_id(session_id or uuid.uuid4().hex[:12], digest)
+        self.catalog.record(
+            path, content=data, report_id=report_id, directory=self.root, session_id=session_id, **metadata
+        )
+
+        logger.info(f"💾 리포트 저장: {report_id} → {os.path.relpath(path, self.root)}{' (중복 내용)' if deduplicated else ''}")
+        return {
+            "report_id": report_id,
+            "path": path,
+            "url": self.url(path),
+            "content_hash": digest,
+            "session_id": session_id,
+            "deduplicated": deduplicated
+        }
+
+    def save_data(self, data: bytes) -> Dict[str, Any]:
+        """리포트 데이터 JSON을 내용 해시 이름의 sidecar 파일로 저장합니다. (리포트 HTML과 같이 immutable로 제공)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest, DATA_SUFFIX)
+        deduplicated = self._write_object(path, data)
+        return {"path": path, "url": self.url(path), "content_hash": digest, "deduplicated": deduplicated}
+
+    def embed_data(self, html: str, data: Dict[str, Any]) -> str:
+        """리포트 HTML에 분석 데이터 블록을 넣습니다.
+
+        loadReportData()로 데이터를 읽는 리포트는 데이터가 크면 sidecar 파일로 저장하고 주소만 넣습니다.
+        (리포트가 바뀌어도 데이터가 같으면 브라우저 캐시 재사용, 차트가 보일 때 가져옴)
+        """
+        data_url = None
+        if SIDECAR_MIN_BYTES > 0 and uses_data_loader(html):
+            payload = encode_report_data(data)
+            if len(payload) >= SIDECAR_MIN_BYTES:
+                data_url = self.save_data(payload)["url"]
+        return embed_report_data(html, data, data_url)
+
+    def _write_object(self, path: str, data: bytes) -> bool:
+        """내용 주소 파일과 압축본을 씁니다. 이미 있으면 수정 시각만 갱신하고 True를 돌려줍니다."""
+        if os.path.exists(path):
+            # 참조 없는 파일 정리(GC)가 다시 쓰이는 파일을 유예 시간 안으로 보도록 수정 시각 갱신
+            os.utime(path)
+            return True
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 같은 내용을 동시에 저장해도 부분 파일이 보이지 않도록 임시 파일에 쓴 뒤 교체
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        # 내용이 바뀌지 않으므로 압축본도 저장 시 한 번만 생성
+        try:
+            write_variants(path, data)
+        except OSError as e:
+            logger.warning(f"⚠️ 리포트 압축본 생성 실패 ({path}): {e}")
+        return False
+
+    def new_report_id(self, session_id: str, digest: Optional[str] = None) -> str:
+        """세션 ID와 내용 해시(없으면 임의 값)로 report_id를 만듭니다."""
+        safe_session = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)[:64]
+        return f"{safe_session}-{(digest or uuid.uuid4().hex)[:16]}"
+
+    def object_path(self, digest: str, suffix: str = ".html") -> str:
+        """내용 해시의 저장 경로 - 두 단계 샤딩으로 디렉터리당 파일 수를 작게 유지"""
+        return os.path.join(self.root, OBJECTS_DIR, digest[:2], digest[2:4], f"{digest}{suffix}")
+
+    def data_paths(self, report_path: str) -> List[str]:
+        """리포트 HTML이 참조하는 데이터 sidecar 경로"""
+        try:
+            with open(report_path, 'r', encoding='utf-8', errors='ignore') as f:
+                html = f.read()
+        except OSError:
+            return []
+        return [os.path.join(self.root, *match.group(1).split("/")) for match in DATA_REFERENCE_PATTERN.finditer(html)]
+
+    def resolve(self, report_id: str) -> Optional[str]:
+        """report_id의 리포트 파일 경로. 없으면 None."""
+        entry = self.catalog.get(report_id)
+        if entry and os.path.exists(entry["path"]):
+            return entry["path"]
+        return None
+
+    def session_report(self, session_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """세션이 마지막으로 저장한 리포트 (report_id, path, url)"""
+        if not session_id:
+            return None
+        entry = self.catalog.latest_entry(self.root, session_id=session_id)
+        if not entry:
+            return None
+        return {"report_id": entry["report_id"], "path": entry["path"], "url": self.url(entry["path"])}
+
+    def manifest_base(self, report_id: str) -> str:
+        """매니페스트 경로 기준 - 리포트 파일은 내용에 따라 바뀌므로 report_id로 보관"""
+        return os.path.join(self.root, MANIFESTS_DIR, report_id)
+
+    def load_manifest(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """리포트 매니페스트. 저장소 도입 전 리포트는 리포트 파일 옆의 매니페스트를 사용합니다."""
+        manifest = load_manifest(self.manifest_base(report_id))
+        if manifest is None:
+            report_path = self.resolve(report_id)
+            if report_path:
+                manifest = load_manifest(report_path)
+        return manifest
+
+    def url(self, path: str) -> str:
+        """리포트 파일의 서빙 URL (/reports 아래 상대 경로)"""
+        return "/reports/" + os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+
+_store: Optional[ReportStore] = None
+
+
+def get_report_store() -> ReportStore:
+    """프로세스 전역 리포트 저장소"""
+    global _store
+    if _store is None:
+        _store = ReportStore()
+    return _store
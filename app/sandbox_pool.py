@@ -0,0 +1,246 @@
+"""
+코드 실행 작업자 풀
+허용 라이브러리를 미리 import한 작업자 프로세스를 띄워 두고, 실행마다 작업자에서 fork한 자식으로 스크립트를 실행해 인터프리터 시작/라이브러리 import 비용 제거 (동시 실행은 슬롯 수로 제한)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+# 작업자 시작(라이브러리 import) 대기 시간
+WORKER_START_TIMEOUT = 60
+# 작업자가 자식 시간 초과를 처리하고 응답할 여유 시간
+WORKER_REPLY_GRACE = 10
+
+
+class SandboxWorker:
+    """라이브러리를 미리 import한 작업자 프로세스 하나 - 한 번에 작업 하나만 처리"""
+
+    def __init__(self, preload: List[str]):
+        self.preload = preload
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.jobs = 0
+        self.retired = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None and not self.retired
+
+    async def start(self):
+        """작업자를 띄우고 라이브러리 import가 끝날 때까지 기다립니다."""
+        env = {
+            **os.environ,
+            "MPLBACKEND": "Agg",
+            "PYTHONIOENCODING": "utf-8",
+            # fork 전에 BLAS 스레드가 생기지 않도록 단일 스레드
+            "OPENBLAS_NUM_THREADS": "1",
+            "OMP_NUM_THREADS": "1",
+        }
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, WORKER_SCRIPT, *self.preload,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=env
+        )
+        ready = await self._read(WORKER_START_TIMEOUT)
+        logger.info(f"🐍 코드 실행 작업자 준비 (pid {self.process.pid}, 미리 import: {', '.join(ready.get('preloaded', []))})")
+
+    async def run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """작업 하나를 보내고 결과를 기다립니다."""
+        self.process.stdin.write((json.dumps(job) + "\n").encode('utf-8'))
+        await self.process.stdin.drain()
+        self.jobs += 1
+        return await self._read(job["timeout"] + WORKER_REPLY_GRACE)
+
+    def kill(self):
+        """응답하지 않는 작업자를 종료합니다."""
+        if self.alive:
+            self.process.kill()
+        self.retired = True
+
+    async def _read(self, timeout: float) -> Dict[str, Any]:
+        """작업자 응답 한 줄을 읽습니다."""
+        line = await asyncio.wait_for(self.process.stdout.readline(), timeout)
+        if not line:
+            raise ConnectionError(f"코드 실행 작업자가 종료되었습니다. (종료 코드: {self.process.returncode})")
+        return json.loads(line)
+
+
+class InterpreterPool:
+    """작업자 풀 - 유휴 작업자가 없으면 대기열에서 기다리고, 죽은 작업자는 새로 띄움"""
+
+    def __init__(self, size: Optional[int] = None, preload: Optional[List[str]] = None):
+        self.size = size if size is not None else int(os.getenv('CODE_WORKER_POOL_SIZE', '2'))
+        self.preload = preload or []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """풀 크기가 0이거나 fork를 지원하지 않는 플랫폼이면 실행마다 새 프로세스 사용"""
+        return self.size > 0 and hasattr(os, "fork")
+
+    async def run(
+        self,
+        script_path: str,
+        cwd: str,
+        timeout: float,
+        limits: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """스크립트를 실행합니다. 결과: returncode, stdout, stderr, timed_out, duration_seconds
+
+        limits: 자식 프로세스 자원 한도 (cpu_seconds, memory_bytes, open_files, file_size_bytes)
+        """
+        await self._ensure_started()
+        output_dir = tempfile.mkdtemp(prefix="sandbox_")
+        job = {
+            "script": os.path.abspath(script_path),
+            "cwd": cwd,
+            "timeout": timeout,
+            "limits": limits or {},
+            "stdout_path": os.path.join(output_dir, "stdout"),
+            "stderr_path": os.path.join(output_dir, "stderr")
+        }
+
+        try:
+            worker = await self._idle.get()
+            try:
+                if not worker.alive:
+                    worker = await self._spawn()
+                result = await worker.run(job)
+            except BaseException as e:
+                # 응답 없음/취소 등으로 작업자 상태를 알 수 없으므로 버림 (다음 실행에서 새로 띄움)
+                logger.warning(f"⚠️ 코드 실행 작업자 종료: {type(e).__name__} {e}")
+                worker.kill()
+                raise
+            finally:
+                self._idle.put_nowait(worker)
+
+            result["stdout"] = self._read_output(job["stdout_path"])
+            result["stderr"] = self._read_output(job["stderr_path"])
+            return result
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    def status(self) -> Dict[str, Any]:
+        """작업자 풀 상태"""
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "started": self._idle is not None,
+            "idle": self._idle.qsize() if self._idle is not None else 0
+        }
+
+    async def close(self):
+        """모든 작업자를 종료합니다."""
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            worker.kill()
+            if worker.process:
+                await worker.process.wait()
+        self._idle = None
+
+    async def _ensure_started(self):
+        """처음 사용할 때 작업자를 띄웁니다."""
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+            self._idle = asyncio.Queue()
+            for worker in workers:
+                self._idle.put_nowait(worker)
+
+    async def _spawn(self) -> SandboxWorker:
+        """작업자 하나를 띄웁니다."""
+        worker = SandboxWorker(self.preload)
+        await worker.start()
+        return worker
+
+    def _read_output(self, path: str) -> str:
+        """자식 프로세스 출력 파일 (없으면 빈 문자열)"""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        except OSError:
+            return ""
+
+
+class ExecutionSlots:
+    """동시 실행 슬롯 - 모두 사용 중이면 대기열에서 기다리고 대기 지표를 기록하는 클래스"""
+
+    def __init__(self, size: Optional[int] = None):
+        # 기본값은 작업자 수 (작업자 풀을 쓰지 않으면 2)
+        self.size = size or int(os.getenv('CODE_EXECUTION_SLOTS', os.getenv('CODE_WORKER_POOL_SIZE', '2'))) or 2
+        self._semaphore = asyncio.Semaphore(self.size)
+        self.running = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def acquire(self):
+        """슬롯 하나를 얻을 때까지 기다립니다."""
+        started = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.running += 1
+        try:
+            yield waited
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """슬롯 사용/대기 지표"""
+        return {
+            "slots": self.size,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.completed, 4) if self.completed else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4)
+        }
+
+
+_pool: Optional[InterpreterPool] = None
+_slots: Optional[ExecutionSlots] = None
+
+
+def get_interpreter_pool(preload: Optional[List[str]] = None) -> InterpreterPool:
+    """프로세스 전역 작업자 풀"""
+    global _pool
+    if _pool is None:
+        _pool = InterpreterPool(preload=preload)
+    return _pool
+
+
+def get_execution_slots() -> ExecutionSlots:
+    """프로세스 전역 실행 슬롯"""
+    global _slots
+    if _slots is None:
+        _slots = ExecutionSlots()
+    return _slots
@@ -0,0 +1,139 @@
+"""
+코드 실행 작업자 프로세스
+허용 라이브러리를 미리 import해 두고, 작업마다 fork한 자식 프로세스에서 스크립트 하나를 실행 (표준 입출력으로 작업/결과를 JSON 한 줄씩 주고받음)
+"""
+
+import json
+import os
+import resource
+import runpy
+import signal
+import sys
+import time
+import traceback
+
+
+def preload(modules):
+    """허용 라이브러리를 미리 import합니다. 설치되지 않은 라이브러리는 건너뜁니다."""
+    loaded = []
+    for name in modules:
+        try:
+            __import__(name)
+            loaded.append(name)
+        except Exception:
+            pass
+    return loaded
+
+
+# 한도 이름 → resource 상수 (값이 없거나 0 이하면 적용하지 않음)
+LIMITS = {
+    "cpu_seconds": resource.RLIMIT_CPU,
+    "memory_bytes": resource.RLIMIT_AS,
+    "open_files": resource.RLIMIT_NOFILE,
+    "file_size_bytes": resource.RLIMIT_FSIZE,
+}
+
+
+def apply_limits(limits):
+    """현재 프로세스에 자원 한도를 적용합니다. (CPU 시간 초과는 SIGXCPU, 파일 크기 초과는 SIGXFSZ로 종료)"""
+    for name, value in (limits or {}).items():
+        if name not in LIMITS or not value or value <= 0:
+            continue
+        value = int(value)
+        _, hard = resource.getrlimit(LIMITS[name])
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        hard_value = value
+        if name == "cpu_seconds" and (hard == resource.RLIM_INFINITY or value < hard):
+            # soft 한도에서 SIGXCPU, 1초 뒤 hard 한도에서 SIGKILL
+            hard_value = value + 1
+        resource.setrlimit(LIMITS[name], (value, hard_value))
+
+
+def send(message):
+    """결과 한 줄을 서버로 보냅니다."""
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def run_child(job):
+    """fork된 자식에서 스크립트를 실행하고 종료 코드로 끝냅니다. (작업자 상태는 바뀌지 않음)"""
+    code = 1
+    try:
+        # 스크립트가 띄운 하위 프로세스까지 한 번에 종료할 수 있도록 새 프로세스 그룹
+        os.setpgid(0, 0)
+        os.chdir(job["cwd"])
+
+        null_fd = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(null_fd, 0)
+        for fd, path in ((1, job["stdout_path"]), (2, job["stderr_path"])):
+            output_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.dup2(output_fd, fd)
+            os.close(output_fd)
+        apply_limits(job.get("limits"))
+
+        # `python script.py`로 실행한 것과 같은 argv/sys.path (작업자 자신의 인자와 경로는 보이지 않게)
+        sys.argv = [job["script"]]
+        sys.path.insert(0, os.path.dirname(job["script"]))
+
+        try:
+            runpy.run_path(job["script"], run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def wait_child(pid, timeout):
+    """자식이 끝나거나 시간이 초과될 때까지 기다립니다. (종료 코드, 시간 초과 여부)"""
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.waitstatus_to_exitcode(status), False
+        if time.monotonic() >= deadline:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                os.kill(pid, signal.SIGKILL)
+            _, status = os.waitpid(pid, 0)
+            return os.waitstatus_to_exitcode(status), True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.02)
+
+
+def main():
+    # 작업자 스크립트 디렉터리(app/)의 모듈을 사용자 코드가 import하지 않도록 제외
+    sys.path.pop(0)
+    loaded = preload(sys.argv[1:])
+    send({"ready": True, "preloaded": loaded})
+
+    for line in sys.stdin:
+        job = json.loads(line)
+        started = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            run_child(job)
+        returncode, timed_out = wait_child(pid, job["timeout"])
+        send({
+            "returncode": returncode,
+            "timed_out": timed_out,
+            "duration_seconds": round(time.monotonic() - started, 4)
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,10 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 import os
-import glob
-from app.utils.templates import get_latest_report
+import time
+from app.report_cache import get_report_cache
+from app.report_catalog import record_report
+from app.report_store import get_report_store
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,7 @@ class ChatRequest(BaseModel):
     user_query: str
     session_id: Optional[str] = None
     format: str = "html"
+    use_cache: bool = True
 
 class StreamingCallback:
     """스트리밍 콜백 클래스"""
@@ -182,8 +185,43 @@ def create_streaming_endpoints(app: FastAPI, orchestrator):
             }
             
             streaming_callback = StreamingCallback()
+            report_cache = get_report_cache()
+            report_store = get_report_store()
+            served_from_cache = False
             
             try:
+                # 스케줄러가 미리 생성했거나 최근에 생성된 같은 쿼리의 리포트가 있으면 바로 반환 (빈도/적중은 메모리에 기록하고 파일 저장은 모아서 스레드에서)
+                report_cache.record_query(request.user_query)
+                cached = report_cache.lookup(request.user_query) if request.use_cache else None
+                if cached:
+                    served_from_cache = True
+                    logger.info(f"⚡ 캐시된 리포트 반환: {cached['report_path']} ({cached['source']})")
+                    with open(cached["report_path"], 'r', encoding='utf-8') as f:
+                        html_content = f.read()
+                    
+                    yield generate_sse_data("message", {"type": "status", "message": "⚡ 미리 생성된 리포트를 불러왔습니다"})
+                    yield generate_sse_data("message", {
+                        "type": "code",
+                        "code": html_content,
+                        "filename": os.path.basename(cached["report_path"])
+                    })
+                    yield generate_sse_data("message", {
+                        "type": "report_update",
+                        "report_path": cached["report_path"],
+                        "report_url": report_store.url(cached["report_path"])
+                    })
+                    yield generate_sse_data("message", {"type": "progress", "value": 100, "message": "완료"})
+                    yield generate_sse_data("message", {
+                        "type": "complete",
+                        "success": True,
+                        "analysis": "미리 생성된 리포트입니다.",
+                        "report_url": report_store.url(cached["report_path"]),
+                        "session_id": session_id,
+                        "cached": True,
+                        "generated_at": datetime.fromtimestamp(cached["generated_at"]).isoformat()
+                    })
+                    return
+                
                 # 중단 체크 함수
                 def should_abort():
                     return running_sessions.get(session_id, {}).get("abort", False)
@@ -273,31 +311,29 @@ def create_streaming_endpoints(app: FastAPI, orchestrator):
                         if is_report_complete:
                             logger.info("🎉 html_report 완료 감지 - 즉시 리포트 처리")
                             try:
-                                reports_dir = os.getenv('REPORTS_PATH', './reports')
-                                report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
-                                
-                                if report_files:
-                                    latest_report = get_latest_report(reports_dir)
-                                    if latest_report:  # None 체크 추가
-                                        logger.info(f"🎉 즉시 리포트 감지: {latest_report}")
-                                        
-                                        # HTML 파일 읽기
-                                        with open(latest_report, 'r', encoding='utf-8') as f:
-                                            html_content = f.read()
-                                        
-                                        # 즉시 UI로 전송
-                                        yield generate_sse_data("message", {
-                                            "type": "code", 
-                                            "code": html_content,
-                                            "filename": os.path.basename(latest_report)
-                                        })
-                                        
-                                        yield generate_sse_data("message", {
-                                            "type": "report_update",
-                                            "report_path": latest_report
-                                        })
-                                        
-                                        logger.info("🎨 즉시 HTML 코드 및 리포트 업데이트 전송 완료")
+                                session_report = report_store.session_report(session_id)
+                                if session_report:
+                                    logger.info(f"🎉 즉시 리포트 감지: {session_report['report_id']}")
+                                    
+                                    # HTML 파일 읽기
+                                    with open(session_report["path"], 'r', encoding='utf-8') as f:
+                                        html_content = f.read()
+                                    
+                                    # 즉시 UI로 전송
+                                    yield generate_sse_data("message", {
+                                        "type": "code", 
+                                        "code": html_content,
+                                        "filename": os.path.basename(session_report["path"])
+                                    })
+                                    
+                                    yield generate_sse_data("message", {
+                                        "type": "report_update",
+                                        "report_id": session_report["report_id"],
+                                        "report_path": session_report["path"],
+                                        "report_url": session_report["url"]
+                                    })
+                                    
+                                    logger.info("🎨 즉시 HTML 코드 및 리포트 업데이트 전송 완료")
                             except Exception as e:
                                 logger.error(f"❌ 즉시 리포트 처리 실패: {e}")
                         
@@ -322,79 +358,51 @@ def create_streaming_endpoints(app: FastAPI, orchestrator):
                 result = await workflow_task
                 logger.info(f"🔍 워크플로우 결과: success={result.get('success', False)}")
                 
-                # 🔥 리포트 생성 완료 감지 및 UI 알림 (무조건 실행)
-                logger.info("🔍 리포트 감지 시작")
+                # 🔥 워크플로우 완료 후 이 세션의 리포트를 조회해 UI 알림
+                logger.info("🔍 워크플로우 완료 - 세션 리포트 조회")
+                session_report = None
                 try:
-                    reports_dir = os.getenv('REPORTS_PATH', './reports')
-                    report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
-                    logger.info(f"🔍 발견된 리포트 파일 수: {len(report_files)}")
-                    
-                    if report_files:
-                        # 파일명의 타임스탬프 기준으로 최신 파일 찾기 (더 정확함)
-                        def extract_timestamp(filepath):
-                            filename = os.path.basename(filepath)
-                            # report_1753164168.html에서 1753164168 추출
-                            import re
-                            match = re.search(r'report_(\d+)\.html', filename)
-                            return int(match.group(1)) if match else 0
+                    session_report = report_store.session_report(session_id)
+                    if session_report:
+                        logger.info(f"🎉 세션 리포트: {session_report['report_id']} ({session_report['path']})")
                         
-                        latest_report = max(report_files, key=extract_timestamp)
-                        logger.info(f"🎉 streaming_api에서 최신 리포트 감지: {latest_report}")
+                        # 카탈로그에 세션 정보를 남기고 같은 쿼리 재요청에 바로 쓰도록 캐시
+                        if result.get("success"):
+                            session_start = running_sessions[session_id]["start_time"].timestamp()
+                            record_report(
+                                session_report["path"],
+                                report_id=session_report["report_id"],
+                                directory=report_store.root,
+                                query=request.user_query,
+                                duration_seconds=time.time() - session_start
+                            )
+                            report_cache.store(request.user_query, session_report["path"], source="interactive")
                         
                         # HTML 파일 내용을 코드 뷰에 전송
-                        with open(latest_report, 'r', encoding='utf-8') as f:
+                        with open(session_report["path"], 'r', encoding='utf-8') as f:
                             html_content = f.read()
                         
+                        # 1. HTML 코드 이벤트 전송
                         yield generate_sse_data("message", {
                             "type": "code", 
                             "code": html_content,
-                            "filename": os.path.basename(latest_report)
+                            "filename": os.path.basename(session_report["path"])
                         })
                         
+                        # 2. 리포트 업데이트 이벤트 전송
                         yield generate_sse_data("message", {
                             "type": "report_update",
-                            "report_path": latest_report
+                            "report_id": session_report["report_id"],
+                            "report_path": session_report["path"],
+                            "report_url": session_report["url"]
                         })
                         
-                        logger.info("🎨 streaming_api에서 HTML 코드 및 리포트 업데이트 전송 완료")
-                        
-                except Exception as e:
-                    logger.error(f"❌ streaming_api 리포트 알림 실패: {e}")
-                
-                # 🔥 워크플로우 완료 후 무조건 리포트 감지 및 UI 알림
-                logger.info("🔍 워크플로우 완료 - 리포트 감지 시작")
-                try:
-                    reports_dir = os.getenv('REPORTS_PATH', './reports')
-                    report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
-                    logger.info(f"🔍 발견된 리포트 파일 수: {len(report_files)}")
-                    
-                    if report_files:
-                        # 파일명의 타임스탬프 기준으로 최신 파일 찾기
-                        latest_report = get_latest_report(reports_dir)
-                        if latest_report:  # None 체크 추가
-                            logger.info(f"🎉 최신 리포트 감지: {latest_report}")
-                            
-                            # HTML 파일 내용을 코드 뷰에 전송
-                            with open(latest_report, 'r', encoding='utf-8') as f:
-                                html_content = f.read()
-                            
-                            # 1. HTML 코드 이벤트 전송
-                            yield generate_sse_data("message", {
-                                "type": "code", 
-                                "code": html_content,
-                                "filename": os.path.basename(latest_report)
-                            })
-                            
-                            # 2. 리포트 업데이트 이벤트 전송
-                            yield generate_sse_data("message", {
-                                "type": "report_update",
-                                "report_path": latest_report
-                            })
-                            
-                            logger.info("🎨 HTML 코드 및 리포트 업데이트 이벤트 전송 완료")
+                        logger.info("🎨 HTML 코드 및 리포트 업데이트 이벤트 전송 완료")
+                    else:
+                        logger.warning(f"🔍 세션 {session_id}에서 저장된 리포트가 없음")
                             
                 except Exception as e:
-                    logger.error(f"❌ 리포트 감지 및 전송 실패: {e}")
+                    logger.error(f"❌ 리포트 조회 및 전송 실패: {e}")
                 
                 # 최종 결과 전송
                 yield generate_sse_data("message", {"type": "progress", "value": 100, "message": "완료"})
@@ -412,7 +420,8 @@ def create_streaming_endpoints(app: FastAPI, orchestrator):
                         "type": "complete",
                         "success": True,
                         "analysis": result.get("analysis", "분석이 완료되었습니다."),
-                        "report_url": result.get("report_url"),
+                        "report_url": session_report["url"] if session_report else result.get("report_url"),
+                        "report_id": session_report["report_id"] if session_report else None,
                         "session_id": session_id
                     })
                 else:
@@ -426,33 +435,31 @@ def create_streaming_endpoints(app: FastAPI, orchestrator):
                 yield generate_sse_data("error", {"message": f"처리 중 오류가 발생했습니다: {str(e)}"})
         
             finally:
-                # 🔥 세션 종료 전 최종 리포트 감지 및 UI 알림 (무조건 실행)
-                logger.info("🔍 세션 종료 전 최종 리포트 감지 시작")
+                # 🔥 세션 종료 전 최종 리포트 UI 알림 (캐시 응답은 제외)
+                logger.info("🔍 세션 종료 전 세션 리포트 조회")
                 try:
-                    reports_dir = os.getenv('REPORTS_PATH', './reports')
-                    report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
-                    logger.info(f"🔍 세션 종료 시점 리포트 파일 수: {len(report_files)}")
+                    final_report = None if served_from_cache else report_store.session_report(session_id)
                     
-                    if report_files:
-                        # 생성 시간 기준 최신 파일
-                        latest_report = max(report_files, key=os.path.getctime)
-                        logger.info(f"🎉 세션 종료 시점 최신 리포트: {latest_report}")
+                    if final_report:
+                        logger.info(f"🎉 세션 종료 시점 리포트: {final_report['report_id']}")
                         
                         # HTML 파일 내용을 코드 뷰에 전송
                         try:
-                            with open(latest_report, 'r', encoding='utf-8') as f:
+                            with open(final_report["path"], 'r', encoding='utf-8') as f:
                                 html_content = f.read()
                             
                             # 최종 이벤트 전송
                             yield generate_sse_data("message", {
                                 "type": "code", 
                                 "code": html_content,
-                                "filename": os.path.basename(latest_report)
+                                "filename": os.path.basename(final_report["path"])
                             })
                             
                             yield generate_sse_data("message", {
                                 "type": "report_update",
-                                "report_path": latest_report
+                                "report_id": final_report["report_id"],
+                                "report_path": final_report["path"],
+                                "report_url": final_report["url"]
                             })
                             
                             logger.info("🎨 세션 종료 시점 HTML 코드 및 리포트 업데이트 최종 전송 완료")
@@ -461,7 +468,7 @@ def create_streaming_endpoints(app: FastAPI, orchestrator):
                             logger.error(f"HTML 파일 읽기 실패: {read_error}")
                         
                 except Exception as e:
-                    logger.error(f"❌ 세션 종료 시점 리포트 감지 실패: {e}")
+                    logger.error(f"❌ 세션 종료 시점 리포트 조회 실패: {e}")
                 
                 # 세션 종료 시 추적에서 제거
                 if session_id in running_sessions:
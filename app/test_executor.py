@@ -3,6 +3,8 @@ import json
 import logging
 from typing import Dict, Any
 
+from .report_catalog import record_report
+
 logger = logging.getLogger(__name__)
 
 class TestCodeExecutor:
@@ -75,6 +77,7 @@ class TestCodeExecutor:
             with open(report_path, 'w', encoding='utf-8') as f:
                 f.write(html_content)
             
+            record_report(report_path, content=html_content, session_id=session_id, kind="test")
             logger.info(f"테스트 리포트 생성 완료: {report_path}")
             
             return {
@@ -0,0 +1,202 @@
+"""
+아파트 거래 데이터 로컬 분석 엔진
+get_apt_trade_data가 반환한 원시 거래 파일을 pandas로 읽어 한 번의 벡터 연산으로 통계 산출
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.utils.chart_reduction import price_histogram
+from app.utils.trade_data import load_trade_records, to_json_safe, to_trade_frame
+
+logger = logging.getLogger(__name__)
+
+# 1평 = 3.305785㎡
+PYEONG_IN_SQM = 3.305785
+PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+class TradeAnalytics:
+    """거래 레코드를 가중 평균/중앙값/분위수/단위면적가/단지·동별/전월 대비로 분석하는 클래스"""
+
+    def __init__(self, top_k: Optional[int] = None):
+        self.top_k = top_k or int(os.getenv('ANALYTICS_TOP_K', '10'))
+
+    def load_month_files(self, month_files: Dict[str, str]) -> pd.DataFrame:
+        """년월 → 원시 데이터 파일 경로 매핑을 하나의 DataFrame으로 읽어옵니다."""
+        records: List[Dict[str, Any]] = []
+        for year_month, source in month_files.items():
+            records.extend({**record, "source_month": year_month} for record in load_trade_records(source))
+
+        # 월별로 나누지 않고 전체 레코드를 한 번에 정규화
+        return to_trade_frame(records)
+
+    def analyze(self, frame: pd.DataFrame) -> Dict[str, Any]:
+        """정규화된 거래 DataFrame 전체를 분석합니다."""
+        if frame.empty or "deal_amount" not in frame.columns:
+            return self.empty_result()
+
+        frame = frame[frame["deal_amount"].notna()].copy()
+        month_column = "year_month" if "year_month" in frame.columns else "source_month"
+        if "source_month" in frame.columns:
+            frame[month_column] = frame[month_column].fillna(frame["source_month"])
+
+        prices = frame["deal_amount"].to_numpy(dtype=float)
+        total_transactions = int(prices.size)
+        total_amount = float(prices.sum())
+        percentiles = np.percentile(prices, [p * 100 for p in PERCENTILES]) if prices.size else []
+
+        results: Dict[str, Any] = {
+            "total_transactions": total_transactions,
+            "total_amount": total_amount,
+            # 월 평균의 평균이 아닌 거래 건수 가중 평균
+            "avg_price_overall": total_amount / total_transactions if total_transactions else 0,
+            "median_price": float(np.median(prices)) if prices.size else 0,
+            "max_price": float(prices.max()) if prices.size else 0,
+            "min_price": float(prices.min()) if prices.size else 0,
+            "price_percentiles": {f"p{int(p * 100)}": float(v) for p, v in zip(PERCENTILES, percentiles)},
+            # 개별 거래가 대신 구간별 건수로 분포 차트를 그림
+            "price_distribution": price_histogram(prices),
+        }
+
+        if "area" in frame.columns:
+            area_sum = frame.loc[frame["area"] > 0, "area"].sum()
+            amount_with_area = frame.loc[frame["area"] > 0, "deal_amount"].sum()
+            per_area = amount_with_area / area_sum if area_sum else 0
+            results["avg_price_per_area"] = float(per_area)
+            results["avg_price_per_pyeong"] = float(per_area * PYEONG_IN_SQM)
+
+        results["monthly_data"] = self._monthly_breakdown(frame, month_column)
+        if "apt_name" in frame.columns:
+            results["by_complex"] = self._group_breakdown(frame, "apt_name")[:self.top_k]
+        if "dong" in frame.columns:
+            results["by_dong"] = self._group_breakdown(frame, "dong")
+
+        results["data_files_count"] = len(results["monthly_data"])
+        results["analysis_period"] = f"{len(results['monthly_data'])}개월"
+        return to_json_safe(results)
+
+    def compare_regions(self, frame: pd.DataFrame, region_column: str = "region_name") -> List[Dict[str, Any]]:
+        """지역별 거래 건수/평균가/단위면적가/기간 내 평균가 변화율을 평균가 내림차순 순위로 반환합니다."""
+        if frame.empty or region_column not in frame.columns or "deal_amount" not in frame.columns:
+            return []
+
+        frame = frame[frame["deal_amount"].notna()]
+        table = frame.groupby(region_column, observed=True).agg(
+            transactions=("deal_amount", "size"),
+            avg_price=("deal_amount", "mean"),
+            median_price=("deal_amount", "median"),
+            max_price=("deal_amount", "max"),
+            min_price=("deal_amount", "min"),
+        )
+
+        if "area" in frame.columns:
+            valid = frame[frame["area"] > 0]
+            sums = valid.groupby(region_column, observed=True)[["deal_amount", "area"]].sum()
+            table["avg_price_per_area"] = sums["deal_amount"] / sums["area"]
+            table["avg_price_per_pyeong"] = table["avg_price_per_area"] * PYEONG_IN_SQM
+
+        # 지역별 첫 달 대비 마지막 달 평균가 변화율
+        month_column = "year_month" if "year_month" in frame.columns else "source_month"
+        if month_column in frame.columns:
+            monthly = frame.groupby([region_column, month_column], observed=True)["deal_amount"].mean().sort_index()
+            first = monthly.groupby(level=0, observed=True).first()
+            last = monthly.groupby(level=0, observed=True).last()
+            table["avg_price_change_pct"] = (last - first) / first * 100
+
+        table = table.sort_values("avg_price", ascending=False)
+        table["rank"] = np.arange(1, len(table) + 1)
+        return to_json_safe([{"region": str(name), **row} for name, row in table.to_dict("index").items()])
+
+    def add_monthly_summaries(self, results: Dict[str, Any], summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """로컬 분석이 불가능했던 월의 요약(MCP 분석 결과)을 결과에 합칩니다."""
+        if not summaries:
+            return results
+
+        monthly = {item["month"]: item for item in results.get("monthly_data", [])}
+        for summary in summaries:
+            monthly.setdefault(summary["month"], summary)
+
+        rows = sorted(monthly.values(), key=lambda item: item["month"])
+        counts = np.array([row.get("transactions", 0) for row in rows], dtype=float)
+        averages = np.array([row.get("avg_price", 0) for row in rows], dtype=float)
+
+        results["monthly_data"] = self._with_deltas(rows)
+        results["total_transactions"] = int(counts.sum())
+        results["total_amount"] = float((counts * averages).sum())
+        results["avg_price_overall"] = float(results["total_amount"] / counts.sum()) if counts.sum() else 0
+        results["max_price"] = max((row.get("max_price", 0) for row in rows), default=0)
+        results["min_price"] = min((row.get("min_price", 0) for row in rows if row.get("transactions")), default=0)
+        results["data_files_count"] = len(rows)
+        results["analysis_period"] = f"{len(rows)}개월"
+        return to_json_safe(results)
+
+    def empty_result(self) -> Dict[str, Any]:
+        """데이터가 없을 때의 기본 결과"""
+        return {
+            "total_transactions": 0,
+            "total_amount": 0,
+            "avg_price_overall": 0,
+            "median_price": 0,
+            "max_price": 0,
+            "min_price": 0,
+            "price_percentiles": {},
+            "monthly_data": [],
+            "data_files_count": 0,
+            "analysis_period": "0개월"
+        }
+
+    def _monthly_breakdown(self, frame: pd.DataFrame, month_column: str) -> List[Dict[str, Any]]:
+        """월별 집계 및 전월 대비 변화율"""
+        aggregations = {
+            "transactions": ("deal_amount", "size"),
+            "total_amount": ("deal_amount", "sum"),
+            "avg_price": ("deal_amount", "mean"),
+            "median_price": ("deal_amount", "median"),
+            "max_price": ("deal_amount", "max"),
+            "min_price": ("deal_amount", "min"),
+        }
+        table = frame.groupby(month_column, observed=True).agg(**aggregations).sort_index()
+
+        if "area" in frame.columns:
+            valid = frame[frame["area"] > 0]
+            sums = valid.groupby(month_column, observed=True)[["deal_amount", "area"]].sum()
+            table["avg_price_per_area"] = sums["deal_amount"] / sums["area"]
+
+        rows = [{"month": str(month), **row} for month, row in table.to_dict("index").items()]
+        return self._with_deltas(rows)
+
+    def _with_deltas(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """월별 행에 전월 대비 거래량/평균가 변화율(%)을 추가합니다."""
+        previous = None
+        for row in rows:
+            for key, delta_key in (("transactions", "transactions_change_pct"), ("avg_price", "avg_price_change_pct")):
+                if previous and previous.get(key):
+                    row[delta_key] = (row.get(key, 0) - previous[key]) / previous[key] * 100
+                else:
+                    row[delta_key] = None
+            previous = row
+        return rows
+
+    def _group_breakdown(self, frame: pd.DataFrame, column: str) -> List[Dict[str, Any]]:
+        """그룹별 거래 건수/가중 평균/중앙값/단위면적가 (건수 내림차순)"""
+        grouped = frame.groupby(column, observed=True)
+        table = grouped.agg(
+            transactions=("deal_amount", "size"),
+            avg_price=("deal_amount", "mean"),
+            median_price=("deal_amount", "median"),
+            max_price=("deal_amount", "max"),
+            min_price=("deal_amount", "min"),
+        )
+
+        if "area" in frame.columns:
+            valid = frame[frame["area"] > 0]
+            sums = valid.groupby(column, observed=True)[["deal_amount", "area"]].sum()
+            table["avg_price_per_area"] = sums["deal_amount"] / sums["area"]
+
+        table = table.sort_values("transactions", ascending=False)
+        return [{column: name, **row} for name, row in table.to_dict("index").items()]
@@ -0,0 +1,301 @@
+"""
+부동산 거래 데이터 로컬 컬럼 저장소
+region_code/year_month 파티션마다 컬럼별 NumPy .npy 파일로 저장하고 memmap으로 필요한 컬럼만 읽음
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.geo_rollups import GeoRollups
+from app.utils.trade_data import extract_records, load_trade_records, read_trade_payload, to_trade_frame
+
+logger = logging.getLogger(__name__)
+
+# 저장 컬럼 → dtype (결측값 표현을 위해 정수형도 float 사용)
+NUMERIC_COLUMNS: Dict[str, str] = {
+    "deal_amount": "float64",
+    "area": "float32",
+    "deal_day": "float32",
+    "floor": "float32",
+    "build_year": "float32",
+}
+# 문자열 컬럼은 사전 인코딩 (int32 코드 + 값 목록)
+DICTIONARY_COLUMNS = ["apt_name", "dong"]
+META_FILE = "_meta.json"
+ROLLUPS_FILE = ".rollups.sqlite"
+# 파티션 키는 경로에 그대로 쓰이므로 (LLM 도구 인자, 백필 요청에서 옴) 숫자 코드만 허용
+REGION_CODE_PATTERN = re.compile(r"[0-9]{5}")
+YEAR_MONTH_PATTERN = re.compile(r"[0-9]{6}")
+
+
+def is_partition_key(region_code: Any, year_month: Any) -> bool:
+    """시/군/구 코드 5자리, 년월 6자리 숫자인지 확인합니다."""
+    return bool(
+        isinstance(region_code, str) and REGION_CODE_PATTERN.fullmatch(region_code)
+        and isinstance(year_month, str) and YEAR_MONTH_PATTERN.fullmatch(year_month)
+    )
+
+
+def validate_partition_key(region_code: Any, year_month: Any) -> None:
+    """잘못된 파티션 키는 ValueError"""
+    if not is_partition_key(region_code, year_month):
+        raise ValueError(f"잘못된 파티션 키: {str(region_code)[:20]!r}/{str(year_month)[:20]!r}")
+
+
+class TradeStore:
+    """거래 데이터를 {root}/{region_code}/{year_month}/ 파티션에 컬럼 단위로 저장하고 조회하는 클래스"""
+
+    def __init__(self, root: Optional[str] = None, settle_days: Optional[int] = None):
+        cache_path = os.getenv('CACHE_PATH', './cache')
+        self.root = root or os.getenv('TRADE_STORE_PATH', os.path.join(cache_path, 'trade_store'))
+        # 실거래 신고 기한(계약 후 30일) - 이 기간이 지난 뒤 수집된 파티션은 더 바뀌지 않음
+        self.settle_days = settle_days if settle_days is not None else int(os.getenv('TRADE_SETTLE_DAYS', '30'))
+        os.makedirs(self.root, exist_ok=True)
+        # 동 → 시/군/구 → 시/도 → 전국 집계 - 파티션을 쓸 때마다 해당 경로만 갱신
+        self.rollups = GeoRollups(os.path.join(self.root, ROLLUPS_FILE))
+
+    def write_partition(self, region_code: str, year_month: str, frame: pd.DataFrame) -> int:
+        """정규화된 거래 DataFrame을 파티션으로 저장합니다. 기존 파티션은 교체됩니다."""
+        partition_dir = self._partition_dir(region_code, year_month)
+        os.makedirs(os.path.dirname(partition_dir), exist_ok=True)
+
+        # 임시 디렉토리에 모두 쓴 뒤 rename으로 교체 - 읽는 쪽은 항상 완전한 파티션만 봄
+        staging_dir = tempfile.mkdtemp(prefix=f".{year_month}_", dir=os.path.dirname(partition_dir))
+        try:
+            rows = len(frame)
+            for column, dtype in NUMERIC_COLUMNS.items():
+                values = frame[column] if column in frame.columns else pd.Series(np.nan, index=frame.index)
+                np.save(os.path.join(staging_dir, f"{column}.npy"), values.to_numpy(dtype=dtype, na_value=np.nan))
+
+            for column in DICTIONARY_COLUMNS:
+                values = frame[column] if column in frame.columns else pd.Series(None, index=frame.index, dtype=object)
+                codes, uniques = pd.factorize(values, use_na_sentinel=True)
+                np.save(os.path.join(staging_dir, f"{column}.npy"), codes.astype("int32"))
+                with open(os.path.join(staging_dir, f"{column}.dict.json"), 'w', encoding='utf-8') as f:
+                    json.dump([str(value) for value in uniques], f, ensure_ascii=False)
+
+            with open(os.path.join(staging_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump({
+                    "region_code": region_code,
+                    "year_month": year_month,
+                    "rows": rows,
+                    "written_at": time.time()
+                }, f)
+
+            self._swap_in(staging_dir, partition_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        try:
+            self.rollups.update_partition(region_code, year_month, frame)
+        except Exception as e:
+            logger.warning(f"⚠️ 지역 집계 갱신 실패 ({region_code}/{year_month}): {e}")
+
+        logger.info(f"💾 거래 데이터 저장: {region_code}/{year_month} ({rows}건)")
+        return rows
+
+    def ingest_tool_result(self, region_code: str, year_month: str, content: str, write_empty: bool = False) -> int:
+        """get_apt_trade_data 결과(파일 경로 또는 JSON)를 읽어 파티션으로 저장합니다.
+
+        write_empty면 거래가 없는 달도 빈 파티션으로 저장하고, 읽을 수 없는 결과(파일 없음, JSON 아님)는 ValueError
+        """
+        validate_partition_key(region_code, year_month)
+        records = extract_records(read_trade_payload(content)) if write_empty else load_trade_records(content)
+        if not records and not write_empty:
+            return 0
+        return self.write_partition(region_code, year_month, to_trade_frame(records))
+
+    def has_partition(self, region_code: str, year_month: str) -> bool:
+        """파티션 존재 여부를 확인합니다. (잘못된 키는 없는 파티션)"""
+        if not is_partition_key(region_code, year_month):
+            return False
+        return os.path.exists(os.path.join(self._partition_dir(region_code, year_month), META_FILE))
+
+    def partition_info(self, region_code: str, year_month: str) -> Optional[Dict[str, Any]]:
+        """파티션 메타데이터를 반환합니다. 없거나 키가 잘못되었으면 None."""
+        if not is_partition_key(region_code, year_month):
+            return None
+        meta_path = os.path.join(self._partition_dir(region_code, year_month), META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def is_settled(self, region_code: str, year_month: str) -> bool:
+        """신고 기한이 지난 뒤 수집되어 다시 가져올 필요가 없는 파티션인지 확인합니다."""
+        info = self.partition_info(region_code, year_month)
+        if not info:
+            return False
+
+        year, month = int(year_month[:4]), int(year_month[4:6])
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        return info.get("written_at", 0) >= (month_end + timedelta(days=self.settle_days)).timestamp()
+
+    def partitions(
+        self,
+        region_codes: Optional[Iterable[str]] = None,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """조건에 맞는 (region_code, year_month) 파티션 목록 - 디렉토리 이름만으로 가지치기"""
+        regions = list(region_codes) if region_codes is not None else sorted(
+            name for name in os.listdir(self.root) if not name.startswith('.')
+        )
+
+        selected = []
+        for region_code in regions:
+            if not isinstance(region_code, str) or not REGION_CODE_PATTERN.fullmatch(region_code):
+                continue
+            region_dir = os.path.join(self.root, region_code)
+            if not os.path.isdir(region_dir):
+                continue
+            for year_month in sorted(os.listdir(region_dir)):
+                if not YEAR_MONTH_PATTERN.fullmatch(year_month):
+                    continue
+                if start_month and year_month < start_month:
+                    continue
+                if end_month and year_month > end_month:
+                    continue
+                if os.path.exists(os.path.join(region_dir, year_month, META_FILE)):
+                    selected.append((region_code, year_month))
+        return selected
+
+    def scan(
+        self,
+        region_codes: Optional[Iterable[str]] = None,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        area_range: Optional[Tuple[Optional[float], Optional[float]]] = None
+    ) -> pd.DataFrame:
+        """파티션 가지치기 + 면적 조건 필터 후 필요한 컬럼만 읽어 하나의 DataFrame으로 반환합니다."""
+        columns = columns or list(NUMERIC_COLUMNS) + DICTIONARY_COLUMNS
+        chunks: Dict[str, List[np.ndarray]] = {column: [] for column in columns}
+        # 파티션별 사전을 하나의 전역 사전으로 합치면서 코드 재매핑
+        dictionaries: Dict[str, Dict[str, int]] = {column: {} for column in columns if column in DICTIONARY_COLUMNS}
+        partition_keys: List[Tuple[str, str]] = []
+        partition_sizes: List[int] = []
+
+        for region_code, year_month in self.partitions(region_codes, start_month, end_month):
+            arrays = self._read_partition(region_code, year_month, columns, area_range)
+            if arrays is None:
+                continue
+
+            size = 0
+            for column, values in arrays.items():
+                if column in dictionaries:
+                    codes, categories = values
+                    lookup = np.array(
+                        [dictionaries[column].setdefault(value, len(dictionaries[column])) for value in categories] + [-1],
+                        dtype="int32"
+                    )
+                    values = lookup[codes]  # -1(결측)은 마지막 원소 -1로 매핑
+                chunks[column].append(values)
+                size = len(values)
+            partition_keys.append((region_code, year_month))
+            partition_sizes.append(size)
+
+        if not partition_keys:
+            return pd.DataFrame(columns=columns + ["region_code", "year_month"])
+
+        data: Dict[str, Any] = {}
+        for column, parts in chunks.items():
+            if len(parts) != len(partition_keys):
+                continue  # 일부 파티션에 없는 컬럼은 제외
+            values = np.concatenate(parts)
+            if column in dictionaries:
+                data[column] = pd.Categorical.from_codes(values, categories=list(dictionaries[column]))
+            else:
+                data[column] = values
+
+        # 파티션 키 컬럼은 문자열을 반복하지 않고 카테고리 코드로 생성
+        for position, column in enumerate(("region_code", "year_month")):
+            codes, categories = pd.factorize(np.array([key[position] for key in partition_keys]), sort=True)
+            data[column] = pd.Categorical.from_codes(np.repeat(codes, partition_sizes), categories=categories)
+        return pd.DataFrame(data)
+
+    def stats(self) -> Dict[str, Any]:
+        """저장소 파티션 수/레코드 수/디스크 사용량"""
+        partitions = self.partitions()
+        rows = sum((self.partition_info(*key) or {}).get("rows", 0) for key in partitions)
+        size = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            size += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+        return {
+            "root": self.root,
+            "partitions": len(partitions),
+            "regions": len({region for region, _ in partitions}),
+            "rows": rows,
+            "size_bytes": size
+        }
+
+    def _read_partition(
+        self,
+        region_code: str,
+        year_month: str,
+        columns: List[str],
+        area_range: Optional[Tuple[Optional[float], Optional[float]]]
+    ) -> Optional[Dict[str, Any]]:
+        """파티션 하나를 memmap으로 열어 조건에 맞는 행의 요청 컬럼만 메모리에 올립니다.
+
+        수치 컬럼은 배열, 사전 인코딩 컬럼은 (코드 배열, 값 목록) 튜플로 반환합니다.
+        """
+        partition_dir = self._partition_dir(region_code, year_month)
+        mask = None
+
+        if area_range:
+            area = np.load(os.path.join(partition_dir, "area.npy"), mmap_mode='r')
+            low, high = area_range
+            mask = np.ones(area.shape[0], dtype=bool)
+            if low is not None:
+                mask &= area >= low
+            if high is not None:
+                mask &= area < high
+            if not mask.any():
+                return None
+
+        arrays: Dict[str, Any] = {}
+        for column in columns:
+            path = os.path.join(partition_dir, f"{column}.npy")
+            if not os.path.exists(path):
+                continue
+            values = np.load(path, mmap_mode='r')
+            values = values[mask] if mask is not None else np.asarray(values)
+
+            if column in DICTIONARY_COLUMNS:
+                with open(os.path.join(partition_dir, f"{column}.dict.json"), 'r', encoding='utf-8') as f:
+                    arrays[column] = (values, json.load(f))
+            else:
+                arrays[column] = values
+        return arrays
+
+    def _partition_dir(self, region_code: str, year_month: str) -> str:
+        """파티션 디렉토리 경로 - 키를 검증하고 저장소 루트 밖을 가리키지 않는지 확인"""
+        validate_partition_key(region_code, year_month)
+        root = os.path.abspath(self.root)
+        partition_dir = os.path.abspath(os.path.join(root, region_code, year_month))
+        if os.path.commonpath([partition_dir, root]) != root:
+            raise ValueError(f"저장소 밖 파티션 경로: {partition_dir}")
+        return partition_dir
+
+    def _swap_in(self, staging_dir: str, partition_dir: str):
+        """작성 완료된 임시 디렉토리를 파티션 위치로 교체합니다."""
+        if not os.path.exists(partition_dir):
+            os.rename(staging_dir, partition_dir)
+            return
+
+        retired_dir = f"{staging_dir}.old"
+        os.rename(partition_dir, retired_dir)
+        os.rename(staging_dir, partition_dir)
+        shutil.rmtree(retired_dir, ignore_errors=True)
@@ -0,0 +1,116 @@
+"""
+차트 데이터 축소
+리포트에 넣기 전에 시계열은 LTTB(Largest-Triangle-Three-Buckets)로 점 수를 줄이고, 가격 분포는 구간별 건수로 묶음 (NumPy 벡터 연산)
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 차트 하나에 넣을 최대 점 수 (이보다 많으면 모양을 유지하며 축소)
+POINT_BUDGET = int(os.getenv('CHART_POINT_BUDGET', '120'))
+# 가격 분포 구간 수 상한
+HISTOGRAM_BINS = int(os.getenv('CHART_HISTOGRAM_BINS', '20'))
+# 중첩된 도구 결과에서 축소할 시계열 키 → 모양 기준 값 키 (분석 결과의 월별 데이터, 데이터 프로파일의 월별 집계)
+SERIES_VALUE_KEYS = {"monthly_data": "avg_price", "time_buckets": "mean"}
+
+
+def lttb_indices(values: Sequence[Any], budget: int, x: Optional[Sequence[float]] = None) -> np.ndarray:
+    """LTTB로 남길 점의 인덱스를 돌려줍니다. (첫/마지막 점 포함, 점 수가 예산 이하면 전체)
+
+    버킷 평균은 한 번의 reduceat으로 구하고, 버킷마다 삼각형 넓이를 벡터로 계산해 가장 큰 점을 고름
+    (앞 버킷에서 고른 점에 의존하므로 버킷 순회만 파이썬 루프)
+    """
+    y = np.asarray(values, dtype=float)
+    n = y.size
+    if budget >= n or budget < 3:
+        return np.arange(n)
+
+    valid = np.isfinite(y)
+    if not valid.any():
+        return np.linspace(0, n - 1, budget).round().astype(int)
+    if not valid.all():
+        # 빈 값은 선택 계산에서만 앞뒤 값으로 보간
+        y = np.interp(np.arange(n), np.flatnonzero(valid), y[valid])
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # 첫/마지막 점을 뺀 나머지를 budget - 2개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[:n - 1], starts) / counts
+    avg_y = np.add.reduceat(y[:n - 1], starts) / counts
+    # 각 버킷의 세 번째 꼭짓점은 다음 버킷의 평균 (마지막 버킷은 마지막 점)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(budget, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        area = np.abs(
+            (x[a] - next_x[bucket]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y[bucket] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def downsample_rows(rows: List[Dict[str, Any]], value_key: str, budget: Optional[int] = None) -> List[Dict[str, Any]]:
+    """시간순 행 목록을 value_key 값의 모양을 기준으로 예산 이하로 줄입니다. (행은 그대로, 다른 열도 같은 행 유지)"""
+    budget = budget or POINT_BUDGET
+    if len(rows) <= budget:
+        return rows
+    values = [row.get(value_key) for row in rows]
+    return [rows[index] for index in lttb_indices([np.nan if value is None else value for value in values], budget)]
+
+
+def price_histogram(values: Sequence[Any], bins: Optional[int] = None) -> Dict[str, List[Any]]:
+    """가격 분포를 구간별 건수로 묶습니다. 구간 수는 Sturges 규칙과 상한 중 작은 값
+
+    결과: edges(구간 경계 n+1개), counts(구간별 건수), labels("최소~최대")
+    """
+    prices = np.asarray(values, dtype=float)
+    prices = prices[np.isfinite(prices)]
+    if not prices.size:
+        return {"edges": [], "counts": [], "labels": []}
+
+    count = int(min(bins or HISTOGRAM_BINS, np.ceil(np.log2(prices.size)) + 1))
+    counts, edges = np.histogram(prices, bins=max(count, 1))
+    return {
+        "edges": [round(float(edge), 1) for edge in edges],
+        "counts": counts.tolist(),
+        "labels": [f"{low:,.0f}~{high:,.0f}" for low, high in zip(edges[:-1], edges[1:])]
+    }
+
+
+def reduce_report_data(results: Dict[str, Any], budget: Optional[int] = None) -> Dict[str, Any]:
+    """리포트/프롬프트에 넣을 분석 결과 - 월별 데이터가 예산보다 많으면 평균가 모양을 유지하며 축소 (원본은 변경하지 않음)"""
+    budget = budget or POINT_BUDGET
+    monthly = results.get("monthly_data")
+    if not isinstance(monthly, list) or len(monthly) <= budget:
+        return results
+    reduced = dict(results)
+    reduced["monthly_data"] = downsample_rows(monthly, "avg_price", budget)
+    reduced["monthly_data_sampling"] = {"method": "lttb", "original_points": len(monthly), "points": budget}
+    return reduced
+
+
+def reduce_nested_data(value: Any, budget: Optional[int] = None) -> Any:
+    """도구 결과처럼 중첩된 데이터 안의 긴 시계열(SERIES_VALUE_KEYS)을 예산 이하로 줄입니다. (원본은 변경하지 않음)"""
+    if isinstance(value, list):
+        return [reduce_nested_data(item, budget) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    reduced: Dict[str, Any] = {}
+    for key, item in value.items():
+        if key in SERIES_VALUE_KEYS and isinstance(item, list) and all(isinstance(row, dict) for row in item):
+            reduced[key] = downsample_rows(item, SERIES_VALUE_KEYS[key], budget)
+            if len(reduced[key]) < len(item):
+                reduced[f"{key}_sampling"] = {"method": "lttb", "original_points": len(item), "points": len(reduced[key])}
+        else:
+            reduced[key] = reduce_nested_data(item, budget)
+    return reduced
@@ -0,0 +1,393 @@
+"""
+생성 코드 정적 분석
+AST를 한 번 순회하며 import 별칭을 풀어 실제 호출/속성 접근/파일 경로/네트워크 사용을 판정 (식별자 일부 문자열 일치로 오탐하지 않음)
+"""
+
+import ast
+import gc
+import os
+from typing import Any, Dict, List, Optional
+
+# 호출/참조만 해도 실행을 막는 이름 (모듈이면 하위 속성 전체 포함)
+BLOCKED_NAMES = {
+    "eval": "eval",
+    "compile": "compile",
+    "__import__": "__import__",
+    "subprocess": "subprocess",
+    "os.system": "os.system",
+    "os.popen": "os.popen",
+    "importlib.import_module": "importlib.import_module",
+    "pty.spawn": "pty.spawn",
+    # builtins 모듈 전체 (builtins.eval, from builtins import eval 등 내장 함수 우회)
+    "builtins": "builtins",
+}
+# 이름 앞부분만 같아도 막는 함수 계열 (os.execv, os.spawnl, os.posix_spawnp 등)
+BLOCKED_PREFIXES = ("os.exec", "os.spawn", "os.posix_spawn")
+# builtins.X로 접근해도 같은 내장 함수로 판정하는 이름
+BUILTIN_ALIASES = {"eval", "exec", "compile", "__import__"}
+# 샌드박스 탈출에 쓰이는 속성
+BLOCKED_ATTRIBUTES = {"__builtins__", "__globals__", "__subclasses__", "__code__"}
+# getattr/globals 등으로 위 이름을 우회 호출하는 경우
+INDIRECT_CALLS = {"getattr", "setattr", "delattr", "globals", "vars"}
+
+NETWORK_MODULES = {"requests", "urllib", "socket", "http.client", "httpx", "aiohttp", "ftplib", "smtplib"}
+# 검사 대상 이름의 첫 부분 - 대부분의 이름(df, pd, np ...)은 여기서 바로 통과
+CHECKED_ROOTS = {name.split(".")[0] for name in (*BLOCKED_NAMES, *BLOCKED_PREFIXES, *NETWORK_MODULES)}
+
+ALLOWED_WRITE_PATHS = ['/reports/', './reports/', 'reports/', '/app/reports/', '/tmp/']
+ALLOWED_WRITE_DIRS = ['reports', 'tmp']
+# 문자열로 적혀도 괜찮은 루트 디렉토리
+ALLOWED_ROOT_DIRS = ('/app/', '/data/', '/reports/', '/tmp/')
+WRITE_MODES = set("wax+")
+
+
+class CodeAnalyzer(ast.NodeVisitor):
+    """AST 한 번 순회로 위험 호출(errors)과 주의 항목(warnings)을 모으는 분석기"""
+
+    def __init__(self):
+        # 별칭 → 정규 이름 (import numpy as np → {"np": "numpy"}, from os import system → {"system": "os.system"})
+        self.aliases: Dict[str, str] = {}
+        self.errors: Dict[str, int] = {}
+        self.warnings: Dict[str, int] = {}
+        # 스코프별 사용자 변수 (이름 → 값이 대입되어 있는지) - 함수/클래스마다 하나씩, 클래스 스코프는 메서드에서 보이지 않음
+        self.scopes: List[Dict[str, bool]] = [{}]
+        self.class_scopes: List[bool] = [False]
+        # 사용자 변수로 보고 검사하지 않은 읽기 - 네임스페이스를 직접 바꿀 수 있는 코드가 있으면 다시 검사
+        self.shadowed_reads: List[ast.Name] = []
+        self.namespace_access = False
+
+    def report(self) -> Dict[str, Any]:
+        """판정 결과 (같은 항목은 처음 나온 줄만 표시)"""
+        if self.namespace_access:
+            # globals()/exec 등으로 대입한 변수를 지울 수 있으므로 내장 함수로 보고 판정
+            for node in self.shadowed_reads:
+                self._check_load(node)
+        return {
+            "is_safe": not self.errors,
+            "warnings": [f"{message} (줄 {line})" for message, line in self.warnings.items()],
+            "errors": [f"{message} (줄 {line})" for message, line in self.errors.items()]
+        }
+
+    def _error(self, message: str, node: ast.AST):
+        self.errors.setdefault(message, getattr(node, "lineno", 0))
+
+    def _warn(self, message: str, node: ast.AST):
+        self.warnings.setdefault(message, getattr(node, "lineno", 0))
+
+    def _check_name(self, name: str, node: ast.AST):
+        """정규 이름이 차단/네트워크 대상인지 확인합니다. (점으로 나눈 앞부분마다 집합 조회)"""
+        parts = name.split(".")
+        if parts[0] not in CHECKED_ROOTS:
+            return
+        if parts[0] == "builtins" and len(parts) > 1 and parts[1] in BUILTIN_ALIASES:
+            # builtins.eval → eval
+            self._error(f"위험한 함수 사용: {parts[1]}", node)
+            return
+        prefix = ""
+        for part in parts:
+            prefix = f"{prefix}.{part}" if prefix else part
+            if prefix in BLOCKED_NAMES:
+                self._error(f"위험한 함수 사용: {BLOCKED_NAMES[prefix]}", node)
+                return
+            if prefix in NETWORK_MODULES:
+                self._warn(f"네트워크 접근 감지: {prefix}", node)
+                return
+        for blocked in BLOCKED_PREFIXES:
+            if name.startswith(blocked):
+                self._error(f"위험한 함수 사용: {blocked}*", node)
+                return
+
+    def _resolve(self, node: ast.AST) -> Optional[str]:
+        """Name/Attribute 체인을 별칭을 푼 점 표기 이름으로 바꿉니다. (호출 결과 등에서 시작하면 None)"""
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(self.aliases.get(node.id, node.id))
+        return ".".join(reversed(parts))
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                # import os.path → 이름 os가 묶임
+                top = alias.name.split(".")[0]
+                self.aliases[top] = top
+            self._check_name(alias.name, node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ""
+        if node.level:
+            self._warn("상대 import 감지", node)
+        self._check_name(module, node)
+        for alias in node.names:
+            full_name = f"{module}.{alias.name}" if module else alias.name
+            self.aliases[alias.asname or alias.name] = full_name
+            self._check_name(full_name, node)
+
+    def _is_user_variable(self, name: str) -> bool:
+        """현재 위치에서 이름이 사용자가 값을 대입한 변수인지 (import 별칭은 제외)"""
+        if name in self.aliases:
+            return False
+        innermost = len(self.scopes) - 1
+        for index in range(innermost, -1, -1):
+            if self.class_scopes[index] and index != innermost:
+                continue
+            if name in self.scopes[index]:
+                return self.scopes[index][name]
+        return False
+
+    def _bind(self, target: ast.AST):
+        """스코프 최상위 문장의 대입 대상 이름을 사용자 변수로 기록합니다. (조건/반복 안의 대입은 실행되지 않을 수 있어 제외)"""
+        if isinstance(target, ast.Name):
+            self.scopes[-1][target.id] = True
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self._bind(element)
+
+    def _unbind(self, name: str):
+        """del로 지운 이름은 모든 스코프에서 다시 내장 함수로 봄 (global 선언 여부와 무관하게 보수적으로)
+
+        앞서 정의한 함수가 나중에 호출될 수 있으므로 이미 건너뛴 같은 이름의 읽기도 다시 검사
+        """
+        for scope in self.scopes:
+            if name in scope:
+                scope[name] = False
+        for node in self.shadowed_reads:
+            if node.id == name:
+                self._check_load(node)
+
+    def _visit_body(self, body: List[ast.stmt]):
+        """문장을 순서대로 방문하고, 최상위 대입은 값 평가 뒤에 사용자 변수로 기록합니다."""
+        for statement in body:
+            self.visit(statement)
+            if isinstance(statement, ast.Assign):
+                for target in statement.targets:
+                    self._bind(target)
+            elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+                self._bind(statement.target)
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self.scopes[-1][statement.name] = True
+
+    def _visit_scope(self, body: List[ast.stmt], arguments: Optional[ast.arguments] = None, is_class: bool = False):
+        """함수/클래스 본문을 새 스코프에서 방문합니다. (매개변수는 사용자 변수)"""
+        scope: Dict[str, bool] = {}
+        if arguments is not None:
+            for arg in (*arguments.posonlyargs, *arguments.args, arguments.vararg, *arguments.kwonlyargs, arguments.kwarg):
+                if arg is not None:
+                    scope[arg.arg] = True
+        self.scopes.append(scope)
+        self.class_scopes.append(is_class)
+        try:
+            self._visit_body(body)
+        finally:
+            self.scopes.pop()
+            self.class_scopes.pop()
+
+    def visit_Module(self, node: ast.Module):
+        self._visit_body(node.body)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        # 데코레이터/기본값/주석은 정의하는 스코프에서 평가
+        for child in (*node.decorator_list, node.args, node.returns):
+            if child is not None:
+                self.visit(child)
+        self._visit_scope(node.body, node.args)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        for child in (*node.decorator_list, *node.bases, *node.keywords):
+            self.visit(child)
+        self._visit_scope(node.body, is_class=True)
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self.visit(node.args)
+        self.scopes.append({arg.arg: True for arg in (*node.args.posonlyargs, *node.args.args, *node.args.kwonlyargs)})
+        self.class_scopes.append(False)
+        try:
+            self.visit(node.body)
+        finally:
+            self.scopes.pop()
+            self.class_scopes.pop()
+
+    def visit_Name(self, node: ast.Name):
+        if node.id in BLOCKED_ATTRIBUTES:
+            self._error(f"위험한 속성 접근: {node.id}", node)
+            return
+        if isinstance(node.ctx, ast.Del):
+            self._unbind(node.id)
+            return
+        if not isinstance(node.ctx, ast.Load):
+            return
+        # 값을 대입한 뒤 읽으면 내장 함수와 이름만 같은 변수
+        if self._is_user_variable(node.id):
+            self.shadowed_reads.append(node)
+            return
+        self._check_load(node)
+
+    def _check_load(self, node: ast.Name):
+        """이름 읽기 판정 - exec는 직접 호출이 아닌 모든 사용(다른 이름에 대입, 인자로 전달 등)을 차단"""
+        name = self.aliases.get(node.id, node.id)
+        if name == "exec":
+            self._error("exec 간접 사용 (문자열 상수를 직접 호출하는 경우만 허용)", node)
+            return
+        self._check_name(name, node)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if node.attr in BLOCKED_ATTRIBUTES:
+            self._error(f"위험한 속성 접근: {node.attr}", node)
+        if isinstance(node.ctx, ast.Del):
+            # del module.name처럼 모듈 네임스페이스에서 지울 수 있음
+            self._unbind(node.attr)
+        elif node.attr == "__dict__":
+            self.namespace_access = True
+        name = self._resolve(node)
+        if name is None:
+            self.visit(node.value)
+            return
+        # 체인 안쪽 Name은 이미 풀었으므로 다시 방문하지 않음 (체인 길이에 대해 선형)
+        self._check_name(name, node)
+
+    def visit_Call(self, node: ast.Call):
+        name = self._resolve(node.func)
+        if name == "exec":
+            self._check_exec(node)
+            if isinstance(node.func, ast.Name):
+                # 직접 호출한 exec 이름 자체는 간접 사용으로 보지 않음
+                for child in (*node.args, *node.keywords):
+                    self.visit(child)
+                return
+        elif name == "locals":
+            # 모듈 최상위의 locals()는 globals()와 같은 사전
+            self.namespace_access = True
+        elif name in INDIRECT_CALLS:
+            self._check_indirect(name, node)
+        elif name == "open":
+            self._check_open(node)
+        elif name == "os.path.join":
+            self._check_join(node)
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        if not isinstance(node.value, str):
+            return
+        value = node.value
+        if "http://" in value or "https://" in value:
+            self._warn("네트워크 접근 감지: URL", node)
+        if value.startswith("/") and len(value) > 1 and "\n" not in value and not value.startswith(ALLOWED_ROOT_DIRS):
+            self._warn("잠재적 위험한 루트 디렉토리 접근 감지", node)
+
+    def _check_exec(self, node: ast.Call):
+        """exec는 문자열 상수만 허용하고, 그 코드도 같은 규칙으로 분석"""
+        source = _literal_str(node.args[0]) if node.args else None
+        if source is None:
+            self._error("exec에 동적 코드 전달", node)
+            return
+        self._warn("exec 함수 사용 감지 - 제한된 환경에서만 실행됩니다", node)
+        # exec 코드는 같은 네임스페이스에서 실행되어 변수를 지울 수 있음
+        self.namespace_access = True
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            self._error("exec 코드 문법 오류", node)
+            return
+        nested = CodeAnalyzer()
+        nested.visit(tree)
+        nested.report()
+        # 내부 코드의 판정은 exec 호출 줄로 표시
+        for message in nested.errors:
+            self._error(f"exec 코드 - {message}", node)
+        for message in nested.warnings:
+            self._warn(f"exec 코드 - {message}", node)
+
+    def _check_indirect(self, name: str, node: ast.Call):
+        """getattr(obj, "system") 같은 문자열 속성 조회와 globals()/vars() 사용"""
+        if name in ("globals", "vars"):
+            self._warn(f"네임스페이스 직접 접근 감지: {name}", node)
+            self.namespace_access = True
+            return
+        if len(node.args) < 2 or not isinstance(node.args[1], ast.Constant) or not isinstance(node.args[1].value, str):
+            self._warn(f"동적 속성 접근 감지: {name}", node)
+            return
+        attr = node.args[1].value
+        if attr in BLOCKED_ATTRIBUTES:
+            self._error(f"위험한 속성 접근: {attr}", node)
+            return
+        target = self._resolve(node.args[0])
+        if target:
+            self._check_name(f"{target}.{attr}", node)
+        for blocked in (*BLOCKED_NAMES, *BLOCKED_PREFIXES):
+            if attr.startswith(blocked.split(".")[-1]) and (blocked in BLOCKED_PREFIXES or attr == blocked.split(".")[-1]):
+                self._error(f"위험한 함수 사용: {BLOCKED_NAMES.get(blocked, blocked + '*')}", node)
+                return
+
+    def _check_open(self, node: ast.Call):
+        """쓰기 모드 open()의 경로 확인"""
+        path = node.args[0] if node.args else _keyword(node, "file")
+        mode = node.args[1] if len(node.args) > 1 else _keyword(node, "mode")
+        file_path = _literal_str(path)
+        if file_path is not None and ".." in file_path:
+            self._warn("파일 시스템 접근 감지: 상위 디렉토리", node)
+        mode_value = _literal_str(mode)
+        if mode_value is None or not WRITE_MODES & set(mode_value) or file_path is None:
+            # 경로가 변수/f-string이면 실행 작업 디렉터리 기준이므로 판정하지 않음
+            return
+        if not is_allowed_write_path(file_path):
+            self._warn(f"파일 쓰기 경로 확인 필요: {file_path}", node)
+
+    def _check_join(self, node: ast.Call):
+        """os.path.join 인자의 상위 디렉토리 결합"""
+        for arg in node.args:
+            value = _literal_str(arg)
+            if value is not None and ".." in value.split("/"):
+                self._warn("파일 시스템 접근 감지: 상위 디렉토리", node)
+                return
+
+
+def is_allowed_write_path(file_path: str) -> bool:
+    """reports/tmp 아래 경로인지 확인합니다. (절대/상대 경로 모두)"""
+    if any(file_path.startswith(path) for path in ALLOWED_WRITE_PATHS):
+        return True
+    normalized_path = os.path.normpath(file_path)
+    return any(
+        normalized_path.startswith(dir_name + '/') or normalized_path.startswith(dir_name + '\\')
+        for dir_name in ALLOWED_WRITE_DIRS
+    )
+
+
+def _keyword(node: ast.Call, name: str) -> Optional[ast.AST]:
+    for keyword in node.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _literal_str(node: Optional[ast.AST]) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def analyze_code(code: str) -> Dict[str, Any]:
+    """코드를 파싱해 분석합니다. 문법 오류도 실행 전에 errors로 돌려줍니다."""
+    # 노드 수에 비례해 순환 GC가 반복 실행되면 큰 코드에서 파싱이 선형보다 느려지므로 분석 동안 중지
+    # (AST 노드는 순환 참조가 없어 참조 카운트로 해제됨)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        tree = ast.parse(code)
+        analyzer = CodeAnalyzer()
+        analyzer.visit(tree)
+        return analyzer.report()
+    except SyntaxError as e:
+        return {"is_safe": False, "warnings": [], "errors": [f"문법 오류: {e.msg} (줄 {e.lineno})"]}
+    except (ValueError, RecursionError) as e:
+        # 널 바이트, 지나치게 깊은 중첩
+        return {"is_safe": False, "warnings": [], "errors": [f"코드 분석 실패: {type(e).__name__}"]}
+    finally:
+        if gc_enabled:
+            gc.enable()
@@ -0,0 +1,272 @@
+"""
+리포트 HTML 단일 패스 검사
+html.parser로 문서를 한 번 훑어 구조/보안/차트(canvas)/script 짝/데이터 채움 결과를 함께 만들고, 같은 내용은 해시로 캐시
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+# 내용 해시 → 검사 결과 (검증 에이전트/브라우저 에이전트/코드 실행기가 같은 리포트를 다시 검사할 때 재사용)
+INSPECTION_CACHE_SIZE = int(os.getenv('HTML_INSPECTION_CACHE_SIZE', '256'))
+_inspection_cache: "OrderedDict[str, HTMLInspection]" = OrderedDict()
+_inspection_lock = threading.Lock()
+
+DANGEROUS_TAGS = {"iframe", "object", "embed", "form"}
+# 닫는 태그가 없는 요소
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# 데이터 대신 들어간 자리표시 문구
+EXAMPLE_MARKERS = ("예시", "가정")
+EMPTY_VALUES = {"", "0", "N/A", "-"}
+# 진단용으로 돌려줄 위치 수 상한
+MAX_FINDINGS = 100
+
+EXTERNAL_URL = re.compile(r'^\s*(?:https?:)?//', re.IGNORECASE)
+CSS_IMPORT = re.compile(r'@import\s+(?:url\()?\s*["\']?\s*(?:https?:)?//', re.IGNORECASE)
+# 본문 텍스트에 섞여 들어간 Python 코드 줄
+PYTHON_LINE = re.compile(r'^\s*(?:import\s+\w[\w.]*\s*$|from\s+\w[\w.]*\s+import\s|def\s+\w+\s*\(.*\)\s*:)', re.MULTILINE)
+NEW_CHART = re.compile(r'new\s+Chart\s*\(')
+ELEMENT_BY_ID = re.compile(r'getElementById\(\s*["\']([^"\']+)["\']\s*\)')
+
+
+@dataclass(frozen=True)
+class HTMLInspection:
+    """HTML 검사 결과 - 캐시에서 공유되므로 변경 불가"""
+    has_doctype: bool
+    has_html: bool
+    has_head: bool
+    has_body: bool
+    has_charset: bool
+    has_viewport: bool
+    chart_library: bool
+    chart_library_local: bool
+    canvas_count: int
+    canvas_ids: Tuple[str, ...]
+    chart_constructors: int
+    chart_errors: Tuple[str, ...]
+    unclosed_scripts: int
+    python_code: bool
+    has_example_data: bool
+    stat_values: Tuple[str, ...]
+    security_errors: Tuple[str, ...]
+    security_warnings: Tuple[str, ...]
+    findings: Tuple[Dict[str, Any], ...]
+
+    @property
+    def data_populated(self) -> bool:
+        """.stat-number 값이 하나라도 실제 값인지 (값 카드가 없으면 확인 불가로 True)"""
+        if not self.stat_values:
+            return True
+        return any(value not in EMPTY_VALUES and not value.startswith(EXAMPLE_MARKERS) for value in self.stat_values)
+
+    def structure_errors(self) -> List[str]:
+        errors = []
+        if not self.has_doctype:
+            errors.append("DOCTYPE 선언이 없습니다")
+        if not self.has_html:
+            errors.append("html 태그가 없습니다")
+        if not self.has_head:
+            errors.append("head 태그가 없습니다")
+        if not self.has_body:
+            errors.append("body 태그가 없습니다")
+        if self.unclosed_scripts:
+            errors.append("script 태그가 제대로 닫히지 않았습니다")
+        if self.python_code:
+            errors.append("HTML에 Python 코드가 섞여있습니다")
+        return errors
+
+    def structure_warnings(self) -> List[str]:
+        warnings = []
+        if not self.has_charset:
+            warnings.append("문자 인코딩이 지정되지 않았습니다")
+        if not self.has_viewport:
+            warnings.append("반응형 viewport 메타태그가 없습니다")
+        return warnings
+
+
+class _InspectionParser(HTMLParser):
+    """문서를 한 번 순회하며 검사에 필요한 사실을 모으는 파서"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.seen_content = False
+        self.has_doctype = False
+        self.tags = set()
+        self.has_charset = False
+        self.has_viewport = False
+        self.chart_library = False
+        self.chart_library_local = False
+        self.canvas_ids: List[str] = []
+        self.canvas_count = 0
+        self.open_scripts = 0
+        self.python_code = False
+        self.has_example_data = False
+        self.script_text: List[str] = []
+        self.stat_values: List[str] = []
+        # .stat-number 요소 안의 텍스트를 모으는 중이면 그 깊이
+        self._stat_depth = 0
+        self._stat_text: List[str] = []
+        self._raw_tag: Optional[str] = None
+        self.element_ids = set()
+        # 메시지 → [건수, 처음 나온 줄]
+        self.security_errors: Dict[str, List[int]] = {}
+        self.security_warnings: Dict[str, List[int]] = {}
+        self.findings: List[Dict[str, Any]] = []
+
+    def _finding(self, kind: str, detail: str, messages: Dict[str, List[int]], message: str):
+        line, column = self.getpos()
+        messages.setdefault(message, [0, line])[0] += 1
+        if len(self.findings) < MAX_FINDINGS:
+            self.findings.append({"type": kind, "match": detail, "line": line, "column": column})
+
+    def handle_decl(self, decl: str):
+        if decl.lower().startswith("doctype") and not self.seen_content:
+            self.has_doctype = True
+        self.seen_content = True
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.seen_content = True
+        self.tags.add(tag)
+        attributes = {name: value or "" for name, value in attrs}
+        if attributes.get("id"):
+            self.element_ids.add(attributes["id"])
+
+        if tag == "meta":
+            if "charset" in attributes or "charset=" in attributes.get("content", "").lower():
+                self.has_charset = True
+            if attributes.get("name", "").lower() == "viewport":
+                self.has_viewport = True
+        elif tag == "canvas":
+            self.canvas_count += 1
+            if attributes.get("id"):
+                self.canvas_ids.append(attributes["id"])
+        elif tag == "script":
+            self.open_scripts += 1
+            self._raw_tag = tag
+            src = attributes.get("src", "")
+            if "chart" in os.path.basename(src.split("?")[0]).lower():
+                self.chart_library = True
+                self.chart_library_local = not EXTERNAL_URL.match(src)
+            if src and EXTERNAL_URL.match(src):
+                self._finding("external_script", src, self.security_warnings, "외부 스크립트 감지: script")
+        elif tag == "style":
+            self._raw_tag = tag
+        elif tag in DANGEROUS_TAGS:
+            self._finding("tag", tag, self.security_errors, f"위험한 태그 감지: {tag}")
+
+        for name in ("src", "href"):
+            value = attributes.get(name, "")
+            if value and EXTERNAL_URL.match(value) and tag != "script":
+                self._finding("external", f'{name}="{value}"', self.security_warnings, f"외부 리소스 참조 감지: {name}")
+
+        if tag in VOID_ELEMENTS:
+            return
+        if self._stat_depth:
+            self._stat_depth += 1
+        elif "stat-number" in attributes.get("class", "").split():
+            self._stat_depth = 1
+            self._stat_text = []
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        # <canvas/>, <meta/> 처럼 닫힌 형태는 여는 태그로만 처리하고 깊이를 올리지 않음
+        depth = self._stat_depth
+        self.handle_starttag(tag, attrs)
+        self._stat_depth = depth
+        if tag in ("script", "style"):
+            self._raw_tag = None
+            if tag == "script":
+                self.open_scripts -= 1
+
+    def handle_endtag(self, tag: str):
+        if tag == "script":
+            self.open_scripts -= 1
+        if tag in ("script", "style"):
+            self._raw_tag = None
+        if self._stat_depth:
+            self._stat_depth -= 1
+            if not self._stat_depth:
+                self.stat_values.append("".join(self._stat_text).strip())
+
+    def handle_data(self, data: str):
+        if not self.seen_content and not data.strip():
+            return
+        self.seen_content = True
+        if not self.has_example_data and any(marker in data for marker in EXAMPLE_MARKERS):
+            self.has_example_data = True
+
+        if self._raw_tag == "script":
+            self.script_text.append(data)
+        elif self._raw_tag == "style":
+            if CSS_IMPORT.search(data):
+                self._finding("external", "@import", self.security_warnings, "외부 리소스 참조 감지: @import")
+        else:
+            if not self.python_code and PYTHON_LINE.search(data):
+                self.python_code = True
+            if self._stat_depth:
+                self._stat_text.append(data)
+
+
+def inspect_html(html_content: str) -> HTMLInspection:
+    """HTML을 한 번 파싱해 검사합니다. 같은 내용은 캐시된 결과를 돌려줍니다."""
+    key = hashlib.sha256(html_content.encode('utf-8', 'surrogatepass')).hexdigest()
+    with _inspection_lock:
+        inspection = _inspection_cache.get(key)
+        if inspection is not None:
+            _inspection_cache.move_to_end(key)
+            return inspection
+
+    inspection = _inspect(html_content)
+    with _inspection_lock:
+        _inspection_cache[key] = inspection
+        while len(_inspection_cache) > INSPECTION_CACHE_SIZE:
+            _inspection_cache.popitem(last=False)
+    return inspection
+
+
+def _inspect(html_content: str) -> HTMLInspection:
+    parser = _InspectionParser()
+    parser.feed(html_content)
+    parser.close()
+    if parser.open_scripts > 0 and parser.rawdata:
+        # 닫히지 않은 script 뒤 내용은 파서에 남아 있음 - 브라우저처럼 스크립트 본문으로 취급
+        parser.handle_data(parser.rawdata)
+
+    scripts = "".join(parser.script_text)
+    chart_constructors = len(NEW_CHART.findall(scripts))
+    chart_errors = []
+    # 스크립트가 찾는 id 중 문서에 없는 것 (차트 생성 시 null 참조)
+    for element_id in dict.fromkeys(ELEMENT_BY_ID.findall(scripts)):
+        if element_id not in parser.element_ids:
+            chart_errors.append(f"존재하지 않는 요소 참조: {element_id}")
+
+    return HTMLInspection(
+        has_doctype=parser.has_doctype,
+        has_html="html" in parser.tags,
+        has_head="head" in parser.tags,
+        has_body="body" in parser.tags,
+        has_charset=parser.has_charset,
+        has_viewport=parser.has_viewport,
+        chart_library=parser.chart_library,
+        chart_library_local=parser.chart_library_local,
+        canvas_count=parser.canvas_count,
+        canvas_ids=tuple(parser.canvas_ids),
+        chart_constructors=chart_constructors,
+        chart_errors=tuple(chart_errors),
+        unclosed_scripts=max(parser.open_scripts, 0),
+        python_code=parser.python_code,
+        has_example_data=parser.has_example_data,
+        stat_values=tuple(parser.stat_values),
+        security_errors=tuple(_with_counts(parser.security_errors)),
+        security_warnings=tuple(_with_counts(parser.security_warnings)),
+        findings=tuple(parser.findings)
+    )
+
+
+def _with_counts(messages: Dict[str, List[int]]) -> List[str]:
+    """메시지에 처음 나온 줄과 건수를 붙입니다."""
+    return [f"{message} (줄 {line}, {count}건)" for message, (count, line) in messages.items()]
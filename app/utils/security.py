@@ -1,7 +1,22 @@
+import hashlib
+import logging
 import re
 import os
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any
 
+from .code_analysis import analyze_code
+from .html_inspection import inspect_html
+
+logger = logging.getLogger(__name__)
+
+# 코드 해시 → 판정 (재시도/재생성으로 같은 코드가 다시 검증될 때 분석 생략)
+VERDICT_CACHE_SIZE = int(os.getenv('SECURITY_VERDICT_CACHE_SIZE', '1024'))
+_verdict_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_verdict_lock = threading.Lock()
+
+
 class SecurityValidator:
     """사용자 입력과 코드 실행의 보안을 검증하는 클래스"""
     
@@ -25,6 +40,13 @@ class SecurityValidator:
             'plotly', 'json', 'datetime', 'time', 'math',
             'statistics', 'collections', 'itertools'
         ]
+        
+        # 키워드(대소문자 무시, 긴 것 우선)와 특수 문자를 합친 패턴
+        keywords = sorted(self.dangerous_keywords, key=len, reverse=True)
+        self._query_pattern = re.compile(
+            f"(?P<keyword>{'|'.join(re.escape(keyword) for keyword in keywords)})|(?P<char>[<>\"';\\\\])",
+            re.IGNORECASE
+        )
     
     def validate_user_query(self, query: str) -> bool:
         """사용자 쿼리의 안전성을 검증합니다."""
@@ -33,107 +55,44 @@ class SecurityValidator:
         if len(query) > 1000:
             return False
         
-        # 위험한 키워드 검사
-        query_lower = query.lower()
-        for keyword in self.dangerous_keywords:
-            if keyword in query_lower:
-                return False
-        
-        # 특수 문자 제한
-        if re.search(r'[<>"\';\\]', query):
+        # 위험한 키워드와 특수 문자를 한 번에 검사
+        match = self._query_pattern.search(query)
+        if match:
+            logger.debug(f"사용자 쿼리 차단: {match.lastgroup} '{match.group()}' (위치 {match.start()})")
             return False
         
         return True
     
+    def scan_user_query(self, query: str) -> List[Dict[str, Any]]:
+        """쿼리에서 위험한 키워드/특수 문자를 모두 찾아 위치와 함께 돌려줍니다."""
+        return [
+            {"type": match.lastgroup, "match": match.group(), "position": match.start()}
+            for match in self._query_pattern.finditer(query)
+        ]
+    
     def validate_code(self, code: str) -> Dict[str, Any]:
-        """생성된 코드의 안전성을 검증합니다."""
-        
-        result: Dict[str, Any] = {
-            "is_safe": True,
-            "warnings": [],
-            "errors": []
+        """생성된 코드의 안전성을 검증합니다. (AST 분석, 같은 코드는 캐시된 판정 사용)"""
+        
+        key = hashlib.sha256(code.encode('utf-8', 'surrogatepass')).hexdigest()
+        with _verdict_lock:
+            verdict = _verdict_cache.get(key)
+            if verdict is not None:
+                _verdict_cache.move_to_end(key)
+        
+        if verdict is None:
+            # exec는 제한된 컨텍스트에서 허용하므로 경고만, 파일 쓰기는 reports/tmp 밖이면 경고
+            verdict = analyze_code(code)
+            with _verdict_lock:
+                _verdict_cache[key] = verdict
+                while len(_verdict_cache) > VERDICT_CACHE_SIZE:
+                    _verdict_cache.popitem(last=False)
+        
+        # 호출자가 목록을 수정해도 캐시는 바뀌지 않도록 복사
+        return {
+            "is_safe": verdict["is_safe"],
+            "warnings": list(verdict["warnings"]),
+            "errors": list(verdict["errors"])
         }
-        
-        # 위험한 함수 호출 검사 (exec는 제한된 컨텍스트에서 허용)
-        dangerous_functions = [
-            'eval', 'compile', '__import__',
-            'subprocess', 'os.system'
-        ]
-        
-        for func in dangerous_functions:
-            if re.search(func, code):
-                result["errors"].append(f"위험한 함수 사용: {func}")
-                result["is_safe"] = False
-        
-        # exec 사용은 경고만 (제한된 환경에서 허용)
-        if re.search(r'\bexec\b', code):
-            result["warnings"].append("exec 함수 사용 감지 - 제한된 환경에서만 실행됩니다")
-        
-        # 파일 쓰기 검사 (허용된 경로만)
-        write_patterns = [
-            r'open\s*\(\s*["\']([^"\']+)["\'][\s,]*["\']w["\']',  # open('file', 'w')
-            r'open\s*\(\s*([^,)]+)\s*,\s*["\']w["\']'  # open(file, 'w')
-        ]
-        
-        for pattern in write_patterns:
-            matches = re.finditer(pattern, code)
-            for match in matches:
-                # 첫 번째 그룹이 파일 경로
-                if len(match.groups()) > 0:
-                    file_path = match.group(1).strip('\'"')
-                    # reports 디렉토리 관련 경로는 허용 (절대/상대 경로 모두)
-                    allowed_paths = ['/reports/', './reports/', 'reports/', '/app/reports/', '/tmp/']
-                    allowed_dirs = ['reports', 'tmp']
-                    
-                    # 경로 정규화
-                    normalized_path = os.path.normpath(file_path)
-                    
-                    # 허용된 경로 확인
-                    is_allowed = False
-                    for path in allowed_paths:
-                        if file_path.startswith(path):
-                            is_allowed = True
-                            break
-                    
-                    # 상대 경로로 reports 또는 tmp 디렉토리인지 확인
-                    if not is_allowed:
-                        for dir_name in allowed_dirs:
-                            if normalized_path.startswith(dir_name + '/') or normalized_path.startswith(dir_name + '\\'):
-                                is_allowed = True
-                                break
-                    
-                    if not is_allowed:
-                        result["warnings"].append(f"파일 쓰기 경로 확인 필요: {file_path}")
-                        # errors 대신 warnings로 변경 (너무 엄격하지 않게)
-        
-        # 파일 시스템 접근 검사
-        filesystem_patterns = [
-            r'open\s*\([^)]*["\'][^"\']*\.\.[^"\']*["\']',  # 상위 디렉토리 접근
-            r'os\.path\.join\s*\([^)]*\.\.'  # 상위 디렉토리 결합
-        ]
-        
-        for pattern in filesystem_patterns:
-            if re.search(pattern, code):
-                result["warnings"].append(f"파일 시스템 접근 감지: {pattern}")
-        
-        # 허용되지 않는 루트 디렉토리 접근 검사 (app, data, reports는 허용)
-        dangerous_root_access = r'["\']\/(?!(?:app|data|reports|tmp)\/)[^"\']*["\']'
-        if re.search(dangerous_root_access, code):
-            result["warnings"].append(f"잠재적 위험한 루트 디렉토리 접근 감지")
-        
-        # 네트워크 접근 검사
-        network_patterns = [
-            r'http[s]?://',
-            r'requests\.',
-            r'urllib\.',
-            r'socket\.'
-        ]
-        
-        for pattern in network_patterns:
-            if re.search(pattern, code):
-                result["warnings"].append(f"네트워크 접근 감지: {pattern}")
-        
-        return result
     
     def sanitize_filename(self, filename: str) -> str:
         """파일명을 안전하게 정리합니다."""
@@ -183,36 +142,15 @@ class SecurityValidator:
         return filtered
     
     def validate_html_content(self, html_content: str) -> Dict[str, Any]:
-        """HTML 콘텐츠의 안전성을 검증합니다."""
-        
-        result: Dict[str, Any] = {
-            "is_safe": True,
-            "warnings": [],
-            "errors": []
-        }
+        """HTML 콘텐츠의 안전성을 검증합니다. (findings: 발견 위치)"""
         
-        # 위험한 태그 검사
-        dangerous_tags = ['script', 'iframe', 'object', 'embed', 'form']
-        
-        for tag in dangerous_tags:
-            if f'<{tag}' in html_content.lower():
-                if tag == 'script':
-                    # 로컬 스크립트만 허용
-                    if 'src="/static/' not in html_content:
-                        result["warnings"].append(f"외부 스크립트 감지: {tag}")
-                else:
-                    result["errors"].append(f"위험한 태그 감지: {tag}")
-                    result["is_safe"] = False
-        
-        # 외부 리소스 검사
-        external_patterns = [
-            r'src=["\']https?://',
-            r'href=["\']https?://',
-            r'@import\s+["\']https?://'
-        ]
-        
-        for pattern in external_patterns:
-            if re.search(pattern, html_content):
-                result["warnings"].append(f"외부 리소스 참조 감지: {pattern}")
+        # 위험한 태그, 외부 스크립트/리소스 참조를 파서 한 번 순회로 검사 (같은 내용은 캐시)
+        inspection = inspect_html(html_content)
         
-        return result 
\ No newline at end of file
+        return {
+            "is_safe": not inspection.security_errors,
+            "warnings": list(inspection.security_warnings),
+            "errors": list(inspection.security_errors),
+            "has_html": inspection.has_html,
+            "findings": [dict(finding) for finding in inspection.findings]
+        }
@@ -2,10 +2,11 @@
 리포트 관련 유틸리티 함수들
 """
 import os
-import glob
 import re
 from typing import List, Optional
 
+from app.report_catalog import get_report_catalog
+
 
 def extract_timestamp_from_filename(filepath: str) -> int:
     """파일명에서 타임스탬프를 추출합니다."""
@@ -17,22 +18,13 @@ def extract_timestamp_from_filename(filepath: str) -> int:
 
 def get_latest_report(reports_dir: str = './reports') -> Optional[str]:
     """가장 최신의 리포트 파일을 반환합니다."""
-    report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
-    
-    if not report_files:
-        return None
-    
-    # 파일명의 타임스탬프 기준으로 최신 파일 찾기
-    latest_report = max(report_files, key=extract_timestamp_from_filename)
-    return latest_report
+    return get_report_catalog().latest(reports_dir)
 
 
-def get_all_reports(reports_dir: str = './reports') -> List[str]:
-    """모든 리포트 파일을 타임스탬프 순으로 정렬하여 반환합니다."""
-    report_files = glob.glob(os.path.join(reports_dir, "report_*.html"))
-    
-    # 타임스탬프 기준으로 정렬 (최신순)
-    return sorted(report_files, key=extract_timestamp_from_filename, reverse=True)
+def get_all_reports(reports_dir: str = './reports', offset: int = 0, limit: int = 1000) -> List[str]:
+    """리포트 파일을 최신순으로 반환합니다."""
+    _, rows = get_report_catalog().query(reports_dir, offset=offset, limit=limit)
+    return [row["path"] for row in rows]
 
 
 def is_valid_report_file(filepath: str) -> bool:
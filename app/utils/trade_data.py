@@ -0,0 +1,188 @@
+"""
+부동산 거래 데이터 관련 유틸리티 함수들
+MCP 도구(get_apt_trade_data 등)가 반환하는 원시 거래 데이터를 DataFrame으로 정규화
+"""
+import json
+import os
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 정규화된 컬럼명 -> 원시 데이터에서 사용될 수 있는 키 목록
+COLUMN_ALIASES: Dict[str, List[str]] = {
+    "apt_name": ["aptNm", "아파트", "apartment_name", "단지명"],
+    "dong": ["umdNm", "법정동", "dong"],
+    "deal_amount": ["dealAmount", "거래금액", "deal_amount", "price"],
+    "area": ["excluUseAr", "전용면적", "area"],
+    "deal_year": ["dealYear", "년", "deal_year"],
+    "deal_month": ["dealMonth", "월", "deal_month"],
+    "deal_day": ["dealDay", "일", "deal_day"],
+    "floor": ["floor", "층"],
+    "build_year": ["buildYear", "건축년도", "build_year"],
+}
+
+NUMERIC_COLUMNS = ["deal_amount", "area", "deal_year", "deal_month", "deal_day", "floor", "build_year"]
+
+
+def recent_year_months(count: int, end: Optional[date] = None) -> List[str]:
+    """end(기본 오늘)가 속한 달부터 과거로 count개월의 YYYYMM 목록 (최신순)"""
+    end = end or date.today()
+    months = []
+    year, month = end.year, end.month
+    for _ in range(count):
+        months.append(f"{year}{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months
+
+
+def year_month_range(start_month: str, end_month: str) -> List[str]:
+    """start_month부터 end_month까지(포함) YYYYMM 목록 (오래된 순)"""
+    year, month = int(start_month[:4]), int(start_month[4:6])
+    end_year, end_month_number = int(end_month[:4]), int(end_month[4:6])
+
+    months = []
+    while (year, month) <= (end_year, end_month_number):
+        months.append(f"{year}{month:02d}")
+        year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+    return months
+
+
+def extract_records(payload: Any) -> List[Dict[str, Any]]:
+    """JSON 페이로드에서 거래 레코드 리스트를 추출합니다."""
+    if isinstance(payload, list):
+        return [item for item in payload if isinstance(item, dict)]
+
+    if isinstance(payload, dict):
+        # 공공데이터 API 응답 구조 (response.body.items.item)
+        if "response" in payload:
+            return extract_records(payload["response"])
+
+        for key in ("body", "items", "item", "data", "records", "results"):
+            if key in payload:
+                records = extract_records(payload[key])
+                if records:
+                    return records
+
+    return []
+
+
+def resolve_data_path(path: str) -> Optional[str]:
+    """MCP 서버가 반환한 데이터 파일 경로를 로컬 경로로 변환합니다."""
+    path = path.strip()
+    if os.path.isabs(path) and os.path.exists(path):
+        return path
+
+    # 상대 경로는 MCP 서버 작업 디렉토리 기준으로 확인
+    candidates = [
+        path,
+        os.path.join(os.getenv("MCP_KR_REALESTATE_PATH", "../mcp-kr-realestate"), path)
+    ]
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+
+    return None
+
+
+def is_data_path(source: str) -> bool:
+    """도구 결과가 JSON 본문이 아닌 데이터 파일 경로인지 (get_apt_trade_data는 파일 경로를 돌려줌)"""
+    text = source.strip()
+    return text.endswith('.json') and not text.startswith(('{', '['))
+
+
+def read_trade_payload(source: str) -> Any:
+    """JSON 텍스트 또는 파일 경로의 거래 데이터를 읽습니다. 파일이 없거나 JSON이 아니면 ValueError"""
+    text = source.strip()
+
+    if is_data_path(text):
+        file_path = resolve_data_path(text)
+        if not file_path:
+            raise ValueError(f"거래 데이터 파일을 찾을 수 없음: {text}")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    if not text.startswith(('{', '[')):
+        raise ValueError(f"거래 데이터가 JSON이 아님: {text[:100]}")
+    return json.loads(text)
+
+
+def load_trade_records(source: str) -> List[Dict[str, Any]]:
+    """JSON 텍스트 또는 파일 경로에서 거래 레코드를 읽어옵니다. (읽을 수 없으면 빈 목록)"""
+    try:
+        return extract_records(read_trade_payload(source))
+    except ValueError as e:
+        logger.warning(f"⚠️ {e}")
+        return []
+
+
+def to_trade_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """거래 레코드를 정규화된 컬럼을 가진 DataFrame으로 변환합니다."""
+    frame = pd.DataFrame.from_records(records)
+    if frame.empty:
+        return frame
+
+    rename_map = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in frame.columns and column not in rename_map.values():
+                rename_map[alias] = column
+                break
+    frame = frame.rename(columns=rename_map)
+
+    # 숫자 컬럼 변환 ("82,000" 같은 문자열 포함) - 이미 숫자형이면 문자열 처리 생략
+    for column in NUMERIC_COLUMNS:
+        if column in frame.columns and not pd.api.types.is_numeric_dtype(frame[column]):
+            frame[column] = _parse_numeric(frame[column])
+
+    for column in ("apt_name", "dong"):
+        if column in frame.columns:
+            frame[column] = frame[column].astype(str).str.strip()
+
+    if "deal_amount" in frame.columns and "area" in frame.columns:
+        # 전용면적 1㎡당 가격 (만원)
+        frame["price_per_area"] = frame["deal_amount"] / frame["area"].replace(0, np.nan)
+
+    if "deal_year" in frame.columns and "deal_month" in frame.columns:
+        # YYYYMM을 정수 연산으로 만든 뒤 고유값만 문자열로 변환
+        year_month = (frame["deal_year"] * 100 + frame["deal_month"]).astype("Int64")
+        frame["year_month"] = year_month.astype(str).where(year_month.notna(), None)
+
+    return frame
+
+
+def _parse_numeric(column: pd.Series) -> pd.Series:
+    """문자열 숫자 컬럼을 float로 변환합니다. 변환 불가 값은 NaN."""
+    try:
+        return column.astype(float)
+    except (TypeError, ValueError):
+        pass
+
+    return pd.to_numeric(
+        column.astype(str).str.replace(',', '', regex=False),
+        errors='coerce'
+    )
+
+
+def to_json_safe(value: Any) -> Any:
+    """NumPy/pandas 값을 JSON 직렬화 가능한 값으로 변환합니다."""
+    if isinstance(value, dict):
+        return {str(k): to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_safe(v) for v in value]
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if np.isnan(value) else round(float(value), 2)
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def is_trade_frame(frame: pd.DataFrame) -> bool:
+    """정규화된 거래 데이터 DataFrame인지 확인합니다."""
+    return "deal_amount" in frame.columns
@@ -354,14 +354,39 @@ class ChatApplication {
             return;
         }
 
-        this.reportsList.innerHTML = this.reports
+        // 질의/URL은 사용자 입력이므로 innerHTML 대신 textContent와 이벤트 리스너로 구성
+        this.reportsList.replaceChildren(...this.reports
             .slice(0, 10) // 최근 10개만 표시
-            .map(report => `
-                <div class="report-item" onclick="window.open('/reports/${report.filename}', '_blank')">
-                    <div class="report-name">${report.filename}</div>
-                    <div class="report-date">${this.formatDate(report.created_at)}</div>
-                </div>
-            `).join('');
+            .map(report => {
+                const item = document.createElement('div');
+                item.className = 'report-item';
+
+                const name = document.createElement('div');
+                name.className = 'report-name';
+                name.textContent = report.query || report.report_id;
+
+                const date = document.createElement('div');
+                date.className = 'report-date';
+                date.textContent = this.formatDate(report.created_at);
+
+                item.append(name, date);
+                const url = this.safeReportUrl(report.url);
+                if (url) {
+                    item.addEventListener('click', () => window.open(url, '_blank', 'noopener'));
+                }
+                return item;
+            }));
+    }
+
+    // 같은 출처 또는 http(s) 리포트 URL만 허용 (javascript: 등 차단)
+    safeReportUrl(url) {
+        if (!url) return null;
+        try {
+            const parsed = new URL(url, window.location.href);
+            return ['http:', 'https:'].includes(parsed.protocol) ? parsed.href : null;
+        } catch (e) {
+            return null;
+        }
     }
 
     // 채팅 히스토리 렌더링
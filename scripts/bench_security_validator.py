@@ -0,0 +1,88 @@
+"""
+생성 코드 보안 검증 벤치마크
+기존 정규식 검사와 AST 분석(analyze_code)의 코드 크기별 소요 시간, 같은 코드 재검증(캐시) 비용 비교
+
+사용법:
+    python scripts/bench_security_validator.py --sizes 500 1000 2000 4000 8000
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.code_analysis import analyze_code  # noqa: E402
+from app.utils.security import SecurityValidator  # noqa: E402
+
+BLOCK = '''
+monthly_{i} = df.groupby("month")["price"].agg(["mean", "median", "count"]).reset_index()
+evaluation_{i} = {{"avg": float(monthly_{i}["mean"].mean()), "label": "구간 {i}"}}
+pattern_{i} = re.compile(r"\\d+")
+with open(f"reports/chart_{i}.json", "w", encoding="utf-8") as f:
+    json.dump(evaluation_{i}, f, ensure_ascii=False)
+'''
+
+
+def make_script(blocks: int) -> str:
+    """보고서 생성 코드 형태의 합성 스크립트 (블록당 5줄)"""
+    header = "import json\nimport re\nimport pandas as pd\n\ndf = pd.DataFrame(context_data['records'])\n"
+    return header + "".join(BLOCK.format(i=i) for i in range(blocks))
+
+
+def baseline_validate(code: str) -> List[str]:
+    """기존 정규식 기반 validate_code의 검사 항목"""
+    found = []
+    for func in ['eval', 'compile', '__import__', 'subprocess', 'os.system']:
+        if re.search(func, code):
+            found.append(func)
+    re.search(r'\bexec\b', code)
+    for pattern in [r'open\s*\(\s*["\']([^"\']+)["\'][\s,]*["\']w["\']', r'open\s*\(\s*([^,)]+)\s*,\s*["\']w["\']']:
+        found.extend(match.group(1) for match in re.finditer(pattern, code))
+    for pattern in [r'open\s*\([^)]*["\'][^"\']*\.\.[^"\']*["\']', r'os\.path\.join\s*\([^)]*\.\.',
+                    r'["\']\/(?!(?:app|data|reports|tmp)\/)[^"\']*["\']',
+                    r'http[s]?://', r'requests\.', r'urllib\.', r'socket\.']:
+        if re.search(pattern, code):
+            found.append(pattern)
+    return found
+
+
+def timed(func, repeat: int) -> float:
+    """repeat회 실행 중 최소 소요 시간 (초)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="생성 코드 보안 검증 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000, 8000], help="블록 수 목록")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'줄 수':>8} {'정규식(ms)':>12} {'AST(ms)':>10} {'AST us/줄':>10} {'캐시(ms)':>10}")
+    for blocks in args.sizes:
+        code = make_script(blocks)
+        lines = code.count("\n") + 1
+        regex_time = timed(lambda: baseline_validate(code), args.repeat)
+        ast_time = timed(lambda: analyze_code(code), args.repeat)
+
+        validator = SecurityValidator()
+        validator.validate_code(code)
+        cached_time = timed(lambda: validator.validate_code(code), args.repeat)
+        print(f"{lines:>8,} {regex_time * 1000:>12.1f} {ast_time * 1000:>10.1f} "
+              f"{ast_time / lines * 1e6:>10.2f} {cached_time * 1000:>10.2f}")
+
+    sample = make_script(3)
+    print(f"\n정규식 검사 결과 (합성 코드): {baseline_validate(sample)}")
+    print(f"AST 분석 결과 (합성 코드):    {analyze_code(sample)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+거래 데이터 분석 벤치마크
+로컬 벡터 분석 엔진(TradeAnalytics)과 월별 순수 Python 집계 / MCP analyze_apartment_trade 호출 비교
+
+사용법:
+    python scripts/bench_trade_analytics.py --months 12 --records 3000
+    python scripts/bench_trade_analytics.py --mcp --region-code 11680   # MCP 서버 실행 필요
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.trade_analytics import TradeAnalytics  # noqa: E402
+from app.utils.trade_data import load_trade_records  # noqa: E402
+
+COMPLEXES = [f"테스트아파트{i}" for i in range(40)]
+DONGS = ["역삼동", "대치동", "삼성동", "도곡동", "개포동", "청담동", "논현동", "압구정동"]
+
+
+def make_month_file(directory: str, year_month: str, count: int) -> str:
+    """get_apt_trade_data 형식의 합성 거래 파일을 생성합니다."""
+    year, month = year_month[:4], year_month[4:]
+    items = []
+    for _ in range(count):
+        area = round(random.uniform(40, 180), 2)
+        items.append({
+            "aptNm": random.choice(COMPLEXES),
+            "umdNm": random.choice(DONGS),
+            "dealAmount": f"{int(area * random.uniform(1200, 2500)):,}",
+            "excluUseAr": str(area),
+            "dealYear": year,
+            "dealMonth": str(int(month)),
+            "dealDay": str(random.randint(1, 28)),
+            "floor": str(random.randint(1, 35)),
+            "buildYear": str(random.randint(1985, 2023)),
+        })
+
+    path = os.path.join(directory, f"apt_trade_{year_month}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"response": {"body": {"items": {"item": items}}}}, f, ensure_ascii=False)
+    return path
+
+
+def baseline_analyze(month_files: Dict[str, str]) -> Dict[str, Any]:
+    """기존 방식: 월별 파일을 순수 Python 루프로 집계합니다 (동일한 통계 항목)."""
+    monthly = []
+    all_prices: List[float] = []
+    groups: Dict[str, Dict[str, List[float]]] = {"apt": {}, "dong": {}}
+    area_total = amount_with_area = 0.0
+
+    for year_month, path in month_files.items():
+        prices = []
+        for record in load_trade_records(path):
+            price = float(str(record["dealAmount"]).replace(",", ""))
+            area = float(record["excluUseAr"])
+            prices.append(price)
+            groups["apt"].setdefault(record["aptNm"], []).append(price)
+            groups["dong"].setdefault(record["umdNm"], []).append(price)
+            if area > 0:
+                area_total += area
+                amount_with_area += price
+        all_prices.extend(prices)
+        monthly.append({
+            "month": year_month,
+            "transactions": len(prices),
+            "avg_price": sum(prices) / len(prices),
+            "median_price": statistics.median(prices),
+        })
+
+    ordered = sorted(all_prices)
+    breakdowns = {
+        key: sorted(
+            ({"name": name, "transactions": len(values), "avg_price": sum(values) / len(values),
+              "median_price": statistics.median(values)} for name, values in members.items()),
+            key=lambda row: row["transactions"], reverse=True
+        )
+        for key, members in groups.items()
+    }
+    return {
+        "total_transactions": len(all_prices),
+        # 기존 구현은 월 평균을 다시 평균함
+        "avg_price_overall": sum(m["avg_price"] for m in monthly) / len(monthly),
+        "median_price": statistics.median(ordered),
+        "price_percentiles": statistics.quantiles(ordered, n=20),
+        "avg_price_per_area": amount_with_area / area_total if area_total else 0,
+        "monthly_data": monthly,
+        **breakdowns,
+    }
+
+
+def recent_months(count: int) -> List[str]:
+    """현재 월부터 과거로 count개월의 YYYYMM 목록"""
+    year, month = time.localtime().tm_year, time.localtime().tm_mon
+    months = []
+    for _ in range(count):
+        months.append(f"{year}{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return months
+
+
+def timed(label: str, func, repeat: int):
+    """함수를 repeat회 실행해 최소 소요 시간을 출력합니다."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<36} {best * 1000:10.1f} ms")
+    return best, result
+
+
+async def bench_mcp(region_code: str, months: List[str]) -> None:
+    """실제 MCP 서버로 월별 analyze_apartment_trade 호출과 로컬 엔진을 비교합니다."""
+    from app.mcp_client import MCPClient
+
+    client = MCPClient()
+    await client.start_mcp_server("kr-realestate")
+    try:
+        month_files = {}
+        for year_month in months:
+            result = await client.call_tool("kr-realestate", "get_apt_trade_data", {
+                "region_code": region_code, "year_month": year_month
+            })
+            content = result.get("content") if result else None
+            if content:
+                month_files[year_month] = content[0]["text"] if isinstance(content, list) else content
+
+        start = time.perf_counter()
+        for path in month_files.values():
+            await client.call_tool("kr-realestate", "analyze_apartment_trade", {"file_path": path})
+        mcp_elapsed = time.perf_counter() - start
+        print(f"{'MCP analyze_apartment_trade (월별)':<36} {mcp_elapsed * 1000:10.1f} ms")
+
+        analytics = TradeAnalytics()
+        timed("TradeAnalytics (로컬, 1회 패스)", lambda: analytics.analyze(analytics.load_month_files(month_files)), 3)
+    finally:
+        await client.shutdown_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="거래 데이터 분석 벤치마크")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--records", type=int, default=3000, help="월별 거래 건수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mcp", action="store_true", help="실제 MCP 서버와 비교")
+    parser.add_argument("--region-code", default="11680")
+    args = parser.parse_args()
+
+    months = recent_months(args.months)
+    if args.mcp:
+        asyncio.run(bench_mcp(args.region_code, months))
+        return
+
+    random.seed(42)
+    analytics = TradeAnalytics()
+    with tempfile.TemporaryDirectory() as directory:
+        month_files = {ym: make_month_file(directory, ym, args.records) for ym in months}
+        print(f"📊 {args.months}개월 x {args.records:,}건 = {args.months * args.records:,}건\n")
+
+        base_time, base = timed("순수 Python 루프 집계", lambda: baseline_analyze(month_files), args.repeat)
+        local_time, local = timed(
+            "TradeAnalytics (파일 로드 + 분석)",
+            lambda: analytics.analyze(analytics.load_month_files(month_files)),
+            args.repeat
+        )
+
+        # 정규화된 DataFrame이 이미 있을 때 분석 단계만의 비용
+        frame = analytics.load_month_files(month_files)
+        analyze_time, _ = timed("TradeAnalytics (분석만)", lambda: analytics.analyze(frame), args.repeat)
+
+    print(f"\n속도 향상 (로드 포함): {base_time / local_time:.1f}x")
+    print(f"분석 단계 비중: {analyze_time / local_time * 100:.0f}%")
+    print(f"평균가 (월 평균의 평균): {base['avg_price_overall']:,.0f}만원")
+    print(f"평균가 (건수 가중):      {local['avg_price_overall']:,.0f}만원")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+테스트 공통 설정
+저장소/캐시 경로를 임시 디렉토리로 옮기고, 프로세스 전역 싱글톤을 테스트마다 새로 만듦
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def isolated_paths(tmp_path, monkeypatch):
+    """CACHE_PATH/REPORTS_PATH/TRADE_STORE_PATH를 임시 디렉토리로 설정하고 싱글톤을 초기화합니다."""
+    monkeypatch.setenv("CACHE_PATH", str(tmp_path / "cache"))
+    monkeypatch.setenv("REPORTS_PATH", str(tmp_path / "reports"))
+    monkeypatch.setenv("TRADE_STORE_PATH", str(tmp_path / "trade_store"))
+    monkeypatch.setenv("LLM_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_NAME", "test-model")
+
+    from app import region_gazetteer, report_cache, report_catalog, report_store
+    for module, name in (
+        (region_gazetteer, "_gazetteer"),
+        (report_cache, "_report_cache"),
+        (report_catalog, "_catalog"),
+        (report_store, "_store"),
+    ):
+        monkeypatch.setattr(module, name, None)
+    return tmp_path
+
+
+def trade_records(region_code: str, year_month: str, count: int = 5, base_price: int = 100000) -> List[Dict[str, Any]]:
+    """get_apt_trade_data 원시 응답 형식의 거래 레코드"""
+    return [
+        {
+            "aptNm": f"테스트아파트{index}",
+            "umdNm": "테스트동",
+            "dealAmount": f"{base_price + index * 1000:,}",
+            "excluUseAr": "84.9",
+            "dealYear": year_month[:4],
+            "dealMonth": year_month[4:],
+            "dealDay": str(index + 1),
+            "floor": "10",
+            "buildYear": "2010",
+            "sggCd": region_code,
+        }
+        for index in range(count)
+    ]
+
+
+class FakeMCPClient:
+    """kr-realestate MCP 서버 대신 거래 레코드를 JSON 텍스트로 돌려주는 클라이언트"""
+
+    def __init__(self, prices: Optional[Dict[str, int]] = None):
+        self.prices = prices or {}
+        self.calls: List[Dict[str, Any]] = []
+        self.mcp_configs: Dict[str, Any] = {}
+
+    async def start_mcp_server(self, server_name: str) -> bool:
+        return True
+
+    async def list_tools(self, server_name: str) -> List[Dict[str, Any]]:
+        return []
+
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self.calls.append({"tool": tool_name, **arguments})
+        if tool_name != "get_apt_trade_data":
+            return None
+        region_code, year_month = arguments["region_code"], arguments["year_month"]
+        records = trade_records(region_code, year_month, base_price=self.prices.get(region_code, 100000))
+        return {"content": [{"type": "text", "text": json.dumps({"items": records}, ensure_ascii=False)}]}
+
+    async def shutdown_all(self) -> None:
+        return None
+
+
+@pytest.fixture
+def fake_mcp():
+    return FakeMCPClient({"11680": 250000, "11650": 200000})
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from app.langgraph_workflow import BrowserTestTool
+from app.report_manifest import SIDECAR_MIN_BYTES
+from app.report_store import current_session, get_report_store
+
+LOADER_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body><canvas id="priceChart"></canvas>
+<script>whenVisible(document.getElementById('priceChart'), () => loadReportData().then(data => console.log(data)));</script>
+</body></html>"""
+
+
+def run_agent_report(monkeypatch, html, analysis_data):
+    """LLM 대신 html을 돌려주도록 바꾼 html_report 도구를 실행하고 저장된 리포트 HTML을 돌려줍니다."""
+    tool = BrowserTestTool()
+
+    async def fake_generate(data, user_query):
+        return html
+
+    monkeypatch.setattr(tool, "_generate_html_with_llm", fake_generate)
+    token = current_session.set("session_agent")
+    try:
+        asyncio.run(tool._arun(analysis_data=json.dumps(analysis_data, ensure_ascii=False), user_query="강남구 아파트"))
+    finally:
+        current_session.reset(token)
+
+    report = get_report_store().session_report("session_agent")
+    with open(report["path"], encoding="utf-8") as f:
+        return f.read()
+
+
+def test_agent_report_moves_large_data_to_sidecar(isolated_paths, monkeypatch):
+    rows = [{"month": f"2024{month:02d}", "avg_price": 100000 + month, "note": "x" * 100} for month in range(1, 13)] * 10
+    analysis_data = {"monthly_data": rows}
+    assert len(json.dumps(analysis_data)) >= SIDECAR_MIN_BYTES
+
+    html = run_agent_report(monkeypatch, LOADER_HTML, analysis_data)
+
+    assert 'id="report-data-loader"' in html
+    assert 'data-src="/reports/objects/' in html
+    assert "x" * 100 not in html
+    sidecars = [name for _, _, files in os.walk(isolated_paths / "reports") for name in files if name.endswith(".json")]
+    assert sidecars
+
+
+def test_agent_report_without_loader_is_saved_unchanged(isolated_paths, monkeypatch):
+    html = LOADER_HTML.replace("loadReportData()", "Promise.resolve({})")
+
+    saved = run_agent_report(monkeypatch, html, {"monthly_data": [{"month": "202401", "avg_price": 100000}]})
+
+    assert saved == html
+
+
+def test_agent_report_data_is_reduced_for_prompt_and_embedding(isolated_paths, monkeypatch):
+    from app.utils.chart_reduction import POINT_BUDGET
+
+    rows = [{"month": f"m{index}", "avg_price": 100000 + (index % 7) * 1000} for index in range(POINT_BUDGET * 3)]
+    prompts = []
+    tool = BrowserTestTool()
+
+    async def fake_generate(data, user_query):
+        prompts.append(data)
+        return LOADER_HTML
+
+    monkeypatch.setattr(tool, "_generate_html_with_llm", fake_generate)
+    asyncio.run(tool._arun(analysis_data=json.dumps([{"tool_name": "analyze", "data": {"monthly_data": rows}}])))
+
+    reduced = prompts[0][0]["data"]
+    assert len(reduced["monthly_data"]) == POINT_BUDGET
+    assert reduced["monthly_data_sampling"]["original_points"] == len(rows)
+    assert reduced["monthly_data"][0] == rows[0] and reduced["monthly_data"][-1] == rows[-1]
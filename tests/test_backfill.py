@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+from app.backfill import BackfillJob
+from app.trade_store import TradeStore
+
+from conftest import FakeMCPClient
+
+
+class FileResultMCPClient(FakeMCPClient):
+    """get_apt_trade_data가 결과를 파일 경로로 돌려주는 MCP 서버 (responses: 년월 → 응답 텍스트)"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+
+    async def call_tool(self, server_name, tool_name, arguments):
+        self.calls.append({"tool": tool_name, **arguments})
+        return {"content": [{"type": "text", "text": self.responses[arguments["year_month"]]}]}
+
+
+def run_job(job_id, client):
+    job = BackfillJob.load(job_id, mcp_client=client) or BackfillJob(
+        ["11680"], ["202401", "202402"], job_id=job_id, mcp_client=client
+    )
+    asyncio.run(job.run())
+    return job
+
+
+def test_unreadable_result_is_retried_and_empty_month_completes(isolated_paths):
+    empty = json.dumps({"items": []})
+    missing = "data/apt_trade_11680_202402.json"
+    job = run_job("retry-job", FileResultMCPClient({"202401": empty, "202402": missing}))
+
+    store = TradeStore()
+    assert job.completed == {"11680:202401": 0}
+    assert store.has_partition("11680", "202401") and store.partition_info("11680", "202401")["rows"] == 0
+    assert list(job.failed) == ["11680:202402"]
+    assert not store.has_partition("11680", "202402")
+
+    # 결과 파일이 생긴 뒤 같은 job_id로 다시 실행하면 실패한 달만 수집
+    path = isolated_paths / "apt_trade_11680_202402.json"
+    path.write_text(json.dumps({"items": [{"aptNm": "테스트", "dealAmount": "100,000", "excluUseAr": "84.9"}]}), encoding="utf-8")
+    client = FileResultMCPClient({"202402": str(path)})
+    job = run_job("retry-job", client)
+
+    assert [call["year_month"] for call in client.calls] == ["202402"]
+    assert job.completed == {"11680:202401": 0, "11680:202402": 1}
+    assert not job.failed
+    assert store.partition_info("11680", "202402")["rows"] == 1
@@ -0,0 +1,35 @@
+import pytest
+
+from app.utils.code_analysis import analyze_code
+
+
+@pytest.mark.parametrize("code", [
+    "e = exec\ne(input())",
+    "handlers = [exec]\nhandlers[0](input())",
+    "print(exec)",
+    "exec(input())",
+    "print(compile)",
+    "if False:\n    compile = 3\ncompile('1', 'a', 'eval')",
+    "compile = 3\ndel compile\ncompile('1', 'a', 'eval')",
+    "compile = 3\ndef run():\n    return compile('1', 'a', 'eval')\ndel compile\nrun()",
+    "compile = 3\nglobals().pop('compile')\ncompile('1', 'a', 'eval')",
+    "compile = 3\nexec('del compile')\ncompile('1', 'a', 'eval')",
+    "class Report:\n    eval = 1\n    def run(self):\n        return eval('1')",
+    "compile = eval",
+])
+def test_blocked(code):
+    assert not analyze_code(code)["is_safe"]
+
+
+@pytest.mark.parametrize("code", [
+    "exec('total = 1 + 2')",
+    "compile = 3\nprint(compile)",
+    "compile, limit = 3, 4\nprint(compile + limit)",
+    "def scale(compile):\n    return compile * 2",
+    "scale = lambda compile: compile * 2",
+    "class Report:\n    eval = 1\n    score = eval + 1",
+    "from re import compile\npattern = compile('a+')",
+])
+def test_allowed(code):
+    report = analyze_code(code)
+    assert report["is_safe"], report["errors"]
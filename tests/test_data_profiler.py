@@ -0,0 +1,27 @@
+import json
+
+from app.data_profiler import DataProfiler
+
+from conftest import trade_records
+
+
+def test_file_path_result_is_profiled_and_keeps_path(tmp_path):
+    path = tmp_path / "raw_data" / "apt_trade_11680_202401.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps({"items": trade_records("11680", "202401", count=300)}, ensure_ascii=False), encoding="utf-8")
+
+    reduced = json.loads(DataProfiler(min_records=200).reduce_tool_output(str(path)))
+
+    assert reduced["file_path"] == str(path)
+    assert reduced["record_count"] == 300
+    assert reduced["data_profile"]["record_count"] == 300
+    assert len(reduced["sample_records"]) <= 30
+
+
+def test_small_or_missing_file_result_is_passed_through(tmp_path):
+    path = tmp_path / "apt_trade_11680_202401.json"
+    path.write_text(json.dumps({"items": trade_records("11680", "202401", count=10)}), encoding="utf-8")
+    profiler = DataProfiler(min_records=200)
+
+    assert profiler.reduce_tool_output(str(path)) is None
+    assert profiler.reduce_tool_output(str(tmp_path / "missing.json")) is None
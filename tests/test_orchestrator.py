@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from app.orchestrator import RealestateOrchestrator
+from app.report_store import get_report_store
+
+
+def make_orchestrator(fake_mcp):
+    """MCP 서버 대신 fake_mcp를 쓰고, 에이전트 경로가 호출되면 실패하는 오케스트레이터"""
+    orchestrator = RealestateOrchestrator()
+    orchestrator.workflow.mcp_client = fake_mcp
+
+    async def agent_not_expected(*args, **kwargs):
+        raise AssertionError("에이전트 워크플로우가 호출되면 안 됩니다")
+
+    orchestrator.workflow.run_with_streaming = agent_not_expected
+    orchestrator.workflow.initialize_tools = agent_not_expected
+    return orchestrator
+
+
+def test_comparison_query_is_routed_to_comparison_report(isolated_paths, fake_mcp):
+    orchestrator = make_orchestrator(fake_mcp)
+
+    result = asyncio.run(orchestrator.process_query("강남구 서초구 아파트 매매 비교", "session_compare", None))
+
+    assert result["success"], result.get("error")
+    assert result["workflow_mode"] == "comparison"
+    assert {call["region_code"] for call in fake_mcp.calls if call["tool"] == "get_apt_trade_data"} == {"11680", "11650"}
+
+    # 스트리밍 엔드포인트와 스케줄러가 세션 ID로 찾는 리포트
+    report = get_report_store().session_report("session_compare")
+    assert report and report["report_id"] == result["report_id"]
+    with open(report["path"], encoding="utf-8") as f:
+        html = f.read()
+    assert "강남구" in html and "서초구" in html
+
+
+def test_province_trend_is_answered_from_rollups(isolated_paths, fake_mcp):
+    orchestrator = make_orchestrator(fake_mcp)
+
+    first = asyncio.run(orchestrator.process_query("서울 아파트 매매 동향", "session_area_1", None))
+    assert first["success"], first.get("error")
+    assert first["workflow_mode"] == "area"
+    assert first["region_info"]["level"] == "sido"
+    fetched = len(fake_mcp.calls)
+    assert fetched > 0
+
+    # 집계가 채워진 뒤에는 MCP 호출 없이 지역 집계로만 답함
+    second = asyncio.run(orchestrator.process_query("서울 아파트 매매 동향", "session_area_2", None))
+    assert second["success"], second.get("error")
+    assert len(fake_mcp.calls) == fetched
+    assert get_report_store().session_report("session_area_2")
+
+
+def test_routed_report_has_manifest_and_refreshes(isolated_paths, fake_mcp):
+    orchestrator = make_orchestrator(fake_mcp)
+    result = asyncio.run(orchestrator.process_query("강남구 서초구 아파트 매매 비교", "session_refresh", None))
+    report_id = result["report_id"]
+
+    manifest = get_report_store().load_manifest(report_id)
+    assert manifest and manifest["kind"] == "comparison"
+
+    workflow = asyncio.run(orchestrator.get_realestate_workflow())
+    unchanged = asyncio.run(workflow.refresh_report(report_id))
+    assert unchanged["success"] and not unchanged["refreshed"]
+
+    # 수집 결과가 바뀌면 바뀐 입력만 표시하고 다시 렌더링
+    fake_mcp.prices["11680"] = 300000
+    refreshed = asyncio.run(workflow.refresh_report(report_id))
+    assert refreshed["refreshed"] and refreshed["mode"] == "rerender"
+    assert refreshed["changed_inputs"] and all(key.startswith("11680/") for key in refreshed["changed_inputs"])
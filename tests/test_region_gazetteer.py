@@ -0,0 +1,44 @@
+import pytest
+
+from app.region_gazetteer import SEED_REGIONS, RegionGazetteer
+
+# get_region_codes로 수집한 사전처럼 특별자치도 코드(51/52)의 시/군/구를 포함
+MCP_REGIONS = {
+    **SEED_REGIONS,
+    "51110": "춘천시",
+    "51130": "원주시",
+    "51150": "강릉시",
+    "52111": "전주시 완산구",
+    "52113": "전주시 덕진구",
+    "52130": "군산시",
+}
+
+
+@pytest.fixture
+def gazetteer(isolated_paths):
+    gazetteer = RegionGazetteer()
+    gazetteer._set_regions(MCP_REGIONS)
+    return gazetteer
+
+
+@pytest.mark.parametrize("query, sido_code, districts", [
+    ("강원 아파트 매매 동향", "51", ["51110", "51130", "51150"]),
+    ("강원도 아파트 매매 동향", "51", ["51110", "51130", "51150"]),
+    ("전북 아파트 매매 동향", "52", ["52111", "52113", "52130"]),
+    ("전라북도 아파트 매매 동향", "52", ["52111", "52113", "52130"]),
+])
+def test_special_self_governing_provinces_resolve_to_current_codes(gazetteer, query, sido_code, districts):
+    regions = gazetteer.resolve(query)
+
+    assert [(region["level"], region["code"]) for region in regions] == [("sido", sido_code)]
+    assert [district["code"] for district in gazetteer.districts_of(sido_code)] == districts
+
+
+def test_legacy_province_codes_belong_to_current_province(isolated_paths):
+    gazetteer = RegionGazetteer()
+    gazetteer._set_regions({**MCP_REGIONS, "42110": "춘천시", "42170": "동해시"})
+
+    assert [district["code"] for district in gazetteer.districts_of("51")] == ["42170", "51110", "51130", "51150"]
+    assert gazetteer.districts_of("42") == []
+    assert [(region["code"], region["ambiguous"]) for region in gazetteer.resolve("강원 춘천시")] == [("51110", False)]
+    assert gazetteer.resolve("동해시")[0]["code"] == "42170"
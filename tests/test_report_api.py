@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("langgraph")
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.report_catalog import get_report_catalog
+from app.report_store import get_report_store
+
+
+@pytest.mark.parametrize("accel_redirect", [False, True])
+def test_report_content_records_access(isolated_paths, monkeypatch, accel_redirect):
+    monkeypatch.setattr(main, "REPORT_ACCEL_REDIRECT", accel_redirect)
+    # 일반 전송 경로의 on_access도 이 테스트의 카탈로그를 쓰도록 교체
+    monkeypatch.setattr(main.report_files, "on_access", get_report_catalog().note_access, raising=False)
+    report = get_report_store().save("<!DOCTYPE html><html><body>리포트</body></html>", session_id="session_access")
+
+    response = TestClient(main.app).get(f"/api/reports/{report['report_id']}/content")
+
+    assert response.status_code == 200
+    if accel_redirect:
+        assert response.headers["X-Accel-Redirect"].startswith(main.REPORT_ACCEL_PREFIX)
+    catalog = get_report_catalog()
+    catalog.flush_access()
+    assert catalog.get(report["report_id"])["access_count"] == 1
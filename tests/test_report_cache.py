@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from app import report_cache
+from app.report_cache import ReportCache
+
+
+def read_index(cache):
+    with open(cache.path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_requests_are_saved_together_off_the_handler(isolated_paths, monkeypatch):
+    monkeypatch.setattr(report_cache, "SAVE_INTERVAL_SECONDS", 0.05)
+    cache = ReportCache()
+    writes = []
+    write = cache._write
+    monkeypatch.setattr(cache, "_write", lambda data: (writes.append(data), write(data)))
+
+    async def handle_requests():
+        for _ in range(20):
+            cache.record_query("강남구 아파트 매매 동향")
+            cache.lookup("강남구 아파트 매매 동향")
+        assert not writes
+        await asyncio.sleep(0.2)
+
+    asyncio.run(handle_requests())
+
+    assert len(writes) == 1
+    stats = read_index(cache)["query_counts"]
+    assert [entry["count"] for entry in stats.values()] == [20]
+
+
+def test_query_counts_are_capped(isolated_paths, monkeypatch):
+    monkeypatch.setattr(report_cache, "MAX_TRACKED_QUERIES", 3)
+    cache = ReportCache()
+
+    for _ in range(3):
+        cache.record_query("인기 쿼리")
+    for index in range(10):
+        cache.record_query(f"한 번 요청된 쿼리 {index}")
+
+    assert len(cache.query_counts) == 3
+    assert cache.popular_queries(3)[0] == "인기 쿼리"
+    assert "한 번 요청된 쿼리 9" in cache.popular_queries(3)
+    # 이벤트 루프 밖에서는 바로 저장
+    assert len(read_index(cache)["query_counts"]) == 3